@@ -1,136 +1,929 @@
-from flask import Flask, render_template, request, abort
-from app.taiga_factory import create_taiga_client
-from app.taiga_plotly import (
-    get_dashboard_config_html,
-    get_epic_progress_html,
-    get_task_status_breakdown_html,
-    get_task_assignment_heatmap_html,
-    get_task_createdby_heatmap_html,
-    get_tag_cloud_html,
-    get_tag_bar_chart_html,
-    get_issue_type_severity_priority_donut_charts_html,
-    get_blocked_items_table_html
+from flask import Flask, render_template, stream_template, request, abort
+from app.taiga_factory import create_replay_client, create_taiga_client
+from app.taiga_cassette import Cassette, load_cassette
+from app.taiga_dataset import DashboardDataset, fetch_all_parallel
+from app.taiga_export import write_static_site
+from app.taiga_portfolio import merge_summaries
+from app.taiga_widgets import (
+    UNFILTERED_WIDGETS,
+    WIDGETS,
+    WIDGETS_BY_NAME,
+    parse_view_options,
+    parse_view_params,
+    render_widget,
+    render_widget_from_futures,
+    widget_cache_key,
+    widget_data_key,
+    widget_inputs
 )
+from app.taiga_plotly import BLOCKED_PAGE_SIZE, get_plotly_cdn_url, get_int_from_env
+from app.taiga_view_cache import ViewCache
+from app.taiga_index import BlockedIndex
+from app.taiga_config import config, get_projects_from_env
+from app import taiga_history
+from app.taiga_snapshots import DATA_DIR
+from app.taiga_webhooks import TAIGA_WEBHOOK_KEY, apply_event, event_key, sign_payload, verify_signature
 from dotenv import load_dotenv
+from werkzeug.datastructures import MultiDict
+import asyncio
+import click
+from contextlib import contextmanager
+from datetime import datetime
+from functools import partial
 import json
-from flask_caching import Cache
 import os
+import re
+import requests
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
 import time
-from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from urllib.parse import parse_qsl
+
+try:
+    from asgiref.wsgi import WsgiToAsgi  # optional: only the ASGI serving mode (asgi_app) needs it
+except ImportError:
+    WsgiToAsgi = None
 
 app = Flask(__name__)
 
 load_dotenv()  # loads .env file into environment variables
 
 API_KEY = os.environ.get("API_KEY")
+ADMIN_API_KEY = os.environ.get("ADMIN_API_KEY")  # for /admin/config; the endpoint is disabled without it
 
-cache = Cache(config={"CACHE_TYPE": "simple"})
-cache.init_app(app)
+# "inline" renders the whole page before responding, "stream" flushes each widget as it is ready,
+# "lazy" serves an empty shell and each widget is fetched from /widget/<name> once scrolled into view
+RENDER_MODE = os.environ.get("DASHBOARD_RENDER_MODE", "inline").strip().lower()
 
+# Rendered pages and widget fragments, one entry per view; bounded by VIEW_CACHE_MAX_MB
+view_cache = ViewCache(
+    max_bytes=get_int_from_env("VIEW_CACHE_MAX_MB", 64) * 1024 * 1024,
+    ttl=900,  # 900 seconds = 15 minutes
+)
 
-@app.route("/")
-@cache.cached(timeout=900)  # 900 seconds = 15 minutes
-def home():
+dataset = DashboardDataset(create_taiga_client, ttl=900)  # 900 seconds = 15 minutes
+
+# Further projects served at /project/<id>/, e.g. "12,34:300": ids with an optional refresh TTL in seconds.
+# Each gets its own dataset, created on its first request; all share one Taiga session and metadata cache
+SERVED_PROJECTS = get_projects_from_env("TAIGA_PROJECT_IDS", default_ttl=900)
+project_datasets = {}  # project id -> DashboardDataset
+project_datasets_lock = threading.Lock()
+PROJECT_PATH = re.compile(r"/project/(\d+)(/.*)")
+
+widget_executor = ThreadPoolExecutor(max_workers=len(WIDGETS))
+widget_renders = {}  # view cache key -> future of the widget render in progress, shared by concurrent requests
+widget_renders_lock = threading.Lock()
+
+# Longest a page waits for its widgets; later ones show their last render or a placeholder. 0 waits for all
+WIDGET_RENDER_BUDGET_MS = get_int_from_env("WIDGET_RENDER_BUDGET_MS", 3000)
+
+# Serve the last stored refresh (DATASET_FORMAT=arrow) from boot while a fresh one is fetched
+WARM_START = os.environ.get("WARM_START", "true").strip().lower() in ("1", "true", "yes")
+DEFAULT_VIEW = ((), parse_view_options({}))
+
+# Project id the load-test command serves from its simulated Taiga API, chosen to not clash with real ones
+LOAD_TEST_PROJECT_ID = get_int_from_env("LOAD_TEST_PROJECT_ID", 999999)
+
+
+class PendingValue:
+    """Template value that blocks on a future only when Jinja reaches it while streaming."""
+
+    def __init__(self, future, transform=None):
+        self.future = future
+        self.transform = transform
+
+    def __str__(self):
+        value = self.future.result()
+        return str(self.transform(value) if self.transform else value)
+
+
+def check_api_key():
     if API_KEY:
         req_key = request.args.get("key")
         if not req_key or req_key != API_KEY:
             abort(403)  # Forbidden
 
-    client = create_taiga_client()
 
-    start_timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
-    overall_start = time.perf_counter()
-    print(f"[{start_timestamp}] Starting full Taiga data fetch...")
+def check_admin_key():
+    if not ADMIN_API_KEY:
+        abort(404)
+    if request.args.get("key") != ADMIN_API_KEY:
+        abort(403)  # Forbidden
 
-    all_data = fetch_all_parallel(client)
-    epics = all_data["epics"]
-    userstories = all_data["userstories"]
-    tasks = all_data["tasks"]
-    issues = all_data["issues"]
-    sprints = all_data["sprints"]
-    project = all_data["project"]
-    users = all_data["users"]
-    severities = all_data["severities"]
-    priorities = all_data["priorities"]
-    issue_types = all_data["issue_types"]
-
-    end_timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
-    overall_duration = time.perf_counter() - overall_start
-    print(f"[{end_timestamp}] Finished full Taiga data fetch in {overall_duration:.3f} seconds")
-
-    project_name = project["name"]
-    project_id = project["id"]
-    logo = project["logo_small_url"]
-    dashboard_config_html = get_dashboard_config_html()
-    epic_progress_bar_html = get_epic_progress_html(epics, userstories)
-    user_story_status_breakdown_html = get_task_status_breakdown_html(
-        userstories,
-        [],
-        [],
-        sprints,
-        "User Story Status Breakdown by Sprint (Requirement Items)",
+
+def canonical_project(projectid):
+    """None for the default project (TAIGA_PROJECT_ID), also at /project/<id>/, so both routes share its caches."""
+    if projectid is not None and str(projectid) == os.environ.get("TAIGA_PROJECT_ID"):
+        return None
+    return projectid
+
+
+def project_dataset(projectid):
+    """Return the dataset of a canonical project id (None: the default project), or None if it is not served."""
+    if projectid is None:
+        return dataset
+    with project_datasets_lock:
+        if projectid not in project_datasets:
+            if projectid not in SERVED_PROJECTS:
+                return None
+            held = project_datasets[projectid] = DashboardDataset(
+                partial(create_taiga_client, projectid), ttl=SERVED_PROJECTS[projectid]
+            )
+            if WARM_START:
+                held.warm_start()
+        return project_datasets[projectid]
+
+
+@app.route("/")
+def home():
+    return serve_dashboard(None)
+
+
+@app.route("/project/<int:projectid>/")
+def project_home(projectid):
+    return serve_dashboard(canonical_project(projectid))
+
+
+def serve_dashboard(projectid):
+    check_api_key()
+    dataset = project_dataset(projectid) or abort(404)
+    filters, options = parse_view_params(request.args)
+    if RENDER_MODE == "stream":
+        return stream_dashboard(dataset, projectid, filters, options)
+    if RENDER_MODE == "lazy":
+        return render_lazy_dashboard(dataset, projectid, filters)
+    all_data = dataset.get()
+    version, versions = dataset.version, dataset.versions
+    key = ("page", projectid, version, filters, options)
+    html = view_cache.get(key)
+    if html is not None:
+        return view_response(html, hit=True)
+    return view_response(render_dashboard(
+        all_data, filters, options, version, versions, cache_key=key, dataset=dataset, projectid=projectid
+    ), hit=False)
+
+
+@app.route("/widget/<name>")
+def widget_fragment(name):
+    return serve_widget(None, name)
+
+
+@app.route("/project/<int:projectid>/widget/<name>")
+def project_widget_fragment(projectid, name):
+    return serve_widget(canonical_project(projectid), name)
+
+
+def serve_widget(projectid, name):
+    check_api_key()
+    dataset = project_dataset(projectid)
+    if dataset is None or name not in WIDGETS_BY_NAME:
+        abort(404)
+    widget = WIDGETS_BY_NAME[name]
+    filters, options = parse_view_params(request.args)
+    futures = dataset.futures()
+    key = widget_key(projectid, widget, dataset.versions, filters, options)
+    html = view_cache.get(key)
+    if html is not None:
+        return view_response(html, hit=True)
+    html = submit_widget_render(key, lambda: render_widget_from_futures(widget, futures, filters, options)).result()
+    return view_response(html, hit=False)
+
+
+def view_response(html, hit):
+    """Response for a page or widget fragment; X-View-Cache says whether it came from the view cache (see load-test)."""
+    return app.response_class(html, headers={"X-View-Cache": "hit" if hit else "miss"})
+
+
+@app.route("/blocked")
+def blocked_items():
+    return serve_blocked_items(None)
+
+
+@app.route("/project/<int:projectid>/blocked")
+def project_blocked_items(projectid):
+    return serve_blocked_items(canonical_project(projectid))
+
+
+def serve_blocked_items(projectid):
+    """One page of the blocked items table as JSON, for its client-side paging, sorting and search."""
+    check_api_key()
+    dataset = project_dataset(projectid) or abort(404)
+    filters, options = parse_view_params(request.args)
+    options = dict(options)
+    futures = dataset.futures()
+    data = {key: futures[key].result() for key in widget_inputs(WIDGETS_BY_NAME["blocked_items_table"], filters)}
+    if filters:
+        data = data["facet_index"].filter_data(data, filters)
+    result = BlockedIndex.for_data(data).query(
+        options["blocked_sort"], options["blocked_q"], options["blocked_page"], BLOCKED_PAGE_SIZE
+    )
+    return app.response_class(json.dumps(result), mimetype="application/json")
+
+
+def portfolio_summaries():
+    """
+    Return the summaries of every served project (the default one, then TAIGA_PROJECT_IDS), the
+    names of those without one, and the versions of the summaries, for cache keys. Each project's
+    held summary is reused; the refreshes of stale projects all start before any is waited for,
+    so they run in parallel, taking turns on the shared page scheduler.
+    """
+    projects = [None] + sorted(projectid for projectid in SERVED_PROJECTS if canonical_project(projectid) is not None)
+    datasets = [project_dataset(projectid) for projectid in projects]
+    # Read before the data: a refresh landing in between can only pair newer data with older versions
+    versions = tuple(dataset.versions.get("portfolio_summary") for dataset in datasets)
+    futures = [dataset.futures()["portfolio_summary"] for dataset in datasets]
+    summaries, unavailable = [], []
+    for projectid, future in zip(projects, futures):
+        summary = future.result()
+        if summary is None:
+            unavailable.append(f"Project {projectid or os.environ.get('TAIGA_PROJECT_ID')}")
+        else:
+            summaries.append(summary)
+    return summaries, unavailable, versions
+
+
+@app.route("/portfolio/")
+def portfolio():
+    """Epic progress, open issues and blocked items of every served project, rolled up on one page."""
+    check_api_key()
+    options = parse_view_options(request.args)
+    summaries, unavailable, versions = portfolio_summaries()
+    key = ("portfolio", versions, widget_cache_key(WIDGETS_BY_NAME["blocked_items_table"], (), options))
+    page_html = view_cache.get(key)
+    if page_html is None:
+        page_html = render_template(
+            "portfolio.html",
+            projects=len(summaries) + len(unavailable),
+            widgets=merge_summaries(summaries).widgets_html(options, unavailable),
+        )
+        view_cache.set(key, page_html)
+    return page_html
+
+
+@app.route("/portfolio/blocked")
+def portfolio_blocked_items():
+    """One page of the portfolio's blocked items table as JSON; see blocked_items."""
+    check_api_key()
+    options = dict(parse_view_options(request.args))
+    summaries, _, _ = portfolio_summaries()
+    result = merge_summaries(summaries).blocked_index.query(
+        options["blocked_sort"], options["blocked_q"], options["blocked_page"], BLOCKED_PAGE_SIZE
     )
-    task_status_breakdown_html = get_task_status_breakdown_html(
-        [], tasks, issues, sprints, "Task/Issue Status Breakdown by Sprint (Work Items)"
+    return app.response_class(json.dumps(result), mimetype="application/json")
+
+
+@app.route("/health")
+def health():
+    """Liveness check for load balancers and autoscalers; answers without loading data or rendering."""
+    return app.response_class(json.dumps({"status": "ok"}), mimetype="application/json")
+
+
+@app.route("/cache/stats")
+def cache_stats():
+    check_api_key()
+    return app.response_class(json.dumps(view_cache.stats()), mimetype="application/json")
+
+
+@app.route("/webhook", methods=["POST"])
+def taiga_webhook():
+    """
+    Receive a Taiga webhook and apply it to the held dataset. Only widgets reading the
+    updated list (or values derived from it) re-render; see widget_data_key.
+    """
+    if not TAIGA_WEBHOOK_KEY:
+        abort(404)
+    body = request.get_data()
+    if not verify_signature(TAIGA_WEBHOOK_KEY, body, request.headers.get("X-TAIGA-WEBHOOK-SIGNATURE")):
+        abort(403)
+    try:
+        payload = json.loads(body)
+        key = event_key(payload)
+    except ValueError:
+        abort(400)
+    changed = None
+    if key is not None:
+        project = payload["data"].get("project")
+        project = project.get("id") if isinstance(project, dict) else project
+        projectid = canonical_project(project)
+        if project is None or (projectid is not None and projectid not in SERVED_PROJECTS):
+            # No project, or not one this process serves: accept the event but change nothing
+            result = {"applied": False, "changed": []}
+            return app.response_class(json.dumps(result), status=202, mimetype="application/json")
+        # A served project whose dataset is not held yet skips the update: its first refresh fetches the change anyway
+        held = dataset if projectid is None else project_datasets.get(projectid)
+        if held is not None:
+            changed = held.apply_update(key, lambda data: apply_event(data, payload))
+    result = {"applied": changed is not None, "changed": sorted(changed or ())}
+    return app.response_class(json.dumps(result), mimetype="application/json")
+
+
+@app.route("/admin/config", methods=["GET", "POST"])
+def admin_config():
+    """
+    Show (GET) or change (POST a JSON object, e.g. {"USER_STORY_DONE_STATUSES": "done,archived"})
+    the status and retention settings. Changes are not persisted; use DASHBOARD_CONFIG_FILE for that.
+    """
+    check_admin_key()
+    if request.method == "POST":
+        values = request.get_json(silent=True)
+        if not isinstance(values, dict):
+            abort(400)
+        try:
+            changed = config.update(values)
+        except ValueError as exc:
+            abort(400, str(exc))
+        apply_config_change(changed)
+    return app.response_class(json.dumps(config.as_dict()), mimetype="application/json")
+
+
+def apply_config_change(changed):
+    """Re-classify the held dataset for changed settings; widgets re-render as their inputs change."""
+    if changed:
+        timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        print(f"[{timestamp}] Dashboard settings changed: {', '.join(sorted(changed))}")
+        with project_datasets_lock:
+            held = [dataset] + list(project_datasets.values())
+        for project in held:
+            project.recompute(*changed)
+
+
+if config.path:
+    config.load_file()
+    config.watch(apply_config_change, interval=get_int_from_env("CONFIG_WATCH_INTERVAL", 5))
+
+
+def stale_endpoints(dataset):
+    """(endpoint, fetch time) of every endpoint served from its last good value after a failed fetch."""
+    return [
+        (name.replace("_", " "), datetime.utcfromtimestamp(fetched_at).strftime('%Y-%m-%d %H:%M UTC'))
+        for name, fetched_at in sorted(dataset.stale.items())
+    ]
+
+
+def widget_key(projectid, widget, versions, filters, options):
+    """View cache key of a widget render of a project's data."""
+    return ("widget", projectid, widget_data_key(widget, versions, filters), widget_cache_key(widget, filters, options))
+
+
+def submit_widget_render(key, render):
+    """
+    Run render() on widget_executor and cache its result under the view cache key; requests
+    for a key already rendering share that render. The result is also kept as the widget's
+    last render for its project and view (key[1], key[3]), which pages show while a newer render is late.
+    """
+
+    def run():
+        try:
+            html = render()
+            view_cache.set(key, html)
+            view_cache.set(("last widget", key[1], key[3]), html)
+            return html
+        finally:
+            with widget_renders_lock:
+                widget_renders.pop(key, None)
+
+    with widget_renders_lock:
+        future = widget_renders.get(key)
+        if future is None:
+            future = widget_renders[key] = widget_executor.submit(run)
+    return future
+
+
+def render_widgets_within_budget(all_data, filters, options, versions, projectid=None):
+    """
+    Render the widgets in parallel, reusing the cached render of every widget whose inputs did
+    not change, and wait at most WIDGET_RENDER_BUDGET_MS for the rest. Returns (widget name -> html,
+    names of the widgets still rendering); those get their last render for this view, or "".
+    """
+    widgets_html = {}
+    renders = {}
+    for widget in WIDGETS:
+        key = widget_key(projectid, widget, versions, filters, options)
+        html = view_cache.get(key)
+        if html is None:
+            renders[widget.name] = submit_widget_render(
+                key, lambda widget=widget: render_widget(widget, all_data, filters, options)
+            )
+        else:
+            widgets_html[widget.name] = html
+    done, _ = wait(renders.values(), timeout=WIDGET_RENDER_BUDGET_MS / 1000 or None)
+    pending = set()
+    for name, future in renders.items():
+        if future in done:
+            widgets_html[name] = future.result()
+        else:
+            pending.add(name)
+            last_key = ("last widget", projectid, widget_cache_key(WIDGETS_BY_NAME[name], filters, options))
+            widgets_html[name] = view_cache.get(last_key) or ""
+    if pending:
+        timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        print(f"[{timestamp}] Widgets over the {WIDGET_RENDER_BUDGET_MS} ms render budget: {', '.join(sorted(pending))}")
+    return widgets_html, pending
+
+
+def project_title(project):
+    """Page heading of a project record, which is None when its fetch failed."""
+    if not project:
+        return "Taiga project (data unavailable)"
+    return f"{project['name']} ({project['id']})"
+
+
+def project_logo(project):
+    return (project or {}).get("logo_small_url") or ""
+
+
+def render_dashboard(all_data, filters, options, version=None, versions=None, cache_key=None, dataset=None, projectid=None):
+    """
+    Render the page. With versions, widgets render within the budget (see render_widgets_within_budget)
+    and late ones are loaded by the browser from /widget/<name>; only a page with every widget
+    rendered is cached under cache_key and stored for the next warm start of dataset, which
+    all_data (version) was taken from.
+    """
+    project = all_data["project"]
+    pending = ()
+    if versions is None:
+        widgets_html = {
+            widget.name: render_widget(widget, all_data, filters, options) for widget in WIDGETS
+        }
+    else:
+        widgets_html, pending = render_widgets_within_budget(all_data, filters, options, versions, projectid)
+
+    page_html = render_template(
+        "index.html",
+        project_name=project_title(project),
+        logo=project_logo(project),
+        filters=filters,
+        unfiltered=UNFILTERED_WIDGETS,
+        projectid=projectid,
+        stale=stale_endpoints(dataset) if dataset is not None else [],
+        pending=pending,
+        widgets=widgets_html
     )
-    task_assignment_heatmap_html = get_task_assignment_heatmap_html(
-        users, userstories, tasks, issues
+    if not pending:
+        if cache_key is not None:
+            view_cache.set(cache_key, page_html)
+        # Keep the default view next to the stored dataset for the next warm start
+        if dataset is not None and (filters, options) == DEFAULT_VIEW:
+            dataset.store_page(page_html, version)
+    return page_html
+
+
+def render_lazy_dashboard(dataset, projectid, filters):
+    """Render only the page shell; widget sections are filled in by the browser on demand."""
+    project = dataset.futures()["project"].result()
+
+    return render_template(
+        "index.html",
+        project_name=project_title(project),
+        logo=project_logo(project),
+        filters=filters,
+        unfiltered=UNFILTERED_WIDGETS,
+        projectid=projectid,
+        stale=stale_endpoints(dataset),
+        lazy=True,
+        plotly_js_url=get_plotly_cdn_url(),
+        widgets={}
     )
-    task_createdby_heatmap_html = get_task_createdby_heatmap_html(
-        users, userstories, tasks, issues
+
+
+def stream_dashboard(dataset, projectid, filters, options):
+    """
+    Stream index.html top to bottom. The shell goes out immediately, the header once the
+    project record arrives, and every widget renders in the background as soon as the
+    endpoints it needs have been fetched, unless the view cache already holds its render.
+    """
+    futures = dataset.futures()
+    project = futures["project"]
+    widgets_html = {}
+    for widget in WIDGETS:
+        key = widget_key(projectid, widget, dataset.versions, filters, options)
+        html = view_cache.get(key)
+        if html is None:
+            html = PendingValue(submit_widget_render(
+                key, lambda widget=widget: render_widget_from_futures(widget, futures, filters, options)
+            ))
+        widgets_html[widget.name] = html
+
+    return stream_template(
+        "index.html",
+        project_name=PendingValue(project, project_title),
+        logo=PendingValue(project, project_logo),
+        filters=filters,
+        unfiltered=UNFILTERED_WIDGETS,
+        projectid=projectid,
+        stale=stale_endpoints(dataset),
+        widgets=widgets_html
     )
-    tag_cloud_html = get_tag_cloud_html(userstories, tasks, issues)
-    tag_bar_chart_html = get_tag_bar_chart_html(userstories, tasks, issues)
-    issue_type_severity_priority_donut_charts_html = (
-        get_issue_type_severity_priority_donut_charts_html(
-            issues, issue_types, severities, priorities
+
+
+def warm_start():
+    """Load the last stored dataset and its rendered default page, if any, before the first request."""
+    if not dataset.warm_start():
+        return
+    page_html = dataset.load_page()
+    if page_html is not None:
+        view_cache.set(("page", None, dataset.version) + DEFAULT_VIEW, page_html)
+
+
+if WARM_START:
+    warm_start()
+
+
+class DashboardASGI:
+    """
+    ASGI serving mode, e.g. `uvicorn TaigaDashboard:asgi_app`. Dashboard pages (inline render
+    mode) and widget fragments of every served project are served on the event loop: cached
+    renders are returned right away, and a request that needs data awaits the refresh without holding a thread, so one
+    process keeps up with many more concurrent viewers. Only rendering runs on a thread.
+    Everything else, including API key errors, is passed to the Flask app through asgiref.
+    """
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi_app = WsgiToAsgi(flask_app) if WsgiToAsgi is not None else None
+        self._rendering = {}  # view cache key -> task rendering it, shared by concurrent requests
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        rendered = None
+        if scope["type"] == "http" and scope["method"] == "GET":
+            args = MultiDict(parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True))
+            if not API_KEY or args.get("key") == API_KEY:
+                rendered = await self.render(scope["path"], args, scope["query_string"])
+        if rendered is not None:
+            body, hit = rendered
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/html; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"x-view-cache", b"hit" if hit else b"miss"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        if self.wsgi_app is None:
+            raise RuntimeError("Routes other than dashboard pages and widget fragments need the asgiref package under ASGI")
+        await self.wsgi_app(scope, receive, send)
+
+    async def render(self, path, args, query_string=b""):
+        """
+        Return the encoded page or widget fragment at path and whether it came from the view cache,
+        or None to leave the path to Flask.
+        """
+        request_path = path
+        projectid = None
+        match = PROJECT_PATH.fullmatch(path)
+        if match:
+            projectid, path = canonical_project(int(match.group(1))), match.group(2)
+        dataset = project_dataset(projectid)
+        if dataset is None:
+            return None
+        filters, options = parse_view_params(args)
+        if path == "/" and RENDER_MODE == "inline":
+            all_data = await dataset.get_async()
+            version, versions = dataset.version, dataset.versions
+            key = ("page", projectid, version, filters, options)
+            html = view_cache.get(key)
+            hit = html is not None
+            if html is None:
+                task = self._rendering.get(key)
+                if task is None:
+                    render = lambda: render_dashboard(
+                        all_data, filters, options, version, versions, cache_key=key, dataset=dataset, projectid=projectid
+                    )
+                    task = self._rendering[key] = asyncio.ensure_future(
+                        self.render_page(render, request_path, query_string)
+                    )
+                    task.add_done_callback(lambda _: self._rendering.pop(key, None))
+                html = await asyncio.shield(task)
+        elif path.startswith("/widget/") and path[len("/widget/"):] in WIDGETS_BY_NAME:
+            widget = WIDGETS_BY_NAME[path[len("/widget/"):]]
+            futures = dataset.futures()
+            key = widget_key(projectid, widget, dataset.versions, filters, options)
+            for name in widget_inputs(widget, filters):
+                await asyncio.wrap_future(futures[name])
+            html = view_cache.get(key)
+            hit = html is not None
+            if html is None:
+                render = lambda: render_widget_from_futures(widget, futures, filters, options)
+                html = await asyncio.wrap_future(submit_widget_render(key, render))
+        else:
+            return None
+        return html.encode("utf-8"), hit
+
+    async def render_page(self, render, path, query_string):
+        return await asyncio.get_running_loop().run_in_executor(None, self.render_in_app, render, path, query_string)
+
+    def render_in_app(self, render, path, query_string):
+        """Run render() in a request context for path, as templates build widget URLs with url_for."""
+        with self.flask_app.test_request_context(path, query_string=query_string.decode("latin-1")):
+            return render()
+
+
+asgi_app = DashboardASGI(app)
+
+
+def export_project(projectid, out_dir):
+    """Fetch and render one project's dashboard the same way home() does and write it as a static site."""
+    with app.app_context():
+        all_data = fetch_all_parallel(create_taiga_client(projectid))
+        # A static site has no /blocked endpoint, so the blocked items table is rendered in full
+        options = parse_view_options({}) + (("blocked_url", None),)
+        page_html = render_dashboard(all_data, (), options)
+    write_static_site(page_html, out_dir)
+    return out_dir
+
+
+@app.cli.command("export-static")
+@click.option("--out", "out_dir", default="static_site", show_default=True, help="Output directory.")
+@click.option(
+    "--project",
+    "projects",
+    multiple=True,
+    type=int,
+    help="Taiga project id (default: TAIGA_PROJECT_ID). Repeat to export several projects "
+    "in parallel, each into <out>/<project id>.",
+)
+@click.option("--workers", default=4, show_default=True, help="Parallel processes for multiple projects.")
+@click.option("--interval", default=0, show_default=True, help="Re-export every N seconds; 0 exports once.")
+def export_static(out_dir, projects, workers, interval):
+    """Export the dashboard as static files that any static file server can serve."""
+    while True:
+        if len(projects) <= 1:
+            print(f"Exported dashboard to {export_project(projects[0] if projects else None, out_dir)}")
+        else:
+            from concurrent.futures import ProcessPoolExecutor  # export-only; kept out of the app's startup
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                future_to_project = {
+                    executor.submit(export_project, projectid, os.path.join(out_dir, str(projectid))): projectid
+                    for projectid in projects
+                }
+                for future in as_completed(future_to_project):
+                    projectid = future_to_project[future]
+                    try:
+                        print(f"Exported project {projectid} to {future.result()}")
+                    except Exception as exc:
+                        print(f"project {projectid} generated an exception: {exc}")
+        if not interval:
+            break
+        time.sleep(interval)
+
+
+@app.cli.command("send-webhook")
+@click.argument("payloads", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option("--url", default="http://127.0.0.1:5000/webhook", show_default=True, help="Webhook endpoint to post to.")
+def send_webhook(payloads, url):
+    """Sign webhook payload files (e.g. fixtures/webhooks/*.json) with TAIGA_WEBHOOK_KEY and post them."""
+    if not TAIGA_WEBHOOK_KEY:
+        raise click.ClickException("TAIGA_WEBHOOK_KEY is not set")
+    for path in payloads:
+        with open(path, "rb") as f:
+            body = f.read()
+        response = requests.post(
+            url,
+            data=body,
+            headers={
+                "Content-Type": "application/json",
+                "X-TAIGA-WEBHOOK-SIGNATURE": sign_payload(TAIGA_WEBHOOK_KEY, body),
+            },
         )
+        print(f"{path}: {response.status_code} {response.text.strip()}")
+
+
+def simulator_options(function):
+    """Shared click options sizing the simulated Taiga project."""
+    for option in reversed([
+        click.option("--stories", default=500, show_default=True, help="User stories in the simulated project."),
+        click.option("--tasks", default=1500, show_default=True, help="Tasks in the simulated project."),
+        click.option("--issues", default=300, show_default=True, help="Issues in the simulated project."),
+        click.option("--latency", default=0.02, show_default=True, help="Seconds added to every simulated Taiga response."),
+    ]):
+        function = option(function)
+    return function
+
+
+@app.cli.command("simulate-taiga")
+@click.option("--port", default=9000, show_default=True, help="Port to listen on.")
+@simulator_options
+def simulate_taiga(port, stories, tasks, issues, latency):
+    """Serve a simulated Taiga API, e.g. as TAIGA_BASE_URL of a dashboard under load-test --url."""
+    from app.taiga_simulator import TaigaSimulator
+
+    simulator = TaigaSimulator(port=port, latency=latency, stories=stories, tasks=tasks, issues=issues)
+    print(f"Simulated Taiga API at {simulator.url}; any project id and credentials are accepted")
+    try:
+        simulator.server.serve_forever()
+    except KeyboardInterrupt:
+        simulator.stop()
+
+
+def start_server_process(server, env, verbose):
+    """Start the dashboard in a child process on a free local port; return (process, base URL) once it answers."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    if server == "asgi":
+        command = ["-m", "uvicorn", "TaigaDashboard:asgi_app", "--log-level", "warning"]
+    else:
+        command = ["-m", "flask", "--app", "TaigaDashboard", "run"]
+    output = None if verbose else subprocess.DEVNULL
+    process = subprocess.Popen(
+        [sys.executable] + command + ["--host", "127.0.0.1", "--port", str(port)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        stdout=output,
+        stderr=output,
     )
-    blocked_items_table_html = get_blocked_items_table_html(epics, userstories, tasks, issues)
+    url = f"http://127.0.0.1:{port}"
+    while True:
+        if process.poll() is not None:
+            raise click.ClickException(f"The {server} server exited with code {process.returncode}; see --verbose")
+        try:
+            requests.get(url + "/cache/stats", timeout=1)
+            return process, url
+        except requests.RequestException:
+            time.sleep(0.2)
 
-    return render_template(
-        "index.html",
-        project_name=f"{project_name} ({project_id})",
-        logo=logo,
-        dashboard_config_html=dashboard_config_html,
-        epic_progress_bar_html=epic_progress_bar_html,
-        user_story_status_breakdown_html=user_story_status_breakdown_html,
-        task_status_breakdown_html=task_status_breakdown_html,
-        task_assignment_heatmap_html=task_assignment_heatmap_html,
-        task_createdby_heatmap_html=task_createdby_heatmap_html,
-        tag_cloud_html=tag_cloud_html,
-        tag_bar_chart_html=tag_bar_chart_html,
-        issue_type_severity_priority_donut_charts_html=issue_type_severity_priority_donut_charts_html,
-        blocked_items_table_html=blocked_items_table_html
+
+@app.cli.command("load-test")
+@click.option("--clients", default=20, show_default=True, help="Concurrent clients, each sending one request at a time.")
+@click.option("--duration", default=30.0, show_default=True, help="Seconds to run.")
+@click.option(
+    "--path",
+    "paths",
+    multiple=True,
+    default=["/"],
+    show_default=True,
+    help="Path to request, e.g. / or /widget/tag_cloud; repeat to mix several.",
+)
+@click.option(
+    "--miss-ratio",
+    default=0.1,
+    show_default=True,
+    help="Share of requests with a unique blocked_q search term, which the page and the blocked items table "
+    "cannot answer from the view cache. Hits and misses are reported as the server counted them.",
+)
+@click.option(
+    "--url",
+    default=None,
+    help="Load-test a dashboard that is already running there instead of starting one.",
+)
+@click.option("--pid", type=int, default=None, help="Process id of the --url server, for its memory usage.")
+@click.option(
+    "--server",
+    type=click.Choice(["wsgi", "asgi"]),
+    default="wsgi",
+    show_default=True,
+    help="Server to start: flask run (threaded WSGI) or uvicorn with asgi_app (ASGI).",
+)
+@click.option("--verbose", is_flag=True, help="Show the started server's output.")
+@simulator_options
+def load_test(clients, duration, paths, miss_ratio, url, pid, server, verbose, stories, tasks, issues, latency):
+    """
+    Load-test the dashboard and report throughput, latency percentiles, error rate and memory.
+
+    Without --url the dashboard is started in a child process against a simulated Taiga API
+    (project LOAD_TEST_PROJECT_ID, stored in DATA_DIR like any other project), and the
+    reported memory is that process's.
+    """
+    from app.taiga_loadtest import format_report, run_load_test
+    from app.taiga_simulator import TaigaSimulator
+
+    simulator = process = None
+    params = {"key": API_KEY} if API_KEY else {}
+    try:
+        if url is None:
+            simulator = TaigaSimulator(latency=latency, stories=stories, tasks=tasks, issues=issues).start()
+            env = dict(
+                os.environ,
+                TAIGA_BASE_URL=simulator.url,
+                TAIGA_USERNAME="load-test",
+                TAIGA_PASSWORD="load-test",
+                TAIGA_PROJECT_ID=str(LOAD_TEST_PROJECT_ID),
+                WARM_START="false",
+            )
+            process, url = start_server_process(server, env, verbose)
+            pid = process.pid
+        started = time.perf_counter()
+        warm_up = requests.get(url + paths[0], params=params, timeout=600)
+        print(f"Warm-up request: {warm_up.status_code} in {time.perf_counter() - started:.1f} s")
+        print(f"Running {clients} clients for {duration:.0f} s against {url} ({', '.join(paths)}, {miss_ratio:.0%} with a unique search term)")
+        stats = run_load_test(url, list(paths), clients, duration, miss_ratio, API_KEY, pid)
+        print(format_report(stats))
+        cache = requests.get(url + "/cache/stats", params=params, timeout=60)
+        if cache.ok:
+            print(f"View cache: {cache.text.strip()}")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        if simulator is not None:
+            simulator.stop()
+
+
+@contextmanager
+def empty_history_db():
+    """Crawl into a new, empty history DB, so every item's history is requested again."""
+    path = taiga_history.HISTORY_DB_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        taiga_history.HISTORY_DB_PATH = os.path.join(tmp, "history.db")
+        try:
+            yield
+        finally:
+            taiga_history.HISTORY_DB_PATH = path
+
+
+@app.cli.command("record-cassette")
+@click.option("--out", default="taiga-cassette.json.gz", show_default=True, help="Cassette file to write.")
+@click.option("--project", "projectid", type=int, default=None, help="Taiga project id (default: TAIGA_PROJECT_ID).")
+@click.option(
+    "--anonymize",
+    is_flag=True,
+    help="Replace names, e-mails, subjects, descriptions, comments and tags with same-length stand-ins.",
+)
+def record_cassette(out, projectid, anonymize):
+    """Record the Taiga responses of one full refresh, item histories included, for offline replays."""
+    client = create_taiga_client(projectid, shared=False)
+    cassette = Cassette(client.base_url, client.projectid, anonymize)
+    client.record(cassette)
+    with empty_history_db():
+        fetch_all_parallel(client)
+    cassette.save(out)
+    print(f"Recorded {len(cassette.interactions)} responses to {out} ({os.path.getsize(out) / 1024:.0f} KB)")
+
+
+@app.cli.command("benchmark-cassette")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--timing",
+    type=click.Choice(["original", "fast"]),
+    default="fast",
+    show_default=True,
+    help="Replay each response after its recorded duration, or at once.",
+)
+@click.option("--repeat", default=3, show_default=True, help="Number of refreshes to time.")
+def benchmark_cassette(path, timing, repeat):
+    """
+    Time full refreshes and renders of the default dashboard replayed from a cassette.
+    Set TAIGA_CASSETTE to serve the whole app from one instead.
+    """
+    cassette = load_cassette(path)
+    print(
+        f"{len(cassette.interactions)} responses of project {cassette.projectid}, "
+        f"recorded {cassette.recorded_at}{' (anonymized)' if cassette.anonymize else ''}"
     )
+    for run in range(1, repeat + 1):
+        with empty_history_db():
+            started = time.perf_counter()
+            all_data = fetch_all_parallel(create_replay_client(cassette, timing))
+            fetched = time.perf_counter()
+            render_dashboard(all_data, (), parse_view_options({}))
+        print(f"Run {run}: fetch {fetched - started:.2f} s, render {time.perf_counter() - fetched:.2f} s")
+
+
+@app.cli.command("benchmark-startup")
+@click.option("--runs", default=5, show_default=True, help="Cold starts to take the median of.")
+@click.option(
+    "--render",
+    is_flag=True,
+    help="Also time the first dashboard render; fetches from Taiga, so best combined with TAIGA_CASSETTE.",
+)
+@click.option(
+    "--history",
+    default=os.path.join(DATA_DIR, "startup-benchmarks.jsonl"),
+    show_default=True,
+    help="JSON lines file each result is appended to, to track startup time across changes.",
+)
+def benchmark_startup(runs, render, history):
+    """Time cold starts of the app in fresh interpreters: import, first health check and first render."""
+    from app.taiga_startup import import_profile, measure_startup, track
 
-def fetch_all_parallel(client):
-    tasks = {
-        "epics": lambda: client.get_epics(),
-        "userstories": lambda: client.get_stories(),
-        "tasks": lambda: client.get_tasks(),
-        "issues": lambda: client.get_issues(),
-        "sprints": lambda: client.get_sprints(),
-        "project": lambda: client.get_project(),
-        "users": lambda: client.get_users(),
-        "severities": lambda: client.get_severities(),
-        "priorities": lambda: client.get_priorities(),
-        "issue_types": lambda: client.get_issue_types(),
-    }
-    results = {}
-
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        future_to_name = {executor.submit(func): name for name, func in tasks.items()}
-        for future in as_completed(future_to_name):
-            name = future_to_name[future]
-            try:
-                results[name] = future.result()
-            except Exception as exc:
-                print(f"{name} generated an exception: {exc}")
-                results[name] = None
-    return results
+    summary = measure_startup(runs, render)
+    summary["slowest_imports"] = import_profile()
+    previous = track(history, summary)
+    for key, label in (("import_s", "Import"), ("health_s", "First health check"), ("first_page_s", "First page")):
+        if key in summary:
+            change = ""
+            if previous and previous.get(key):
+                change = f" ({(summary[key] / previous[key] - 1):+.0%} since {previous['revision'] or previous['recorded_at']})"
+            print(f"{label}: {summary[key] * 1000:.0f} ms{change}")
+    print(f"Modules loaded: {summary['modules']:.0f}, status codes: {summary['statuses']}")
+    print("Slowest imports: " + ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in summary["slowest_imports"]))
 
 
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
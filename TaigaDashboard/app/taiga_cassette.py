@@ -0,0 +1,203 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+CASSETTE_FORMAT = 1
+
+# Response fields that are never written to a cassette
+SECRET_FIELDS = frozenset(("auth_token", "refresh"))
+SECRET_HEADERS = frozenset(("set-cookie",))
+
+# With anonymize, every string inside these fields is replaced by a same-length stand-in. Equal
+# values get equal stand-ins within a cassette, so names still join across endpoints. Status,
+# priority and sprint names are kept: the dashboard's settings and charts depend on them.
+ANONYMIZED_FIELDS = frozenset((
+    "subject", "description", "description_html", "blocked_note", "blocked_note_html",
+    "comment", "comment_html", "username", "full_name", "full_name_display", "email", "bio",
+    "photo", "big_photo", "gravatar_id", "tags", "user", "owner", "assigned_to",
+    "owner_extra_info", "assigned_to_extra_info",
+))
+# Fields of the project record itself that name the project
+ANONYMIZED_PROJECT_FIELDS = ("name", "slug", "logo_small_url", "logo_big_url")
+
+
+def request_key(method, url):
+    """Identify a request by method, path and sorted query; the host is left out, so replays work from any base URL."""
+    parts = urlsplit(url)
+    return f"{method} {parts.path}?{urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))}"
+
+
+def pseudonym(value, salt):
+    """Return value with every letter and digit replaced, keeping its length, spaces and punctuation."""
+    digest = hashlib.blake2b(value.encode("utf-8"), key=salt, digest_size=32).hexdigest()
+    stream = iter(digest * (len(value) // len(digest) + 1))
+    return "".join(next(stream) if char.isalnum() else char for char in value)
+
+
+def anonymize(value, salt, inside=False):
+    """Return a copy of a JSON value with the strings in ANONYMIZED_FIELDS replaced by pseudonyms."""
+    if isinstance(value, dict):
+        return {
+            key: anonymize(item, salt, inside or key in ANONYMIZED_FIELDS)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [anonymize(item, salt, inside) for item in value]
+    if inside and isinstance(value, str) and not value.startswith("#"):  # tag colors stay
+        return pseudonym(value, salt)
+    return value
+
+
+def strip_secrets(value):
+    if isinstance(value, dict):
+        return {key: "redacted" if key in SECRET_FIELDS else strip_secrets(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [strip_secrets(item) for item in value]
+    return value
+
+
+class Cassette:
+    """
+    Recorded Taiga responses, stored as gzip-compressed JSON: for each request its key (see
+    request_key), status, response headers (pagination included), body and duration. Auth
+    tokens and cookies are always dropped; with anonymize, personal and free-text fields are too.
+    """
+
+    def __init__(self, base_url=None, projectid=None, anonymize=False, interactions=None, recorded_at=None):
+        self.base_url = base_url
+        self.projectid = projectid
+        self.anonymize = anonymize
+        self.interactions = interactions or []
+        self.recorded_at = recorded_at or datetime.utcnow().isoformat(timespec="seconds")
+        self._salt = os.urandom(16)  # per cassette, so stand-ins cannot be matched across cassettes
+        self._lock = threading.Lock()
+        self._index = None
+
+    def add(self, request, response, elapsed):
+        body = response.content.decode(response.encoding or "utf-8", errors="replace")
+        if "json" in response.headers.get("Content-Type", "") and body:
+            data = strip_secrets(json.loads(body))
+            if self.anonymize:
+                data = anonymize(data, self._salt)
+                if isinstance(data, dict) and urlsplit(request.url).path.rstrip("/").split("/")[-2:-1] == ["projects"]:
+                    data.update({
+                        field: pseudonym(data[field], self._salt)
+                        for field in ANONYMIZED_PROJECT_FIELDS if isinstance(data.get(field), str)
+                    })
+            body = json.dumps(data)
+        interaction = {
+            "request": request_key(request.method, request.url),
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {name: value for name, value in response.headers.items() if name.lower() not in SECRET_HEADERS},
+            "body": body,
+            "elapsed": round(elapsed, 6),
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+            self._index = None
+
+    def responses(self):
+        """Return request key -> list of its recorded interactions, in recording order."""
+        with self._lock:
+            if self._index is None:
+                self._index = {}
+                for interaction in self.interactions:
+                    self._index.setdefault(interaction["request"], []).append(interaction)
+            return self._index
+
+    def save(self, path):
+        document = {
+            "format": CASSETTE_FORMAT,
+            "base_url": self.base_url,
+            "projectid": self.projectid,
+            "anonymized": self.anonymize,
+            "recorded_at": self.recorded_at,
+            "interactions": self.interactions,
+        }
+        with gzip.open(path, "wt", encoding="utf-8", compresslevel=9) as f:
+            json.dump(document, f)
+
+    @classmethod
+    def load(cls, path):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            document = json.load(f)
+        if document.get("format") != CASSETTE_FORMAT:
+            raise ValueError(f"{path} is not a cassette of format {CASSETTE_FORMAT}")
+        return cls(
+            document["base_url"], document["projectid"], document["anonymized"],
+            document["interactions"], document["recorded_at"],
+        )
+
+
+@lru_cache(maxsize=4)
+def load_cassette(path):
+    """Load a cassette once per process."""
+    return Cassette.load(path)
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Transport adapter that sends requests as usual and adds every response to a Cassette."""
+
+    def __init__(self, cassette, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        start_time = time.perf_counter()
+        response = super().send(request, **kwargs)
+        response.content  # read the body inside the timing, as a replay serves it whole
+        self.cassette.add(request, response, time.perf_counter() - start_time)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Transport adapter answering requests from a Cassette. The n-th request for a key gets
+    its n-th recorded response (the last one once they run out), after the recorded
+    duration with timing="original" or at once with timing="fast". A request that was not
+    recorded fails like an unreachable server.
+    """
+
+    def __init__(self, cassette, timing="original"):
+        super().__init__()
+        if timing not in ("original", "fast"):
+            raise ValueError(f"timing must be 'original' or 'fast', not {timing!r}")
+        self.cassette = cassette
+        self.timing = timing
+        self._served = {}  # request key -> responses served so far
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        key = request_key(request.method, request.url)
+        recorded = self.cassette.responses().get(key)
+        if not recorded:
+            raise requests.ConnectionError(f"{key} was not recorded in the cassette", request=request)
+        with self._lock:
+            served = self._served.get(key, 0)
+            self._served[key] = served + 1
+        interaction = recorded[min(served, len(recorded) - 1)]
+        if self.timing == "original":
+            time.sleep(interaction["elapsed"])
+        response = requests.Response()
+        response.status_code = interaction["status"]
+        response.reason = interaction["reason"]
+        response.headers = CaseInsensitiveDict(interaction["headers"])
+        response.headers.pop("Content-Encoding", None)  # the body is stored decoded
+        response._content = interaction["body"].encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
@@ -1,16 +1,48 @@
 import requests
+import threading
 import time
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from app.taiga_scheduler import page_count
+from app.taiga_cassette import RecordingAdapter, ReplayAdapter
+
+
+class TaigaSession(requests.Session):
+    """
+    HTTP session whose connection pool holds pool_size connections per host, so it can be
+    shared by the clients of many projects. auth_lock makes those clients authenticate once.
+    """
+
+    def __init__(self, pool_size=10):
+        super().__init__()
+        adapter = HTTPAdapter(pool_maxsize=pool_size)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+        self.auth_lock = threading.Lock()
+
 
 class TaigaClient:
-    def __init__(self, base_url, username, password, projectid):
+    def __init__(self, base_url, username, password, projectid, scheduler=None, session=None, metadata_cache=None):
         self.base_url = base_url.rstrip("/")
-        self.session = requests.Session()
+        self.scheduler = scheduler  # PageScheduler running the page requests, if any
+        self.session = session or TaigaSession()  # may be shared with the clients of other projects
+        self.metadata_cache = metadata_cache  # taiga_dataset.MetadataCache shared across projects, if any
         self.username = username
         self.password = password
         self.projectid = projectid
         self.auth_token = None
-        self.is_authenticated = False
+
+    def record(self, cassette):
+        """Add every response from now on to cassette, a taiga_cassette.Cassette."""
+        self._mount(RecordingAdapter(cassette))
+
+    def replay(self, cassette, timing="original"):
+        """Answer every request from cassette instead of Taiga; timing is "original" or "fast"."""
+        self._mount(ReplayAdapter(cassette, timing))
+
+    def _mount(self, adapter):
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
     def authenticate(self):
         """Authenticate the user and store the session cookie."""
@@ -35,44 +67,89 @@ class TaigaClient:
             raise ValueError("Authentication failed. Please check your credentials.")
 
         self.session.headers.update({"Authorization": f"Bearer {self.auth_token}"})
-        self.is_authenticated = True
+
+    @property
+    def is_authenticated(self):
+        return "Authorization" in self.session.headers
 
     def ensure_authenticated(self):
-        """Ensure the user is authenticated."""
+        """Ensure the session is authenticated; clients sharing it authenticate only once."""
         if not self.is_authenticated:
-            self.authenticate()
+            with self.session.auth_lock:
+                if not self.is_authenticated:
+                    self.authenticate()
+
+    def _get(self, url, params=None):
+        """GET url, authenticating again once if the session's token has expired."""
+        authorization = self.session.headers.get("Authorization")
+        response = self.session.get(url, params=params)
+        if response.status_code == 401 and authorization:
+            with self.session.auth_lock:
+                # Another client of the session may have renewed the token already
+                if self.session.headers.get("Authorization") == authorization:
+                    self.authenticate()
+            response = self.session.get(url, params=params)
+        return response
+
+    def _get_page(self, url, params, page_num):
+        """GET one page of a paginated endpoint and return (items, response headers)."""
+        start_time = time.perf_counter()
+        response = self._get(url, params=params if '?' not in url else None)
+        duration = time.perf_counter() - start_time
+        timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        print(f"[{timestamp}] GET {url} (page {page_num}) took {duration:.3f} seconds")
+        response.raise_for_status()
+        items = response.json()
+        if isinstance(items, dict) and "results" in items:
+            items = items["results"]
+        return items, response.headers
 
     def _paginated_get(self, endpoint, params=None):
         """
         Fetch all items from a paginated Taiga endpoint using pagination headers.
+        With a scheduler, every page is a request queued on it, and the pages after the
+        first are requested together once the first reports how many there are.
         Logs the time for each request.
         """
         params = params or {}
         url = f"{self.base_url}{endpoint}"
-        all_items = []
-        page_num = 1
+        scheduler = self.scheduler
+        size_key = (endpoint, self.projectid)
 
-        while url:
-            start_time = time.perf_counter()
-            response = self.session.get(url, params=params if '?' not in url else None)
-            duration = time.perf_counter() - start_time
-            timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
-            print(f"[{timestamp}] GET {url} (page {page_num}) took {duration:.3f} seconds")
-            response.raise_for_status()
-            items = response.json()
-            if isinstance(items, list):
-                all_items.extend(items)
-            elif isinstance(items, dict) and "results" in items:
-                all_items.extend(items["results"])
-            else:
-                all_items.extend(items)
-            next_url = response.headers.get("x-pagination-next")
-            if next_url:
-                url = next_url if next_url.startswith("http") else f"{self.base_url}{next_url}"
-                params = None
-                page_num += 1
-            else:
-                break
+        def request(priority, url, params, page_num):
+            if scheduler is None:
+                return self._get_page(url, params, page_num)
+            return scheduler.submit(priority, self._get_page, url, params, page_num, group=self.projectid).result()
+
+        priority = scheduler.sizes.get(size_key, 0) if scheduler is not None else 0
+        items, headers = request(priority, url, params, 1)
+        all_items = list(items)
+        counts = page_count(headers, items)
+        if scheduler is not None and counts is not None:
+            total, pages = counts
+            if pages > 1:
+                scheduler.sizes[size_key] = total
+            futures = [
+                scheduler.submit(total, self._get_page, url, {**params, "page": page_num}, page_num, group=self.projectid)
+                for page_num in range(2, pages + 1)
+            ]
+            try:
+                for future in futures:
+                    all_items.extend(future.result()[0])
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+            return all_items
+
+        page_num = 1
+        next_url = headers.get("x-pagination-next")
+        while next_url:
+            url = next_url if next_url.startswith("http") else f"{self.base_url}{next_url}"
+            page_num += 1
+            items, headers = request(priority, url, None, page_num)
+            all_items.extend(items)
+            next_url = headers.get("x-pagination-next")
         return all_items
 
     def get_epics(self):
@@ -146,7 +223,7 @@ class TaigaClient:
         timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
         print(f"[{timestamp}] Fetching project from: {url}")
         start_time = time.perf_counter()
-        response = self.session.get(url)
+        response = self._get(url)
         duration = time.perf_counter() - start_time
         timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
         print(f"[{timestamp}] GET {url} took {duration:.3f} seconds")
@@ -203,4 +280,49 @@ class TaigaClient:
         duration = time.perf_counter() - start_time
         timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
         print(f"[{timestamp}] get_priorities completed in {duration:.3f} seconds")
-        return result
\ No newline at end of file
+        return result
+
+    def get_userstory_statuses(self):
+        self.ensure_authenticated()
+        endpoint = "/api/v1/userstory-statuses"
+        params = {"project": self.projectid}
+        timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        print(f"[{timestamp}] Fetching all user story statuses from: {self.base_url}{endpoint} with params: {params}")
+        start_time = time.perf_counter()
+        result = self._paginated_get(endpoint, params)
+        duration = time.perf_counter() - start_time
+        timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        print(f"[{timestamp}] get_userstory_statuses completed in {duration:.3f} seconds")
+        return result
+
+    def get_task_statuses(self):
+        self.ensure_authenticated()
+        endpoint = "/api/v1/task-statuses"
+        params = {"project": self.projectid}
+        timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        print(f"[{timestamp}] Fetching all task statuses from: {self.base_url}{endpoint} with params: {params}")
+        start_time = time.perf_counter()
+        result = self._paginated_get(endpoint, params)
+        duration = time.perf_counter() - start_time
+        timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        print(f"[{timestamp}] get_task_statuses completed in {duration:.3f} seconds")
+        return result
+
+    def get_issue_statuses(self):
+        self.ensure_authenticated()
+        endpoint = "/api/v1/issue-statuses"
+        params = {"project": self.projectid}
+        timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        print(f"[{timestamp}] Fetching all issue statuses from: {self.base_url}{endpoint} with params: {params}")
+        start_time = time.perf_counter()
+        result = self._paginated_get(endpoint, params)
+        duration = time.perf_counter() - start_time
+        timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        print(f"[{timestamp}] get_issue_statuses completed in {duration:.3f} seconds")
+        return result
+
+    def get_history(self, item_type, item_id):
+        """Fetch the change history of a single item; item_type is 'userstory', 'task', 'issue' or 'epic'."""
+        self.ensure_authenticated()
+        endpoint = f"/api/v1/history/{item_type}/{item_id}"
+        return self._paginated_get(endpoint)
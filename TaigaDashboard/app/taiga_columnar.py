@@ -0,0 +1,222 @@
+import json
+import os
+import shutil
+import time
+from app.taiga_snapshots import DATA_DIR
+from app.taiga_items import compact_items
+
+DATASET_FORMAT = os.getenv("DATASET_FORMAT", "").strip().lower()
+DATASET_DIR = os.getenv("DATASET_DIR", os.path.join(DATA_DIR, "dataset"))
+
+ARROW_ENABLED = DATASET_FORMAT == "arrow"
+pa = None
+if ARROW_ENABLED:
+    # Optional, and only imported when used: pyarrow adds a noticeable share of the app's startup time
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc
+    except ImportError:
+        print("DATASET_FORMAT=arrow needs the pyarrow package; keeping the dataset in memory only")
+        ARROW_ENABLED = False
+
+# Work item lists stored as Arrow IPC files; every other endpoint is small and goes to meta.json
+ITEM_KEYS = {"userstories": "userstory", "tasks": "task", "issues": "issue"}
+
+
+def dataset_path(projectid, name=None):
+    directory = os.path.join(DATASET_DIR, str(projectid))
+    return os.path.join(directory, name) if name else directory
+
+
+def item_schema():
+    """Columns kept for user stories, tasks and issues: only the fields taiga_plotly reads."""
+    text = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("id", pa.int64()),
+        ("ref", pa.int64()),
+        ("subject", pa.string()),
+        ("status", pa.int64()),
+        ("status_name", text),
+        ("is_closed", pa.bool_()),
+        ("is_blocked", pa.bool_()),
+        ("blocked_note", pa.string()),
+        ("assigned_to", pa.int64()),
+        ("assigned_to_name", text),
+        ("owner", pa.int64()),
+        ("milestone", pa.int64()),
+        ("priority", pa.int64()),
+        ("priority_name", text),
+        ("severity", pa.int64()),
+        ("type", pa.int64()),
+        ("user_story", pa.int64()),
+        ("epics", pa.list_(pa.int64())),
+        ("tag_names", pa.list_(text)),
+        ("tag_colors", pa.list_(text)),
+        ("created_date", pa.string()),
+        ("modified_date", pa.string()),
+        ("finished_date", pa.string()),
+    ])
+
+
+def finish_field(item_type):
+    # Taiga names the field finish_date on user stories and finished_date elsewhere
+    return "finish_date" if item_type == "userstory" else "finished_date"
+
+
+def items_to_table(items, item_type):
+    """Flatten Taiga item dicts into an Arrow table with dictionary-encoded status, user and tag columns."""
+    columns = {field.name: [] for field in item_schema()}
+    for item in items or []:
+        assigned = item.get("assigned_to_extra_info") or {}
+        tags = [t for t in item.get("tags") or [] if isinstance(t, (list, tuple)) and len(t) == 2]
+        epics = item.get("epics")
+        row = {
+            "status_name": (item.get("status_extra_info") or {}).get("name"),
+            "assigned_to_name": assigned.get("full_name_display") or assigned.get("username"),
+            "priority_name": (item.get("priority_extra_info") or {}).get("name"),
+            "epics": [e.get("id") for e in epics] if isinstance(epics, list) else None,
+            "tag_names": [t[0] for t in tags],
+            "tag_colors": [t[1] for t in tags],
+            "finished_date": item.get(finish_field(item_type)),
+        }
+        for name, values in columns.items():
+            values.append(row[name] if name in row else item.get(name))
+    schema = item_schema()
+    return pa.table(
+        {field.name: pa.array(columns[field.name], type=field.type) for field in schema},
+        schema=schema,
+    )
+
+
+def table_to_items(table, item_type):
+    """Rebuild Taiga-shaped item dicts, holding only the stored fields, from an Arrow table."""
+    items = []
+    for row in table.to_pylist():
+        item = {
+            key: row[key]
+            for key in (
+                "id", "ref", "subject", "status", "is_closed", "is_blocked", "blocked_note",
+                "assigned_to", "owner", "milestone", "priority", "severity", "type", "user_story",
+                "created_date", "modified_date",
+            )
+        }
+        item["status_extra_info"] = {"name": row["status_name"]}
+        if row["assigned_to_name"]:
+            item["assigned_to_extra_info"] = {"full_name_display": row["assigned_to_name"]}
+        if row["priority_name"]:
+            item["priority_extra_info"] = {"name": row["priority_name"]}
+        if row["epics"] is not None:
+            item["epics"] = [{"id": epic_id} for epic_id in row["epics"]]
+        item["tags"] = [list(tag) for tag in zip(row["tag_names"] or [], row["tag_colors"] or [])]
+        item[finish_field(item_type)] = row["finished_date"]
+        items.append(item)
+    return items
+
+
+def write_atomic(path, write):
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def write_dataset(projectid, data):
+    """
+    Write the fetched endpoints of one refresh: an Arrow IPC file per work item list, in a directory
+    of its own, and meta.json for everything else. meta.json names that directory and is replaced
+    last, so a reader never pairs the tables of one refresh with the metadata of another.
+    Returns the fetch time recorded in meta.json.
+    """
+    fetched_at = time.time()
+    version = f"v{time.time_ns()}-{os.getpid()}"
+    os.makedirs(dataset_path(projectid, version))
+    for key, item_type in ITEM_KEYS.items():
+        table = items_to_table(data.get(key), item_type)
+        with pa.OSFile(table_path(projectid, version, key), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    meta = {key: value for key, value in data.items() if key not in ITEM_KEYS}
+    meta["fetched_at"] = fetched_at
+    meta["version"] = version
+
+    def write_meta(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    write_atomic(dataset_path(projectid, "meta.json"), write_meta)
+    remove_old_versions(projectid, keep=version)
+    return fetched_at
+
+
+def remove_old_versions(projectid, keep):
+    """
+    Delete table directories of earlier refreshes. The one before keep stays, as a reader may have
+    read the previous meta.json and not opened its tables yet.
+    """
+    versions = sorted(
+        (name for name in os.listdir(dataset_path(projectid)) if name.startswith("v") and name != keep),
+        key=lambda name: int(name[1:].partition("-")[0]),
+    )
+    for name in versions[:-1]:
+        shutil.rmtree(dataset_path(projectid, name), ignore_errors=True)
+
+
+def read_meta(projectid, max_age=None):
+    """Return the stored metadata, or None if there is none or it is older than max_age seconds."""
+    try:
+        with open(dataset_path(projectid, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if "version" not in meta:
+        return None  # written before tables were versioned
+    if max_age is not None and time.time() - meta.get("fetched_at", 0) > max_age:
+        return None
+    return meta
+
+
+def table_path(projectid, version, key):
+    return os.path.join(dataset_path(projectid, version), f"{key}.arrow")
+
+
+def read_table(projectid, version, key):
+    """Read an item list of the refresh stored as version through a memory map of its file."""
+    source = pa.memory_map(table_path(projectid, version, key), "r")
+    return pa.ipc.open_file(source).read_all()
+
+
+def load_tasks(projectid, meta):
+    """
+    Return endpoint name -> loader callables that read a stored refresh, like taiga_dataset.fetch_tasks.
+    The widgets read rows, so item lists are converted to WorkItems held by each process, like fetched ones.
+    """
+    tasks = {
+        key: (lambda value=value: value)
+        for key, value in meta.items()
+        if key not in ("fetched_at", "version")
+    }
+    for key, item_type in ITEM_KEYS.items():
+        tasks[key] = lambda key=key, item_type=item_type: compact_items(
+            table_to_items(read_table(projectid, meta["version"], key), item_type)
+        )
+    return tasks
+
+
+def write_page(projectid, fetched_at, html):
+    """Store the default dashboard page rendered from the stored refresh taken at fetched_at."""
+    def write(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"fetched_at": fetched_at, "html": html}, f)
+
+    os.makedirs(dataset_path(projectid), exist_ok=True)
+    write_atomic(dataset_path(projectid, "page.json"), write)
+
+
+def read_page(projectid, fetched_at):
+    """Return the stored default page if it was rendered from the refresh taken at fetched_at."""
+    try:
+        with open(dataset_path(projectid, "page.json"), encoding="utf-8") as f:
+            page = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return page["html"] if page.get("fetched_at") == fetched_at else None
@@ -0,0 +1,186 @@
+import json
+import os
+import threading
+import time
+
+
+def get_int_from_env(var_name, default=0):
+    """Read an integer value from env, or return default."""
+    value = os.getenv(var_name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def get_statuses_from_env(var_name, default=None):
+    """Read a comma-separated status list from env, return as a set of lowercased strings."""
+    value = os.getenv(var_name)
+    if value is None:
+        return set(default or [])
+    return parse_statuses(value)
+
+
+def get_projects_from_env(var_name, default_ttl):
+    """
+    Read a comma-separated project id list from env, each id optionally followed by ":<seconds>",
+    its refresh TTL (e.g. "12,34:300"); return a dict of project id -> TTL. Invalid entries are skipped.
+    """
+    projects = {}
+    for entry in (os.getenv(var_name) or "").split(","):
+        projectid, _, ttl = entry.strip().partition(":")
+        try:
+            projects[int(projectid)] = int(ttl) if ttl.strip() else default_ttl
+        except ValueError:
+            if entry.strip():
+                print(f"Ignoring invalid {var_name} entry: {entry.strip()!r}")
+    return projects
+
+
+def parse_statuses(value):
+    """Parse a comma-separated string or a list of status names into a set of lowercased strings."""
+    if isinstance(value, str):
+        value = value.split(",")
+    return set(str(v).strip().lower() for v in value if str(v).strip())
+
+
+# Setting name prefix of each item type, e.g. USER_STORY_DAYS_AFTER_CLOSE, USER_STORY_DONE_STATUSES
+PREFIXES = {"epic": "EPIC", "userstory": "USER_STORY", "task": "TASK", "issue": "ISSUE"}
+STATUS_BUCKETS = {"done": "DONE", "in_progress": "IN_PROGRESS", "new": "NEW"}
+
+RETENTION_DEFAULTS = {f"{prefix}_DAYS_AFTER_CLOSE": 14 for prefix in PREFIXES.values()}
+STATUS_DEFAULTS = {
+    f"{PREFIXES[item_type]}_{bucket}_STATUSES": [name]
+    for item_type in ("userstory", "task", "issue")
+    for bucket, name in (("DONE", "done"), ("IN_PROGRESS", "in progress"), ("NEW", "new"))
+}
+
+# Dataset keys (see taiga_dataset.DERIVED) that hold each group of settings for one refresh
+CONFIG_KEYS = {"retention_config": RETENTION_DEFAULTS, "status_config": STATUS_DEFAULTS}
+
+
+def settings_from_env():
+    settings = {name: get_int_from_env(name, default) for name, default in RETENTION_DEFAULTS.items()}
+    settings.update({name: get_statuses_from_env(name, default) for name, default in STATUS_DEFAULTS.items()})
+    return settings
+
+
+def parse_settings(values):
+    """Validate a dict of setting name -> value, raising ValueError for unknown names or bad values."""
+    settings = {}
+    for name, value in values.items():
+        if name in RETENTION_DEFAULTS:
+            try:
+                settings[name] = int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{name} must be an integer number of days")
+        elif name in STATUS_DEFAULTS:
+            if not isinstance(value, (str, list)):
+                raise ValueError(f"{name} must be a comma-separated string or a list of status names")
+            settings[name] = parse_statuses(value)
+        else:
+            raise ValueError(f"Unknown setting {name}")
+    return settings
+
+
+class DashboardConfig:
+    """
+    Status mapping and retention settings. Starts from the environment variables and can be
+    changed at runtime with update() or through a JSON file of the same names (see watch),
+    so a change never needs a restart and the loss of every cached refresh.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.env_settings = settings_from_env()
+        self._lock = threading.Lock()
+        self._file_mtime = None
+        self._set(dict(self.env_settings))
+
+    def days_after_close(self, item_type):
+        return self._retention_config[item_type]
+
+    def retention_config(self):
+        """Return {item_type: days after close} for the current settings."""
+        return self._retention_config
+
+    def status_config(self):
+        """Return {item_type: {bucket: status names}} for the current settings."""
+        return self._status_config
+
+    def as_dict(self):
+        return {
+            name: value if isinstance(value, int) else sorted(value)
+            for name, value in self.settings.items()
+        }
+
+    def update(self, values, base=None):
+        """
+        Apply a dict of setting name -> value on top of base (default: the current settings).
+        Returns the CONFIG_KEYS whose settings changed; raises ValueError on invalid settings.
+        """
+        parsed = parse_settings(values)
+        with self._lock:
+            settings = dict(self.settings if base is None else base)
+            settings.update(parsed)
+            changed = {
+                key for key, defaults in CONFIG_KEYS.items()
+                if any(settings[name] != self.settings[name] for name in defaults)
+            }
+            self._set(settings)
+        return changed
+
+    def _set(self, settings):
+        # Build the lookups first so readers never see them out of step with settings
+        retention_config = {
+            item_type: settings[f"{prefix}_DAYS_AFTER_CLOSE"] for item_type, prefix in PREFIXES.items()
+        }
+        status_config = {
+            item_type: {
+                bucket: frozenset(settings[f"{PREFIXES[item_type]}_{name}_STATUSES"])
+                for bucket, name in STATUS_BUCKETS.items()
+            }
+            for item_type in ("userstory", "task", "issue")
+        }
+        self.settings = settings
+        self._retention_config = retention_config
+        self._status_config = status_config
+
+    def load_file(self):
+        """Re-read the config file if it changed; its settings override the environment variables."""
+        if not self.path:
+            return set()
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        if mtime == self._file_mtime:
+            return set()
+        self._file_mtime = mtime
+        values = {}
+        if mtime is not None:
+            with open(self.path, encoding="utf-8") as f:
+                values = json.load(f)
+            if not isinstance(values, dict):
+                raise ValueError(f"{self.path} must hold a JSON object of setting name -> value")
+        return self.update(values, base=self.env_settings)
+
+    def watch(self, on_change, interval=5):
+        """Poll the config file every interval seconds and call on_change(changed keys) after a change."""
+
+        def poll():
+            while True:
+                try:
+                    changed = self.load_file()
+                    if changed:
+                        on_change(changed)
+                except Exception as exc:
+                    print(f"Reloading {self.path} failed: {exc}")
+                time.sleep(interval)
+
+        threading.Thread(target=poll, daemon=True).start()
+
+
+config = DashboardConfig(os.getenv("DASHBOARD_CONFIG_FILE") or None)
@@ -0,0 +1,452 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from app.taiga_plotly import build_status_buckets
+from app.taiga_snapshots import record_snapshot
+from app.taiga_history import get_cycle_times, start_history_crawl
+from app.taiga_index import BlockedIndex, FacetIndex
+from app.taiga_config import config, get_int_from_env
+from app.taiga_items import compact_items
+from app.taiga_portfolio import project_summary
+from app import taiga_columnar
+
+# Endpoints that rarely change are refetched every METADATA_TTL seconds instead of on every refresh
+METADATA_ENDPOINTS = (
+    "project", "users", "severities", "priorities", "issue_types",
+    "userstory_statuses", "task_statuses", "issue_statuses",
+)
+METADATA_TTL = get_int_from_env("METADATA_TTL", 6 * 3600)
+
+
+class MetadataCache:
+    """
+    METADATA_ENDPOINTS values of every project, shared by the clients of all projects served by
+    this process: each is fetched at most once per ttl, however many datasets ask for it, and
+    concurrent requests for one share a single fetch. A user on several projects is held once.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._values = {}  # (project id, endpoint name) -> (time.monotonic() of the fetch, value)
+        self._pending = {}  # (project id, endpoint name) -> future of the fetch in flight
+        self._users = {}  # user id -> the shared copy of that user's record
+        self._lock = threading.Lock()
+
+    def get(self, projectid, name, fetch):
+        """Return the cached value of endpoint name for a project, calling fetch() if it is missing or expired."""
+        key = (projectid, name)
+        with self._lock:
+            held = self._values.get(key)
+            if held is not None and time.monotonic() - held[0] < self.ttl:
+                return held[1]
+            future = self._pending.get(key)
+            fetching = future is None
+            if fetching:
+                future = self._pending[key] = Future()
+        if not fetching:
+            return future.result()
+        try:
+            value = fetch()
+            if name == "users" and value:
+                value = self._share_users(value)
+        except BaseException as exc:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            self._values[key] = (time.monotonic(), value)
+            del self._pending[key]
+        future.set_result(value)
+        return value
+
+    def _share_users(self, users):
+        with self._lock:
+            shared = []
+            for user in users:
+                held = self._users.get(user.get("id"))
+                if held != user:
+                    held = self._users[user.get("id")] = user
+                shared.append(held)
+            return shared
+
+
+metadata_cache = MetadataCache(METADATA_TTL)
+
+
+def fetch_tasks(client):
+    """
+    Return the endpoint name -> fetch callable mapping used for a full refresh.
+    Work items are held as compact WorkItems rather than the raw Taiga dicts.
+    METADATA_ENDPOINTS go through the client's metadata cache, if it has one.
+    """
+    cache = getattr(client, "metadata_cache", None)
+
+    def metadata(name, fetch):
+        if cache is None:
+            return fetch
+        return lambda: cache.get(client.projectid, name, fetch)
+
+    return {
+        "epics": lambda: client.get_epics(),
+        "userstories": lambda: compact_items(client.get_stories()),
+        "tasks": lambda: compact_items(client.get_tasks()),
+        "issues": lambda: compact_items(client.get_issues()),
+        "sprints": lambda: client.get_sprints(),
+        "project": metadata("project", lambda: client.get_project()),
+        "users": metadata("users", lambda: client.get_users()),
+        "severities": metadata("severities", lambda: client.get_severities()),
+        "priorities": metadata("priorities", lambda: client.get_priorities()),
+        "issue_types": metadata("issue_types", lambda: client.get_issue_types()),
+        "userstory_statuses": metadata("userstory_statuses", lambda: client.get_userstory_statuses()),
+        "task_statuses": metadata("task_statuses", lambda: client.get_task_statuses()),
+        "issue_statuses": metadata("issue_statuses", lambda: client.get_issue_statuses()),
+    }
+
+
+# Values computed once per refresh from fetched endpoints: name -> (inputs, builder).
+# Inputs may also name "client" to receive the TaigaClient doing the refresh.
+# Entries are in dependency order; the *_config entries snapshot the reloadable settings.
+DERIVED = {
+    "status_config": ((), config.status_config),
+    "retention_config": ((), config.retention_config),
+    "status_buckets": (
+        ("userstory_statuses", "task_statuses", "issue_statuses", "status_config"),
+        build_status_buckets,
+    ),
+    "snapshots": (
+        ("project", "userstories", "tasks", "issues", "status_buckets"),
+        record_snapshot,
+    ),
+    # The history crawl runs in the background; cycle_times is rebuilt once it finishes
+    "history_crawl": (
+        ("client", "userstories", "tasks", "status_buckets"),
+        start_history_crawl,
+    ),
+    "cycle_times": (
+        ("userstories", "tasks", "status_buckets", "history_crawl"),
+        get_cycle_times,
+    ),
+    "facet_index": (
+        ("userstories", "tasks", "issues", "users", "sprints"),
+        FacetIndex,
+    ),
+    "blocked_index": (
+        ("epics", "userstories", "tasks", "issues"),
+        BlockedIndex,
+    ),
+    "portfolio_summary": (
+        (
+            "project", "epics", "userstories", "issues", "issue_types", "severities", "priorities",
+            "status_buckets", "blocked_index", "retention_config",
+        ),
+        project_summary,
+    ),
+}
+
+
+def start_fetch_all(client, executor, tasks=None):
+    """
+    Submit every endpoint fetch to the executor and return a dict of name -> future,
+    including the DERIVED values, which resolve once their inputs have arrived.
+    A failing endpoint resolves to None instead of raising, like fetch_all_parallel.
+    tasks replaces fetch_tasks(client), e.g. with loaders for a stored dataset.
+    """
+
+    def guarded(name, func):
+        try:
+            return func()
+        except Exception as exc:
+            print(f"{name} generated an exception: {exc}")
+            return None
+
+    futures = {
+        name: executor.submit(guarded, name, func)
+        for name, func in (tasks or fetch_tasks(client)).items()
+    }
+    sources = {"client": resolved_future(client)}
+    for name, (inputs, builder) in DERIVED.items():
+        input_futures = [futures[key] if key in futures else sources[key] for key in inputs]
+        futures[name] = executor.submit(
+            guarded, name, lambda fs=input_futures, b=builder: b(*[f.result() for f in fs])
+        )
+    return futures
+
+
+def fetch_all_parallel(client):
+    with ThreadPoolExecutor(max_workers=len(fetch_tasks(client))) as executor:
+        futures = start_fetch_all(client, executor)
+        data = {name: future.result() for name, future in futures.items()}
+    # A one-off fetch, unlike a held dataset, waits for the history crawl it started
+    if data["history_crawl"] is not None and not data["history_crawl"].done():
+        data["history_crawl"].result()
+        inputs, builder = DERIVED["cycle_times"]
+        data["cycle_times"] = builder(*[data[name] for name in inputs])
+    return data
+
+
+def resolved_future(value):
+    """Return an already-completed future holding value."""
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+class DashboardDataset:
+    """
+    Holds the most recently fetched Taiga data for this process.
+    Concurrent callers that arrive while a refresh is running join that refresh
+    instead of starting another crawl.
+    """
+
+    def __init__(self, client_factory, ttl):
+        self.client_factory = client_factory
+        self.ttl = ttl
+        self.data = None
+        self.fetched_at = None
+        self.version = 0  # bumped on every completed refresh or update, for cache keys
+        self.versions = {}  # dataset key -> version in which its value last changed
+        self.endpoint_times = {}  # endpoint name -> time.time() of its last successful fetch
+        self.stale = {}  # endpoint name -> fetch time of the last good value kept after a failed fetch
+        self.projectid = None
+        self.stored_at = None  # fetch time of the held data in the stored dataset, if it is stored
+        self._warm = False  # held data was loaded by warm_start and is served even when stale
+        self._pending = None
+        self._recorded = resolved_future(None)  # resolves once the latest refresh is held and versioned
+        self._lock = threading.Lock()
+        self._update_lock = threading.Lock()  # serializes apply_update calls
+        self._executor = ThreadPoolExecutor(max_workers=len(fetch_tasks(None)))
+
+    def is_fresh(self):
+        return self.fetched_at is not None and time.monotonic() - self.fetched_at < self.ttl
+
+    def endpoint_ttl(self, name):
+        return METADATA_TTL if name in METADATA_ENDPOINTS else self.ttl
+
+    def futures(self):
+        """
+        Return a dict of endpoint name -> future.
+        Futures are already resolved when the held data is fresh; otherwise they belong
+        to the in-flight refresh, so callers can use each endpoint as soon as it arrives.
+        """
+        with self._lock:
+            if self.is_fresh():
+                return {name: resolved_future(value) for name, value in self.data.items()}
+            if self._pending is None:
+                self._pending = self._start_refresh()
+            if self._warm:
+                return {name: resolved_future(value) for name, value in self.data.items()}
+            return self._pending
+
+    def get(self):
+        """
+        Return the full data dict, fetching it first if it is missing or stale.
+        Also waits until a refresh it joined is recorded, so version matches the returned data.
+        """
+        futures = self.futures()
+        recorded = self._recorded
+        data = {name: future.result() for name, future in futures.items()}
+        recorded.result()
+        return data
+
+    async def get_async(self):
+        """get() for asyncio callers: awaits a running refresh instead of blocking a thread on it."""
+        futures = self.futures()
+        recorded = self._recorded
+        data = {name: await asyncio.wrap_future(future) for name, future in futures.items()}
+        await asyncio.wrap_future(recorded)
+        return data
+
+    def warm_start(self):
+        """
+        Load the last stored refresh, whatever its age, so the process can serve right away.
+        Until the next refresh completes the loaded data is served even when it is stale;
+        if it already is, that refresh starts in the background immediately.
+        Returns True if a stored refresh was found.
+        """
+        if not taiga_columnar.ARROW_ENABLED:
+            return False
+        client = self.client_factory()
+        stored = taiga_columnar.read_meta(client.projectid)
+        if stored is None:
+            return False
+        start_timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        print(f"[{start_timestamp}] Warm start from the stored Taiga dataset fetched at "
+              f"{datetime.utcfromtimestamp(stored['fetched_at']).strftime('%Y-%m-%d %H:%M:%S')}")
+        futures = start_fetch_all(client, self._executor, taiga_columnar.load_tasks(client.projectid, stored))
+        data = {name: future.result() for name, future in futures.items()}
+        with self._lock:
+            self.data = data
+            self.projectid = client.projectid
+            self.stored_at = stored["fetched_at"]
+            # Age the data by how long ago it was fetched, so is_fresh() applies the usual TTL
+            self.fetched_at = time.monotonic() - max(time.time() - stored["fetched_at"], 0)
+            self.version += 1
+            self.versions = dict.fromkeys(data, self.version)
+            self.endpoint_times = dict.fromkeys(fetch_tasks(client), stored["fetched_at"])
+            self.stale = {}
+            self._warm = True
+            if not self.is_fresh() and self._pending is None:
+                self._pending = self._start_refresh()
+        self._follow_history_crawl(data)
+        return True
+
+    def load_page(self):
+        """Return the stored default page rendered from the held data, or None."""
+        if self.stored_at is None:
+            return None
+        return taiga_columnar.read_page(self.projectid, self.stored_at)
+
+    def store_page(self, html, version):
+        """Store the default page rendered from data version, if that data is the stored refresh."""
+        with self._lock:
+            stored_at = self.stored_at if version == self.version else None
+        if stored_at is None:
+            return
+        try:
+            taiga_columnar.write_page(self.projectid, stored_at, html)
+        except Exception as exc:
+            print(f"Writing the stored page failed: {exc}")
+
+    def apply_update(self, key, update):
+        """
+        Replace one fetched endpoint of the held data with update(data) and recompute only the
+        DERIVED values that depend on it, without a refetch. Returns the set of changed keys,
+        or None when no data is held yet (the next refresh will include the change anyway).
+        """
+        return self._update(lambda data: {key: update(data)})
+
+    def recompute(self, *names):
+        """Rebuild the named DERIVED values, and those depending on them, from the held data."""
+        return self._update(lambda data: {}, names)
+
+    def _update(self, update, rebuild=()):
+        changed = self._apply(update, rebuild)
+        if changed and "history_crawl" in changed:
+            self._follow_history_crawl(self.data)
+        return changed
+
+    def _apply(self, update, rebuild):
+        with self._update_lock:
+            with self._lock:
+                if self.data is None:
+                    return None
+                data = dict(self.data)
+            updated = update(data)
+            data.update(updated)
+            changed = set(updated)
+            client = None
+            for name, (inputs, builder) in DERIVED.items():
+                if name not in rebuild and not changed.intersection(inputs):
+                    continue
+                if "client" in inputs and client is None:
+                    client = self.client_factory()
+                sources = {"client": client}
+                try:
+                    data[name] = builder(*[sources[i] if i in sources else data[i] for i in inputs])
+                except Exception as exc:
+                    print(f"{name} generated an exception: {exc}")
+                    continue
+                changed.add(name)
+            with self._lock:
+                self.data = data
+                self.stored_at = None  # the stored dataset no longer matches the held one
+                self.version += 1
+                self.versions = {**self.versions, **dict.fromkeys(changed, self.version)}
+            return changed
+
+    def _follow_history_crawl(self, data):
+        """Rebuild cycle_times of the held data once the history crawl started for data finishes."""
+        crawl = data.get("history_crawl")
+        if crawl is not None and not crawl.done():
+            crawl.add_done_callback(lambda _: self.recompute("cycle_times"))
+
+    def _tiered_tasks(self, client):
+        """
+        Return the fetch tasks of a refresh, plus the sets it fills with the endpoints that were
+        fetched and those that failed. An endpoint fetched within its endpoint_ttl keeps its held
+        value, and one whose fetch fails falls back to its last good value instead of None.
+        """
+        held = self.data or {}
+        now = time.time()
+        succeeded, failed = set(), set()
+
+        def fetch_or_keep(name, fetch):
+            try:
+                value = fetch()
+            except Exception as exc:
+                if held.get(name) is None:
+                    raise
+                print(f"{name} generated an exception: {exc}; keeping the last good value")
+                failed.add(name)
+                return held[name]
+            succeeded.add(name)
+            return value
+
+        tasks = {}
+        for name, fetch in fetch_tasks(client).items():
+            if held.get(name) is not None and now - self.endpoint_times.get(name, 0) < self.endpoint_ttl(name):
+                tasks[name] = lambda value=held[name]: value
+            else:
+                tasks[name] = lambda name=name, fetch=fetch: fetch_or_keep(name, fetch)
+        return tasks, succeeded, failed
+
+    def _start_refresh(self):
+        recorded = self._recorded = Future()
+        client = self.client_factory()
+        start_timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        overall_start = time.perf_counter()
+        started_at = time.time()
+        succeeded, failed = (), ()
+
+        # Another worker may already have written a fresh refresh of this project to disk
+        stored = None
+        if taiga_columnar.ARROW_ENABLED:
+            stored = taiga_columnar.read_meta(client.projectid, max_age=self.ttl)
+        if stored is not None:
+            print(f"[{start_timestamp}] Loading stored Taiga dataset from {taiga_columnar.dataset_path(client.projectid)}...")
+            futures = start_fetch_all(client, self._executor, taiga_columnar.load_tasks(client.projectid, stored))
+        else:
+            print(f"[{start_timestamp}] Starting full Taiga data fetch...")
+            tasks, succeeded, failed = self._tiered_tasks(client)
+            futures = start_fetch_all(client, self._executor, tasks)
+
+        def finish():
+            data = {name: future.result() for name, future in futures.items()}
+            end_timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+            overall_duration = time.perf_counter() - overall_start
+            source = "load" if stored is not None else "fetch"
+            print(f"[{end_timestamp}] Finished full Taiga data {source} in {overall_duration:.3f} seconds")
+            stored_at = stored["fetched_at"] if stored is not None else None
+            fetched = {name: data[name] for name in fetch_tasks(client)}
+            if stored is None and taiga_columnar.ARROW_ENABLED and None not in fetched.values() and not failed:
+                try:
+                    stored_at = taiga_columnar.write_dataset(client.projectid, fetched)
+                except Exception as exc:
+                    print(f"Writing the stored dataset failed: {exc}")
+            with self._lock:
+                self.data = data
+                self.projectid = client.projectid
+                self.stored_at = stored_at
+                # A refresh that fetched nothing, or left an endpoint without a value (a failed fetch with
+                # no last good value to fall back on), leaves the data stale, so the next request retries
+                if stored is not None or (succeeded and None not in fetched.values()):
+                    self.fetched_at = time.monotonic()
+                if stored is not None:
+                    self.fetched_at -= max(time.time() - stored["fetched_at"], 0)
+                    self.endpoint_times = dict.fromkeys(fetched, stored["fetched_at"])
+                    self.stale = {}
+                else:
+                    self.endpoint_times = {**self.endpoint_times, **dict.fromkeys(succeeded, started_at)}
+                    self.stale = {name: self.endpoint_times[name] for name in failed}
+                self.version += 1
+                self.versions = dict.fromkeys(data, self.version)
+                self._warm = False
+                self._pending = None
+            recorded.set_result(None)
+            self._follow_history_crawl(data)
+
+        threading.Thread(target=finish, daemon=True).start()
+        return futures
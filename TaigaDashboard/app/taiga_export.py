@@ -0,0 +1,48 @@
+import gzip
+import os
+import shutil
+import tempfile
+import plotly
+from app.taiga_plotly import get_plotly_cdn_url
+
+try:
+    import brotli  # optional: .br variants are skipped when it is not installed
+except ImportError:
+    brotli = None
+
+PLOTLY_JS_NAME = "plotly.min.js"
+
+
+def compressed_variants(name, content):
+    """Yield (file name, bytes) for a file and its precompressed .gz/.br variants."""
+    yield name, content
+    yield f"{name}.gz", gzip.compress(content, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield f"{name}.br", brotli.compress(content)
+
+
+def write_static_site(page_html, out_dir):
+    """
+    Write a self-contained dashboard to out_dir: index.html pointing at a local plotly.js,
+    plus precompressed variants of both. Files are staged first and then moved into place
+    with os.replace, the index.html variants last and index.html itself at the very end,
+    so a static server never sees a partial export.
+    """
+    files = {
+        PLOTLY_JS_NAME: plotly.offline.get_plotlyjs().encode("utf-8"),
+        "index.html": page_html.replace(get_plotly_cdn_url(), PLOTLY_JS_NAME).encode("utf-8"),
+    }
+    os.makedirs(out_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".export-", dir=out_dir)
+    try:
+        staged = []
+        for name, content in files.items():
+            for variant, data in compressed_variants(name, content):
+                with open(os.path.join(staging, variant), "wb") as f:
+                    f.write(data)
+                staged.append(variant)
+        staged.sort(key=lambda variant: (variant.startswith("index.html"), variant == "index.html"))
+        for variant in staged:
+            os.replace(os.path.join(staging, variant), os.path.join(out_dir, variant))
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
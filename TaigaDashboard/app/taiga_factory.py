@@ -1,10 +1,49 @@
 import os
-from app.taiga_client import TaigaClient
+import threading
+from app.taiga_client import TaigaClient, TaigaSession
+from app.taiga_cassette import load_cassette
+from app.taiga_dataset import metadata_cache
+from app.taiga_scheduler import FETCH_CONCURRENCY, scheduler
+
+# One pooled, authenticated session per Taiga account, shared by the clients of every project
+sessions = {}
+sessions_lock = threading.Lock()
+
+
+def shared_session(base_url, username):
+    with sessions_lock:
+        key = (os.getpid(), base_url, username)  # pooled connections must not be shared with forked processes
+        if key not in sessions:
+            # Every scheduler worker may hold a connection, plus a few for unscheduled requests
+            sessions[key] = TaigaSession(pool_size=max(10, FETCH_CONCURRENCY + 4))
+        return sessions[key]
+
+
+def create_taiga_client(projectid=None, shared=True):
+    """
+    Client for a project (default: TAIGA_PROJECT_ID). Clients share this process's session
+    and metadata cache unless shared is False, e.g. for recording every request of a refresh.
+    """
+    # TAIGA_CASSETTE serves every request from a recording (see the record-cassette command) instead of Taiga
+    cassette = os.getenv("TAIGA_CASSETTE")
+    if cassette:
+        timing = os.getenv("TAIGA_CASSETTE_TIMING", "original").strip().lower()
+        return create_replay_client(load_cassette(cassette), timing, projectid)
 
-def create_taiga_client():
     base_url = os.getenv("TAIGA_BASE_URL")
     username = os.getenv("TAIGA_USERNAME")
     password = os.getenv("TAIGA_PASSWORD")
-    projectid = int(os.getenv("TAIGA_PROJECT_ID"))
+    projectid = int(projectid or os.getenv("TAIGA_PROJECT_ID"))
+
+    if not shared:
+        return TaigaClient(base_url, username, password, projectid, scheduler=scheduler)
+    return TaigaClient(
+        base_url, username, password, projectid, scheduler=scheduler,
+        session=shared_session(base_url, username), metadata_cache=metadata_cache,
+    )
 
-    return TaigaClient(base_url, username, password, projectid)
\ No newline at end of file
+def create_replay_client(cassette, timing="original", projectid=None):
+    """Client for the project recorded in cassette, answered from it with "original" or "fast" timing."""
+    client = TaigaClient(cassette.base_url, "replay", "replay", int(projectid or cassette.projectid), scheduler=scheduler)
+    client.replay(cassette, timing)
+    return client
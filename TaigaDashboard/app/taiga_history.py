@@ -0,0 +1,247 @@
+import os
+import sqlite3
+import threading
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import closing
+from datetime import datetime
+from app.taiga_plotly import get_int_from_env, get_status_bucket
+from app.taiga_snapshots import DATA_DIR
+from app.taiga_lazy import LazyModule
+
+np = LazyModule("numpy")
+
+HISTORY_DB_PATH = os.getenv("HISTORY_DB_PATH", os.path.join(DATA_DIR, "history.db"))
+HISTORY_CRAWL_CONCURRENCY = get_int_from_env("HISTORY_CRAWL_CONCURRENCY", 8)
+
+# Crawls run one at a time in the background, so a crawl never refetches what the one before it stored
+crawl_executor = ThreadPoolExecutor(max_workers=1)
+
+_status_changes = {}  # (history DB path, item type) -> item id -> status changes, as load_status_changes returns them
+_status_changes_lock = threading.Lock()
+
+
+def connect(path=None):
+    """Open the history cache, creating it on first use."""
+    path = path or HISTORY_DB_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS crawled_items (
+            item_type TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            modified_date TEXT,
+            PRIMARY KEY (item_type, item_id)
+        );
+        CREATE TABLE IF NOT EXISTS status_changes (
+            item_type TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            entry_id TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            status_id INTEGER,
+            status_name TEXT,
+            PRIMARY KEY (item_type, entry_id)
+        );
+        """
+    )
+    return conn
+
+
+def extract_status_changes(entries):
+    """Return (entry_id, created_at, new_status_id, new_status_name) for every history entry that changed status."""
+    changes = []
+    for entry in entries or []:
+        status_ids = (entry.get("diff") or {}).get("status")
+        status_names = (entry.get("values_diff") or {}).get("status")
+        if not status_ids and not status_names:
+            continue
+        changes.append((
+            str(entry["id"]),
+            entry["created_at"],
+            status_ids[1] if status_ids else None,
+            status_names[1] if status_names else None,
+        ))
+    return changes
+
+
+def stale_items(item_type, items, path=None):
+    """Return the items whose modified_date changed since their history was last crawled."""
+    with closing(connect(path)) as conn:
+        crawled = dict(conn.execute(
+            "SELECT item_id, modified_date FROM crawled_items WHERE item_type = ?", (item_type,)
+        ))
+    return [item for item in items if crawled.get(item["id"]) != item.get("modified_date")]
+
+
+def crawl_history(client, item_type, items, path=None, concurrency=None):
+    """
+    Fetch the history of every item whose modified_date changed since the last crawl, at most
+    `concurrency` requests at a time, and store its status changes. History entries never change,
+    so stored entries are kept forever and an unchanged item is never fetched again.
+    """
+    concurrency = concurrency or HISTORY_CRAWL_CONCURRENCY
+    stale = stale_items(item_type, items, path)
+    timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+    print(f"[{timestamp}] Crawling {item_type} history for {len(stale)} of {len(items)} items")
+    if not stale:
+        return
+    crawled = []
+    with closing(connect(path)) as conn:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            future_to_item = {
+                executor.submit(client.get_history, item_type, item["id"]): item for item in stale
+            }
+            for future in as_completed(future_to_item):
+                item = future_to_item[future]
+                try:
+                    entries = future.result()
+                except Exception as exc:
+                    print(f"{item_type} {item['id']} history generated an exception: {exc}")
+                    continue
+                with conn:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO status_changes VALUES (?, ?, ?, ?, ?, ?)",
+                        [(item_type, item["id"], *change) for change in extract_status_changes(entries)],
+                    )
+                    conn.execute(
+                        "INSERT OR REPLACE INTO crawled_items VALUES (?, ?, ?)",
+                        (item_type, item["id"], item.get("modified_date")),
+                    )
+                crawled.append(item["id"])
+    update_status_changes(item_type, crawled, path)
+
+
+def load_status_changes(item_type, item_ids=None, path=None):
+    """
+    Return item id -> [(created_at, status_id, status_name), ...] in chronological order,
+    for every item of item_type or only for item_ids.
+    """
+    changes = defaultdict(list)
+    query = (
+        "SELECT item_id, created_at, status_id, status_name FROM status_changes "
+        "WHERE item_type = ?{} ORDER BY created_at"
+    )
+    with closing(connect(path)) as conn:
+        if item_ids is None:
+            batches = [conn.execute(query.format(""), (item_type,))]
+        else:
+            item_ids = list(item_ids)
+            # SQLite limits the number of bound parameters per statement
+            batches = [
+                conn.execute(
+                    query.format(f" AND item_id IN ({','.join('?' * len(chunk))})"), (item_type, *chunk)
+                )
+                for chunk in (item_ids[i:i + 500] for i in range(0, len(item_ids), 500))
+            ]
+        for rows in batches:
+            for item_id, created_at, status_id, status_name in rows:
+                changes[item_id].append((created_at, status_id, status_name))
+    return changes
+
+
+def held_status_changes(item_type, path=None):
+    """Status changes of item_type held in memory, loaded in full from the history cache on first use."""
+    key = (path or HISTORY_DB_PATH, item_type)
+    with _status_changes_lock:
+        held = _status_changes.get(key)
+        if held is None:
+            held = _status_changes[key] = dict(load_status_changes(item_type, path=path))
+        return held
+
+
+def update_status_changes(item_type, item_ids, path=None):
+    """Reload the held status changes of just the given items after a crawl stored their history."""
+    key = (path or HISTORY_DB_PATH, item_type)
+    with _status_changes_lock:  # also waits for a full load in progress, which may predate the crawl
+        if not item_ids or key not in _status_changes:
+            return
+    changes = load_status_changes(item_type, item_ids, path)
+    with _status_changes_lock:
+        if key in _status_changes:
+            _status_changes[key] = {**_status_changes[key], **changes}
+
+
+def to_datetime64(dates):
+    """Convert Taiga ISO timestamps (None allowed) to a datetime64 array, NaT for missing values."""
+    return np.array([d.rstrip("Z") if d else "NaT" for d in dates], dtype="datetime64[s]")
+
+
+def finished_items(userstories, tasks, status_buckets=None):
+    """Return (item_type, finished items, finish date field) of the user stories and tasks in the Done bucket."""
+    return [
+        (
+            item_type,
+            [
+                item for item in items or []
+                if item.get(finish_field) and get_status_bucket(item, item_type, status_buckets) == "Done"
+            ],
+            finish_field,
+        )
+        for item_type, items, finish_field in (
+            ("userstory", userstories, "finish_date"),
+            ("task", tasks, "finished_date"),
+        )
+    ]
+
+
+def start_history_crawl(client, userstories, tasks, status_buckets=None, path=None):
+    """
+    Crawl the history of the finished user stories and tasks on crawl_executor and return the
+    future of the crawl, which never raises. It is already done when no item needs crawling.
+    """
+    stale = [
+        (item_type, items) for item_type, items, _ in finished_items(userstories, tasks, status_buckets)
+        if stale_items(item_type, items, path)
+    ]
+    if not stale:
+        future = Future()
+        future.set_result(None)
+        return future
+
+    def crawl():
+        for item_type, items in stale:
+            try:
+                crawl_history(client, item_type, items, path)
+            except Exception as exc:
+                print(f"{item_type} history crawl generated an exception: {exc}")
+
+    return crawl_executor.submit(crawl)
+
+
+def get_cycle_times(userstories, tasks, status_buckets=None, crawl=None, path=None):
+    """
+    Return {"lead_time": days from creation to finish, "cycle_time": days from first In Progress
+    to finish} of the finished user stories and tasks as NumPy arrays, from the history crawled
+    so far, and "crawling": whether the crawl future is still running. Items that never passed
+    through In Progress, or whose history is not crawled yet, have no cycle time.
+    """
+    created, started, finished = [], [], []
+    for item_type, done_items, finish_field in finished_items(userstories, tasks, status_buckets):
+        changes = held_status_changes(item_type, path)
+        for item in done_items:
+            first_started = None
+            for created_at, status_id, status_name in changes.get(item["id"], []):
+                bucket = get_status_bucket(
+                    {"status": status_id, "status_extra_info": {"name": status_name}},
+                    item_type,
+                    status_buckets,
+                )
+                if bucket == "In Progress":
+                    first_started = created_at
+                    break
+            created.append(item.get("created_date"))
+            started.append(first_started)
+            finished.append(item[finish_field])
+
+    one_day = np.timedelta64(1, "D")
+    created, started, finished = to_datetime64(created), to_datetime64(started), to_datetime64(finished)
+    lead_time = (finished - created) / one_day
+    cycle_time = (finished - started) / one_day
+    lead_time = lead_time[~np.isnan(lead_time)]
+    cycle_time = cycle_time[~np.isnan(cycle_time)]
+    return {
+        "lead_time": lead_time[lead_time >= 0],
+        "cycle_time": cycle_time[cycle_time >= 0],
+        "crawling": crawl is not None and not crawl.done(),
+    }
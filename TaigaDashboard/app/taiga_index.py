@@ -0,0 +1,222 @@
+import time
+from collections import defaultdict
+from datetime import datetime
+from app.taiga_lazy import LazyModule
+
+np = LazyModule("numpy")
+
+# Query string parameters that filter the dashboard, e.g. ?assignee=alice&tag=backend
+FACETS = ("assignee", "tag", "sprint", "epic", "type")
+
+# Sort orders of the blocked items table; "age" is oldest first, the others ascending.
+# "project" only applies to the portfolio's table (see BlockedIndex.merge)
+BLOCKED_SORTS = ("age", "type", "ref", "assignee", "project")
+
+ITEM_TYPES = ("userstory", "task", "issue")
+ITEM_KEYS = {"userstory": "userstories", "task": "tasks", "issue": "issues"}
+
+
+def parse_filters(args):
+    """
+    Normalize facet filters from request args into a hashable, order-independent tuple of
+    (facet, (value, ...)) pairs. Repeated or comma-separated values of one facet are OR-ed.
+    """
+    filters = []
+    for facet in FACETS:
+        values = set()
+        for raw in args.getlist(facet):
+            values.update(v.strip().lower() for v in raw.split(",") if v.strip())
+        if values:
+            filters.append((facet, tuple(sorted(values))))
+    return tuple(filters)
+
+
+class FacetIndex:
+    """
+    Inverted index over the user stories, tasks and issues of one refresh.
+    Every item gets a dense integer position and each facet value maps to a sorted NumPy
+    array of positions, so a filtered view is a union/intersection of a few int arrays.
+    """
+
+    def __init__(self, userstories, tasks, issues, users, sprints):
+        usernames = {u["id"]: (u.get("username") or "").lower() for u in users or []}
+        sprint_names = {s["id"]: (s.get("name") or "").lower() for s in sprints or []}
+        story_epics = {}
+
+        self.items = []
+        self.offsets = {}
+        postings = defaultdict(list)
+        for item_type, items in zip(ITEM_TYPES, (userstories, tasks, issues)):
+            self.offsets[item_type] = len(self.items)
+            for item in items or []:
+                position = len(self.items)
+                self.items.append(item)
+                keys = [("type", item_type)]
+
+                assignee = item.get("assigned_to")
+                if assignee is None:
+                    keys.append(("assignee", "unassigned"))
+                else:
+                    keys.append(("assignee", str(assignee)))
+                    keys.append(("assignee", usernames.get(assignee, "")))
+
+                for tag in item.get("tags") or []:
+                    name = tag[0] if isinstance(tag, (list, tuple)) else tag
+                    if name:
+                        keys.append(("tag", str(name).lower()))
+
+                milestone = item.get("milestone")
+                if milestone is not None:
+                    keys.append(("sprint", str(milestone)))
+                    keys.append(("sprint", sprint_names.get(milestone, "")))
+
+                # Tasks inherit the epics of their user story
+                if item_type == "userstory":
+                    epic_ids = [e.get("id") for e in item.get("epics") or []]
+                    story_epics[item["id"]] = epic_ids
+                else:
+                    epic_ids = story_epics.get(item.get("user_story"), [])
+                keys.extend(("epic", str(epic_id)) for epic_id in epic_ids)
+
+                for key in set(keys):
+                    if key[1]:
+                        postings[key].append(position)
+        self.offsets["end"] = len(self.items)
+
+        # Positions are appended in increasing order, so each posting list is already sorted
+        self.postings = {key: np.array(p, dtype=np.int32) for key, p in postings.items()}
+
+    def lookup(self, facet, value):
+        return self.postings.get((facet, value), np.empty(0, dtype=np.int32))
+
+    def select(self, filters):
+        """Return the sorted positions matching every facet in filters (values of one facet are OR-ed)."""
+        selected = None
+        for facet, values in filters:
+            matches = self.lookup(facet, values[0])
+            for value in values[1:]:
+                matches = np.union1d(matches, self.lookup(facet, value))
+            selected = matches if selected is None else np.intersect1d(selected, matches, assume_unique=True)
+        return selected
+
+    def filter_data(self, data, filters):
+        """
+        Return a copy of a dataset dict whose user stories, tasks and issues are restricted to
+        the items matching filters; an epic filter also restricts the epics.
+        """
+        if not filters:
+            return data
+        positions = self.select(filters)
+        filtered = dict(data)
+        for item_type in ITEM_TYPES:
+            key = ITEM_KEYS[item_type]
+            if key not in data:
+                continue
+            start = np.searchsorted(positions, self.offsets[item_type])
+            end = np.searchsorted(positions, self._end_offset(item_type))
+            filtered[key] = [self.items[p] for p in positions[start:end]]
+        epic_values = dict(filters).get("epic")
+        if epic_values and data.get("epics") is not None:
+            filtered["epics"] = [e for e in data["epics"] if str(e["id"]) in epic_values]
+        return filtered
+
+    def _end_offset(self, item_type):
+        following = ITEM_TYPES.index(item_type) + 1
+        return self.offsets[ITEM_TYPES[following]] if following < len(ITEM_TYPES) else self.offsets["end"]
+
+
+def parse_created(created_date):
+    """Return the epoch seconds of a Taiga created_date, or None if it cannot be parsed."""
+    try:
+        return datetime.fromisoformat(created_date.replace("Z", "+00:00")).timestamp()
+    except Exception:
+        return None
+
+
+class BlockedIndex:
+    """
+    Blocked epics, user stories, tasks and issues of one refresh, stored oldest first with a
+    precomputed row order for every column in BLOCKED_SORTS, so any page of any sort is a slice.
+    Ages are derived from the stored created time when a page is read.
+    """
+
+    def __init__(self, epics, userstories, tasks, issues):
+        self.sources = (epics, userstories, tasks, issues)
+        self.has_projects = False
+        rows = []
+        for label, items in (("Epic", epics), ("User Story", userstories), ("Task", tasks), ("Issue", issues)):
+            for item in items or []:
+                if not item.get("is_blocked", False):
+                    continue
+                info = item.get("assigned_to_extra_info")
+                assignee = "Unassigned"
+                if info and isinstance(info, dict):
+                    assignee = info.get("full_name_display") or info.get("username") or "Unassigned"
+                rows.append({
+                    "type": label,
+                    "ref": item.get("ref"),
+                    "subject": item.get("subject") or "",
+                    "assignee": assignee,
+                    "blocked_note": item.get("blocked_note") or "",
+                    "created": parse_created(item.get("created_date") or ""),
+                })
+        # Oldest first; items without a parseable created date go last
+        rows.sort(key=lambda r: (r["created"] is None, r["created"] or 0))
+        self._index(rows)
+
+    def _index(self, rows):
+        self.rows = rows
+        self.orders = {"age": np.arange(len(rows), dtype=np.int32)}
+        for column in BLOCKED_SORTS[1:]:
+            if column == "project" and not self.has_projects:
+                continue
+            keys = [(r[column] is None, r[column] if r[column] is not None else 0) for r in rows]
+            self.orders[column] = np.array(sorted(range(len(rows)), key=keys.__getitem__), dtype=np.int32)
+        self.search_text = [
+            f"{r['subject']}\n{r['blocked_note']}\n{r['assignee']}\n{r.get('project', '')}".lower() for r in rows
+        ]
+
+    @classmethod
+    def merge(cls, indexes):
+        """
+        Return one index over the rows of several projects' indexes, given as (project name, index)
+        pairs; every row gets a "project" column. The rows are ordered oldest first as usual.
+        """
+        index = cls.__new__(cls)
+        index.sources = ()
+        index.has_projects = True
+        rows = [dict(row, project=name) for name, other in indexes for row in other.rows]
+        created = np.array([row["created"] if row["created"] is not None else np.inf for row in rows], dtype=float)
+        index._index([rows[i] for i in np.argsort(created, kind="stable")])
+        return index
+
+    @classmethod
+    def for_data(cls, data):
+        """Return the precomputed data["blocked_index"] if data holds the lists it was built from, else build one."""
+        sources = tuple(data.get(key) for key in ("epics", "userstories", "tasks", "issues"))
+        index = data.get("blocked_index")
+        if index is not None and all(a is b for a, b in zip(index.sources, sources)):
+            return index
+        return cls(*sources)
+
+    def query(self, sort="age", text="", page=1, page_size=25, now=None):
+        """
+        Return one page of blocked items as {"total", "page", "pages", "page_size", "rows"}, where
+        each row has type, ref, subject, assignee, blocked_note and age_days ("?" if unknown).
+        text keeps only rows whose subject, blocked note or assignee contains it.
+        """
+        order = self.orders.get(sort, self.orders["age"])
+        text = (text or "").strip().lower()
+        if text:
+            order = [i for i in order if text in self.search_text[i]]
+        total = len(order)
+        pages = max(1, -(-total // page_size))
+        page = min(max(page, 1), pages)
+        now = now or time.time()
+        rows = []
+        for i in order[(page - 1) * page_size:page * page_size]:
+            row = dict(self.rows[i])
+            created = row.pop("created")
+            row["age_days"] = int((now - created) // 86400) if created is not None else "?"
+            rows.append(row)
+        return {"total": total, "page": page, "pages": pages, "page_size": page_size, "rows": rows}
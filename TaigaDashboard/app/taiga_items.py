@@ -0,0 +1,119 @@
+import sys
+from collections.abc import Mapping
+
+# Fields of user stories, tasks and issues that the dashboard reads; everything else Taiga sends is dropped
+ITEM_FIELDS = (
+    "id", "ref", "subject", "status", "is_closed", "is_blocked", "blocked_note",
+    "assigned_to", "owner", "milestone", "priority", "severity", "type", "user_story",
+    "created_date", "modified_date", "finish_date", "finished_date",
+    "status_extra_info", "assigned_to_extra_info", "priority_extra_info", "epics", "tags",
+)
+FIELD_SET = frozenset(ITEM_FIELDS)
+
+# Keys kept from the nested objects, which are shared between all items with equal values
+EXTRA_INFO_FIELDS = {
+    "status_extra_info": ("name", "color", "is_closed"),
+    "assigned_to_extra_info": ("id", "username", "full_name_display"),
+    "priority_extra_info": ("name",),
+}
+
+
+class WorkItem(Mapping):
+    """
+    Read-only, dict-like record of one user story, task or issue holding only ITEM_FIELDS.
+    A field Taiga did not send is missing, as in the original dict. Nested objects are shared
+    with other items, so they must not be modified.
+    """
+
+    __slots__ = ITEM_FIELDS
+
+    def __getitem__(self, key):
+        if key in FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in FIELD_SET:
+            return getattr(self, key, default)
+        return default
+
+    def __contains__(self, key):
+        return key in FIELD_SET and hasattr(self, key)
+
+    def __iter__(self):
+        return (field for field in ITEM_FIELDS if hasattr(self, field))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"WorkItem({dict(self)!r})"
+
+
+class Pool:
+    """Interns strings and shares equal nested objects between the items of one compact_items call."""
+
+    def __init__(self):
+        self.shared = {}
+
+    def share(self, key, build):
+        value = self.shared.get(key)
+        if value is None:
+            value = self.shared[key] = build()
+        return value
+
+    def text(self, value):
+        return sys.intern(value) if isinstance(value, str) else value
+
+    def extra_info(self, field, info):
+        if not isinstance(info, dict):
+            return info
+        values = tuple(self.text(info.get(key)) for key in EXTRA_INFO_FIELDS[field])
+        return self.share((field, values), lambda: dict(zip(EXTRA_INFO_FIELDS[field], values)))
+
+    def epics(self, epics):
+        if not isinstance(epics, list):
+            return epics
+        ids = tuple(epic.get("id") if isinstance(epic, dict) else epic for epic in epics)
+        return self.share(("epics", ids), lambda: [self.share(("epic", i), lambda: {"id": i}) for i in ids])
+
+    def tags(self, tags):
+        if not isinstance(tags, list):
+            return tags
+        tags = tuple(
+            self.share(("tag",) + tuple(tag), lambda: tuple(self.text(v) for v in tag))
+            if isinstance(tag, (list, tuple)) else tag
+            for tag in tags
+        )
+        return self.share(("tags", tags), lambda: tags)
+
+
+def compact_item(item, pool=None):
+    """Return a WorkItem holding the ITEM_FIELDS of a Taiga item dict; WorkItems are returned as is."""
+    if isinstance(item, WorkItem):
+        return item
+    pool = pool or Pool()
+    record = WorkItem()
+    for field in ITEM_FIELDS:
+        if field not in item:
+            continue
+        value = item[field]
+        if field in EXTRA_INFO_FIELDS:
+            value = pool.extra_info(field, value)
+        elif field == "epics":
+            value = pool.epics(value)
+        elif field == "tags":
+            value = pool.tags(value)
+        setattr(record, field, value)
+    return record
+
+
+def compact_items(items):
+    """Convert a list of Taiga user stories, tasks or issues to WorkItems sharing one Pool."""
+    if items is None:
+        return None
+    pool = Pool()
+    return [compact_item(item, pool) for item in items]
@@ -0,0 +1,126 @@
+import random
+import threading
+import time
+import numpy as np
+import requests
+
+PERCENTILES = (50, 95, 99)
+
+
+def process_memory_mb(pid=None):
+    """Resident memory of a process (default: this one) in MB, read from /proc; None where that is unavailable."""
+    try:
+        with open(f"/proc/{pid or 'self'}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def run_load_test(base_url, paths, clients=20, duration=30, miss_ratio=0.1, api_key=None, pid=None, seed=0):
+    """
+    Run `clients` concurrent clients against base_url for `duration` seconds. Each client requests
+    a random one of paths, waits for the response and repeats. A miss_ratio share of the requests
+    carries a random blocked_q search term, so the page and the blocked items table cannot come
+    from the view cache; other widgets do not key on it. Each response is counted as a view cache
+    hit or miss by its X-View-Cache header, whatever was requested. The memory of process pid,
+    if given, is sampled throughout. Returns the stats printed by format_report.
+    """
+    results = []  # (kind, path, status code or None on a connection error, seconds)
+    lock = threading.Lock()
+    memory = []
+    started = time.perf_counter()
+    deadline = started + duration
+
+    def client(number):
+        rng = random.Random(f"{seed}-{number}")
+        session = requests.Session()
+        own = []
+        while time.perf_counter() < deadline:
+            path = rng.choice(paths)
+            params = {"key": api_key} if api_key else {}
+            if rng.random() < miss_ratio:
+                params["blocked_q"] = f"load-test-{rng.getrandbits(48):x}"
+            start = time.perf_counter()
+            try:
+                response = session.get(base_url + path, params=params, timeout=120)
+                status = response.status_code
+                kind = response.headers.get("X-View-Cache", "other")
+            except requests.RequestException:
+                status, kind = None, "error"
+            own.append((kind, path, status, time.perf_counter() - start))
+        with lock:
+            results.extend(own)
+
+    def sample_memory():
+        while pid and time.perf_counter() < deadline:
+            memory.append(process_memory_mb(pid))
+            time.sleep(0.5)
+
+    threads = [threading.Thread(target=client, args=(n,), daemon=True) for n in range(clients)]
+    threads.append(threading.Thread(target=sample_memory, daemon=True))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if pid:
+        memory.append(process_memory_mb(pid))
+    return summarize(results, time.perf_counter() - started, [m for m in memory if m is not None], clients)
+
+
+def latency_stats(rows):
+    latencies = np.array([row[3] for row in rows]) * 1000
+    stats = {"requests": len(rows)}
+    for p in PERCENTILES:
+        stats[f"p{p}_ms"] = float(np.percentile(latencies, p)) if len(rows) else None
+    return stats
+
+
+def summarize(results, elapsed, memory, clients):
+    errors = sum(1 for _, _, status, _ in results if status is None or status >= 400)
+    return {
+        "clients": clients,
+        "elapsed_s": elapsed,
+        "requests": len(results),
+        "throughput_rps": len(results) / elapsed if elapsed else 0.0,
+        "error_rate": errors / len(results) if results else 0.0,
+        "latency": latency_stats(results),
+        "by_kind": {
+            kind: latency_stats([r for r in results if r[0] == kind]) for kind in sorted({r[0] for r in results})
+        },
+        "by_path": {
+            f"{path} ({kind})": latency_stats([r for r in results if r[1] == path and r[0] == kind])
+            for path, kind in sorted({(r[1], r[0]) for r in results})
+        },
+        "memory_mb": {
+            "start": memory[0] if memory else None,
+            "peak": max(memory) if memory else None,
+            "end": memory[-1] if memory else None,
+        },
+    }
+
+
+def format_report(stats):
+    """Return stats from run_load_test as a plain-text table."""
+
+    def row(label, s):
+        values = "  ".join(
+            f"p{p} {s[f'p{p}_ms']:8.1f} ms" if s[f"p{p}_ms"] is not None else f"p{p}      n/a   " for p in PERCENTILES
+        )
+        return f"  {label:<36} {s['requests']:>7}  {values}"
+
+    memory = stats["memory_mb"]
+    lines = [
+        f"{stats['requests']} requests from {stats['clients']} clients in {stats['elapsed_s']:.1f} s: "
+        f"{stats['throughput_rps']:.1f} requests/s, {stats['error_rate']:.2%} errors",
+        row("all", stats["latency"]),
+    ]
+    lines += [row(f"view cache {kind}", s) for kind, s in stats["by_kind"].items()]
+    lines += [row(path, s) for path, s in stats["by_path"].items()]
+    if memory["peak"] is not None:
+        lines.append(
+            f"Worker memory: {memory['start']:.0f} MB at start, {memory['peak']:.0f} MB peak, {memory['end']:.0f} MB at end"
+        )
+    return "\n".join(lines)
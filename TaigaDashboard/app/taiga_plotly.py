@@ -1,59 +1,84 @@
-﻿import plotly.graph_objs as go
-import plotly
+﻿import plotly
 import os
 from collections import defaultdict, Counter
 from datetime import datetime, timedelta, timezone
-import pandas as pd
-import random
-
-
-def get_int_from_env(var_name, default=0):
-    """Read an integer value from env, or return default."""
-    value = os.getenv(var_name)
-    if value is None:
-        return default
-    try:
-        return int(value)
-    except ValueError:
-        return default
-
-
-def get_statuses_from_env(var_name, default=None):
-    """Read a comma-separated status list from env, return as a set of lowercased strings."""
-    value = os.getenv(var_name)
-    if value is None:
-        return set(default or [])
-    return set(v.strip().lower() for v in value.split(",") if v.strip())
-
-
-EPIC_DAYS_AFTER_CLOSE = get_int_from_env("EPIC_DAYS_AFTER_CLOSE", 14)
-USER_STORY_DAYS_AFTER_CLOSE = get_int_from_env("USER_STORY_DAYS_AFTER_CLOSE", 14)
-TASK_DAYS_AFTER_CLOSE = get_int_from_env("TASK_DAYS_AFTER_CLOSE", 14)
-ISSUE_DAYS_AFTER_CLOSE = get_int_from_env("ISSUE_DAYS_AFTER_CLOSE", 14)
-
-USER_STORY_DONE_STATUSES = get_statuses_from_env("USER_STORY_DONE_STATUSES", ["done"])
-USER_STORY_IN_PROGRESS_STATUSES = get_statuses_from_env(
-    "USER_STORY_IN_PROGRESS_STATUSES", ["in progress"]
-)
-USER_STORY_NEW_STATUSES = get_statuses_from_env("USER_STORY_NEW_STATUSES", ["new"])
+import html
+import json
+import zlib
+from markupsafe import escape
+from app.taiga_config import config, get_int_from_env
+from app.taiga_tagcloud import get_layout_bounds, layout_tag_cloud
+from app.taiga_lazy import LazyModule
+
+go = LazyModule("plotly.graph_objs")
+np = LazyModule("numpy")
+
+# Rows per page of the assignment/creator heatmaps; people beyond the page are summed into "Others"
+HEATMAP_ROWS = get_int_from_env("HEATMAP_ROWS", 20)
+HEATMAP_COLUMNS = get_int_from_env("HEATMAP_COLUMNS", 12)  # priority columns; the rest become "Others"
+BLOCKED_PAGE_SIZE = get_int_from_env("BLOCKED_PAGE_SIZE", 25)  # rows per page of the blocked items table
+TAG_CLOUD_MAX_TAGS = get_int_from_env("TAG_CLOUD_MAX_TAGS", 50)
+TAG_CLOUD_SEED = get_int_from_env("TAG_CLOUD_SEED", 0)  # rotates the spiral the tag cloud is laid out on
+TAG_CLOUD_WIDTH = get_int_from_env("TAG_CLOUD_WIDTH", 1000)  # pixels; larger clouds are scaled down to fit
+
+
+def get_bucket_status_names(item_type, status_config=None):
+    """Return the configured (done, in progress) status names for 'userstory', 'task' or 'issue'."""
+    names = (status_config or config.status_config())[item_type]
+    return names["done"], names["in_progress"]
+
+
+def status_bucket_from_name(name, item_type, status_config=None):
+    """Classify a status name as Done, In Progress or New using the configured status lists."""
+    done_statuses, in_progress_statuses = get_bucket_status_names(item_type, status_config)
+    name = (name or "").strip().lower()
+    if name in done_statuses:
+        return "Done"
+    elif name in in_progress_statuses:
+        return "In Progress"
+    return "New"
+
+
+def build_status_bucket_lookup(statuses, item_type, status_config=None):
+    """
+    Map each status id of a Taiga status list to Done, In Progress or New.
+    Configured status names win; otherwise Taiga's is_closed flag marks a status as Done.
+    """
+    lookup = {}
+    for status in statuses or []:
+        bucket = status_bucket_from_name(status.get("name"), item_type, status_config)
+        if bucket == "New" and status.get("is_closed", False):
+            bucket = "Done"
+        lookup[status["id"]] = bucket
+    return lookup
+
+
+def build_status_buckets(userstory_statuses, task_statuses, issue_statuses, status_config=None):
+    """Return {'userstory': {status_id: bucket}, 'task': {...}, 'issue': {...}} for a project."""
+    status_config = status_config or config.status_config()
+    return {
+        "userstory": build_status_bucket_lookup(userstory_statuses, "userstory", status_config),
+        "task": build_status_bucket_lookup(task_statuses, "task", status_config),
+        "issue": build_status_bucket_lookup(issue_statuses, "issue", status_config),
+    }
 
-TASK_DONE_STATUSES = get_statuses_from_env("TASK_DONE_STATUSES", ["done"])
-TASK_IN_PROGRESS_STATUSES = get_statuses_from_env(
-    "TASK_IN_PROGRESS_STATUSES", ["in progress"]
-)
-TASK_NEW_STATUSES = get_statuses_from_env("TASK_NEW_STATUSES", ["new"])
 
-ISSUE_DONE_STATUSES = get_statuses_from_env("ISSUE_DONE_STATUSES", ["done"])
-ISSUE_IN_PROGRESS_STATUSES = get_statuses_from_env(
-    "ISSUE_IN_PROGRESS_STATUSES", ["in progress"]
-)
-ISSUE_NEW_STATUSES = get_statuses_from_env("ISSUE_NEW_STATUSES", ["new"])
+def get_status_bucket(item, item_type, status_buckets=None):
+    """
+    Return the Done/In Progress/New bucket of an item.
+    Uses the precomputed status id lookup when available and falls back to the status name.
+    """
+    if status_buckets:
+        bucket = status_buckets[item_type].get(item.get("status"))
+        if bucket is not None:
+            return bucket
+    return status_bucket_from_name((item.get("status_extra_info") or {}).get("name"), item_type)
 
 
 def filter_relevant_epics(epics, now=None):
     """Return only epics that are open, or closed but modified within N days."""
     now = now or datetime.utcnow()
-    cutoff = now - timedelta(days=EPIC_DAYS_AFTER_CLOSE)
+    cutoff = now - timedelta(days=config.days_after_close("epic"))
     relevant = []
     for epic in epics:
         if not epic.get("is_closed", False):
@@ -68,7 +93,7 @@ def filter_relevant_epics(epics, now=None):
 def filter_relevant_issues(issues, now=None):
     """Return only issues that are open, or closed and completed within N days."""
     now = now or datetime.utcnow()
-    cutoff = now - timedelta(days=ISSUE_DAYS_AFTER_CLOSE)
+    cutoff = now - timedelta(days=config.days_after_close("issue"))
     relevant = []
     for issue in issues:
         # 'is_closed' should be True/False in Taiga data
@@ -94,7 +119,7 @@ def filter_relevant_issues(issues, now=None):
 def filter_relevant_userstories(stories, now=None):
     """Return only user stories that are open, or closed and completed within N days."""
     now = now or datetime.utcnow()
-    cutoff = now - timedelta(days=USER_STORY_DAYS_AFTER_CLOSE)
+    cutoff = now - timedelta(days=config.days_after_close("userstory"))
     relevant = []
     for story in stories:
         if not story.get("is_closed", False):
@@ -117,7 +142,7 @@ def filter_relevant_userstories(stories, now=None):
 def filter_relevant_tasks(tasks, now=None):
     """Return only tasks that are open, or closed and completed within N days."""
     now = now or datetime.utcnow()
-    cutoff = now - timedelta(days=TASK_DAYS_AFTER_CLOSE)
+    cutoff = now - timedelta(days=config.days_after_close("task"))
     relevant = []
     for task in tasks:
         if not task.get("is_closed", False):
@@ -137,7 +162,19 @@ def filter_relevant_tasks(tasks, now=None):
     return relevant
 
 
+def get_plotly_cdn_url():
+    """Return the CDN URL of the plotly.js bundle that matches the installed plotly package."""
+    return f"https://cdn.plot.ly/plotly-{plotly.offline.get_plotlyjs_version()}.min.js"
+
+
+def status_names_html(names):
+    """Comma-separated, escaped status names: they come from the config file, which is reloaded at runtime."""
+    return escape(", ".join(sorted(names)))
+
+
 def get_dashboard_config_html():
+    days = config.retention_config()
+    statuses = config.status_config()
     return f"""
     <div class="dashboard-config-summary" style="margin-bottom: 2em;text-align:center;">
       <button id="toggle-dashboard-config-btn" style="margin-bottom: 8px;">Show Dashboard Filters &#9660;</button>
@@ -152,31 +189,31 @@ def get_dashboard_config_html():
             </tr>
             <tr>
                 <td style="border:1px solid #ccc;padding:4px;">Epic</td>
-                <td style="border:1px solid #ccc;padding:4px;">{EPIC_DAYS_AFTER_CLOSE}</td>
+                <td style="border:1px solid #ccc;padding:4px;">{days['epic']}</td>
                 <td style="border:1px solid #ccc;padding:4px;">-</td>
                 <td style="border:1px solid #ccc;padding:4px;">-</td>
                 <td style="border:1px solid #ccc;padding:4px;">-</td>
             </tr>
             <tr>
                 <td style="border:1px solid #ccc;padding:4px;">User Story</td>
-                <td style="border:1px solid #ccc;padding:4px;">{USER_STORY_DAYS_AFTER_CLOSE}</td>
-                <td style="border:1px solid #ccc;padding:4px;">{', '.join(USER_STORY_DONE_STATUSES)}</td>
-                <td style="border:1px solid #ccc;padding:4px;">{', '.join(USER_STORY_IN_PROGRESS_STATUSES)}</td>
-                <td style="border:1px solid #ccc;padding:4px;">{', '.join(USER_STORY_NEW_STATUSES)}</td>
+                <td style="border:1px solid #ccc;padding:4px;">{days['userstory']}</td>
+                <td style="border:1px solid #ccc;padding:4px;">{status_names_html(statuses['userstory']['done'])}</td>
+                <td style="border:1px solid #ccc;padding:4px;">{status_names_html(statuses['userstory']['in_progress'])}</td>
+                <td style="border:1px solid #ccc;padding:4px;">{status_names_html(statuses['userstory']['new'])}</td>
             </tr>
             <tr>
                 <td style="border:1px solid #ccc;padding:4px;">Task</td>
-                <td style="border:1px solid #ccc;padding:4px;">{TASK_DAYS_AFTER_CLOSE}</td>
-                <td style="border:1px solid #ccc;padding:4px;">{', '.join(TASK_DONE_STATUSES)}</td>
-                <td style="border:1px solid #ccc;padding:4px;">{', '.join(TASK_IN_PROGRESS_STATUSES)}</td>
-                <td style="border:1px solid #ccc;padding:4px;">{', '.join(TASK_NEW_STATUSES)}</td>
+                <td style="border:1px solid #ccc;padding:4px;">{days['task']}</td>
+                <td style="border:1px solid #ccc;padding:4px;">{status_names_html(statuses['task']['done'])}</td>
+                <td style="border:1px solid #ccc;padding:4px;">{status_names_html(statuses['task']['in_progress'])}</td>
+                <td style="border:1px solid #ccc;padding:4px;">{status_names_html(statuses['task']['new'])}</td>
             </tr>
             <tr>
                 <td style="border:1px solid #ccc;padding:4px;">Issue</td>
-                <td style="border:1px solid #ccc;padding:4px;">{ISSUE_DAYS_AFTER_CLOSE}</td>
-                <td style="border:1px solid #ccc;padding:4px;">{', '.join(ISSUE_DONE_STATUSES)}</td>
-                <td style="border:1px solid #ccc;padding:4px;">{', '.join(ISSUE_IN_PROGRESS_STATUSES)}</td>
-                <td style="border:1px solid #ccc;padding:4px;">{', '.join(ISSUE_NEW_STATUSES)}</td>
+                <td style="border:1px solid #ccc;padding:4px;">{days['issue']}</td>
+                <td style="border:1px solid #ccc;padding:4px;">{status_names_html(statuses['issue']['done'])}</td>
+                <td style="border:1px solid #ccc;padding:4px;">{status_names_html(statuses['issue']['in_progress'])}</td>
+                <td style="border:1px solid #ccc;padding:4px;">{status_names_html(statuses['issue']['new'])}</td>
             </tr>
           </table>
         </div>
@@ -198,130 +235,92 @@ def get_dashboard_config_html():
     """
 
 
-def get_epic_progress_html(epics, userstories):
+def get_epic_progress_html(epics, userstories, status_buckets=None):
     """
-    Takes Taiga API lists of epics and user stories.
+    Takes Taiga API lists of epics and user stories, and optionally the lookup from build_status_buckets.
     Returns HTML for a Plotly stacked horizontal bar chart showing epic progress:
     - Green: percent of user stories Done/Closed
     - Orange: percent of user stories In Progress (customizable status names)
     - Gray: percent New
     Also displays: epic status, total stories, and story counts per section.
     """
+    return get_epic_progress_chart_html(*count_epic_progress(epics, userstories, status_buckets))
+
+
+# Columns of the story counts of count_epic_progress; any other bucket counts as New
+PROGRESS_COLUMNS = {"Done": 0, "In Progress": 1}
+
+
+def count_epic_progress(epics, userstories, status_buckets=None):
+    """
+    Return the subjects of the relevant epics (see filter_relevant_epics) and an array with a
+    row of (Done, In Progress, New) user story counts per epic.
+    """
     # Filter epics to only those that are relevant (not closed or recently modified)
     epics = filter_relevant_epics(epics)
+    epic_rows = {}
+    for epic in epics:
+        epic_rows.setdefault(epic["id"], len(epic_rows))
+    labels = [None] * len(epic_rows)
+    for epic in epics:
+        labels[epic_rows[epic["id"]]] = epic["subject"]
 
-    # Map epic id to epic name for ordering and display
-    epic_id_to_name = {epic["id"]: epic["subject"] for epic in epics}
-    epic_id_to_status = {
-        epic["id"]: epic.get("status_extra_info", {}).get("name", "") for epic in epics
-    }
-    epic_ids = [epic["id"] for epic in epics]
-    epic_names = [epic_id_to_name[eid] for eid in epic_ids]
-
-    # Build a mapping: epic_id -> list of user stories
-    epic_to_stories = {eid: [] for eid in epic_ids}
+    # One (epic row, bucket column) pair per story in an epic; Taiga's 'epics' is a list of dicts or None
+    rows, columns = [], []
     for us in userstories:
-        # Taiga user stories: 'epics' is a list of dicts (can also be None)
         epics_field = us.get("epics")
         if isinstance(epics_field, list):
             for epic_ref in epics_field:
-                eid = epic_ref.get("id")
-                if eid in epic_to_stories:
-                    epic_to_stories[eid].append(us)
-
-    # Compute stacked bar percentages and counts for each epic
-    done_perc, in_progress_perc, not_started_perc = [], [], []
-    done_counts, in_progress_counts, not_started_counts = [], [], []
-    total_counts = []
-    y_labels = []  # this will include subject, (epic status), and total stories
-
-    for eid in epic_ids:
-        stories = epic_to_stories[eid]
-        total = len(stories)
-        total_counts.append(total)
-        done_count = 0
-        in_progress_count = 0
-        new_count = 0  # not used for bar color, but available for future
-        for s in stories:
-            status = (s.get("status_extra_info", {}).get("name") or "").strip().lower()
-            if status in USER_STORY_DONE_STATUSES:
-                done_count += 1
-            elif status in USER_STORY_IN_PROGRESS_STATUSES:
-                in_progress_count += 1
-            elif status in USER_STORY_NEW_STATUSES:
-                new_count += 1
-        not_started_count = total - done_count - in_progress_count
-
-        # Percentages (avoid div by zero)
-        done_perc.append(100 * done_count / total if total else 0)
-        in_progress_perc.append(100 * in_progress_count / total if total else 0)
-        not_started_perc.append(100 * not_started_count / total if total else 100)
-
-        done_counts.append(done_count)
-        in_progress_counts.append(in_progress_count)
-        not_started_counts.append(not_started_count)
-
-        # Build y label: Epic name (Status) [Stories: N]
-        epic_status = epic_id_to_status.get(eid, "")
-        # label = f"{epic_id_to_name[eid]} ({epic_status}) [{total}]"
-        label = f"{epic_id_to_name[eid]}"
-        y_labels.append(label)
+                row = epic_rows.get(epic_ref.get("id"))
+                if row is not None:
+                    rows.append(row)
+                    columns.append(PROGRESS_COLUMNS.get(get_status_bucket(us, "userstory", status_buckets), 2))
+    cells = np.asarray(rows, dtype=np.int64) * 3 + np.asarray(columns, dtype=np.int64)
+    counts = np.bincount(cells, minlength=3 * len(labels)).reshape(len(labels), 3)
+    return labels, counts
+
+
+def get_epic_progress_chart_html(labels, counts, title="Epics Progress Overview", axis_title="Epic"):
+    """
+    Returns HTML for the stacked horizontal bar chart of get_epic_progress_html: one bar per label,
+    from a row of (Done, In Progress, New) user story counts each (see count_epic_progress).
+    """
+    counts = np.asarray(counts, dtype=np.int64).reshape(-1, 3)
+    totals = counts.sum(axis=1)
+    percents = np.zeros(counts.shape)
+    np.divide(100 * counts, totals[:, None], out=percents, where=totals[:, None] > 0)
+    percents[totals == 0, 2] = 100  # a bar without stories shows as New
 
     # Bar segment text (percent + count)
-    done_text = [
-        f"{perc:.0f}% ({count}/{total})" if total else "0% (0/0)"
-        for perc, count, total in zip(done_perc, done_counts, total_counts)
-    ]
-    in_progress_text = [
-        f"{perc:.0f}% ({count}/{total})" if total else "0% (0/0)"
-        for perc, count, total in zip(
-            in_progress_perc, in_progress_counts, total_counts
-        )
+    texts = [
+        [
+            f"{perc:.0f}% ({count}/{total})" if total else "0% (0/0)"
+            for perc, count, total in zip(percents[:, column].tolist(), counts[:, column].tolist(), totals.tolist())
+        ]
+        for column in range(3)
     ]
-    not_started_text = [
-        f"{perc:.0f}% ({count}/{total})" if total else "0% (0/0)"
-        for perc, count, total in zip(
-            not_started_perc, not_started_counts, total_counts
+    bars = [
+        go.Bar(
+            x=percents[:, column].tolist(),
+            y=labels,
+            orientation="h",
+            name=name,
+            marker=dict(color=color),
+            text=texts[column],
+            textposition="inside",
         )
+        for column, (name, color) in enumerate((("Completed", "green"), ("In Progress", "orange"), ("New", "lightgray")))
     ]
 
-    bar_done = go.Bar(
-        x=done_perc,
-        y=y_labels,
-        orientation="h",
-        name="Completed",
-        marker=dict(color="green"),
-        text=done_text,
-        textposition="inside",
-    )
-    bar_in_progress = go.Bar(
-        x=in_progress_perc,
-        y=y_labels,
-        orientation="h",
-        name="In Progress",
-        marker=dict(color="orange"),
-        text=in_progress_text,
-        textposition="inside",
-    )
-    bar_not_started = go.Bar(
-        x=not_started_perc,
-        y=y_labels,
-        orientation="h",
-        name="New",
-        marker=dict(color="lightgray"),
-        text=not_started_text,
-        textposition="inside",
-    )
-
     layout = go.Layout(
-        title="Epics Progress Overview",
+        title=title,
         xaxis=dict(title="Progress (%)", range=[0, 100]),
-        yaxis=dict(title="Epic"),
+        yaxis=dict(title=axis_title),
         barmode="stack",
-        height=50 * max(1, len(y_labels)),
+        height=50 * max(1, len(labels)),
         margin=dict(l=40, r=40, t=40, b=40),
     )
-    fig = go.Figure(data=[bar_done, bar_in_progress, bar_not_started], layout=layout)
+    fig = go.Figure(data=bars, layout=layout)
     epic_progress_bar_html = plotly.io.to_html(
         fig, include_plotlyjs="cdn", full_html=False
     )
@@ -387,16 +386,19 @@ def format_date_range(start, end):
     return f"{start_dt.strftime('%m/%d/%y')} to {end_dt.strftime('%m/%d/%y')}"
 
 
-def get_task_status_breakdown_html(userstories, tasks, issues, sprints, title):
+def get_task_status_breakdown_html(
+    userstories, tasks, issues, sprints, title, status_buckets=None, num_future=1, num_completed=1
+):
     """
     Returns HTML for a stacked bar chart:
-      - X-axis: sprint names (filtered: No Sprint, then active/future/completed ordered by start date)
+      - X-axis: sprint names (filtered: No Sprint, all active, the next num_future and the last
+        num_completed sprints, ordered by start date)
       - Each bar: counts of user stories, tasks, and issues in each status per group
       - Bar order: Done (bottom), In Progress (middle), New (top)
       - Sprint label: name\nYYYY-MM-DD to YYYY-MM-DD\nStatus
     """
     # Filter sprints to active, next, most recent completed
-    show_sprints, show_sprint_ids = filter_sprints_for_chart(sprints, 1, 1)
+    show_sprints, show_sprint_ids = filter_sprints_for_chart(sprints, num_future, num_completed)
     today = datetime.utcnow().date()
     # Build mapping: sprint id -> sprint object
     sprint_id_to_obj = {s["id"]: s for s in show_sprints}
@@ -448,45 +450,11 @@ def get_task_status_breakdown_html(userstories, tasks, issues, sprints, title):
     # Main counts: group_id -> counts by status
     group_counts = defaultdict(lambda: {"Done": 0, "In Progress": 0, "New": 0})
 
-    # Helper for status categorization
-    def get_status_bucket(item, done_statuses, in_progress_statuses, new_statuses):
-        status_raw = (
-            (item.get("status_extra_info", {}).get("name") or "").strip().lower()
-        )
-        if status_raw in [s.lower() for s in done_statuses]:
-            return "Done"
-        elif status_raw in [s.lower() for s in in_progress_statuses]:
-            return "In Progress"
-        else:
-            return "New"
-
     for group_id, item, item_type in all_items:
         # Only count if in our filtered set or it's "No Sprint"
         if group_id not in sprint_id_to_obj and group_id is not None:
             continue
-        if item_type == "userstory":
-            bucket = get_status_bucket(
-                item,
-                USER_STORY_DONE_STATUSES,
-                USER_STORY_IN_PROGRESS_STATUSES,
-                USER_STORY_NEW_STATUSES,
-            )
-        elif item_type == "task":
-            bucket = get_status_bucket(
-                item,
-                TASK_DONE_STATUSES,
-                TASK_IN_PROGRESS_STATUSES,
-                TASK_NEW_STATUSES,
-            )
-        elif item_type == "issue":
-            bucket = get_status_bucket(
-                item,
-                ISSUE_DONE_STATUSES,
-                ISSUE_IN_PROGRESS_STATUSES,
-                ISSUE_NEW_STATUSES,
-            )
-        else:
-            bucket = "New"
+        bucket = get_status_bucket(item, item_type, status_buckets)
         group_counts[group_id][bucket] += 1
 
     done_counts = [group_counts[gid]["Done"] for gid in ordered_group_ids]
@@ -538,291 +506,354 @@ def get_task_status_breakdown_html(userstories, tasks, issues, sprints, title):
     return plotly.io.to_html(fig, include_plotlyjs="cdn", full_html=False)
 
 
-def get_task_assignment_heatmap_html(
-    users, userstories, tasks, issues, column_metric="status"
-):
-    """
-    Returns an HTML div containing a Plotly assignment heatmap based on users, userstories, tasks, and issues.
-    Assumes *_STATUSES variables are defined in the outer scope.
-    """
+def get_empty_widget_html(message):
+    """Returns the grey notice box shown in place of a chart that has nothing to plot."""
+    return (
+        "<div style='padding:24px;text-align:center;border-radius:8px;background:#f9f9f9;"
+        "border:1.5px solid #e1e1e1;font-size:1.2em;color:#999;'>"
+        f"{message}"
+        "</div>"
+    )
 
-    # Filter relevant items
-    userstories = filter_relevant_userstories(userstories)
-    tasks = filter_relevant_tasks(tasks)
-    issues = filter_relevant_issues(issues)
 
-    # --- Build user lookup ---
-    user_lookup = {
-        u["id"]: u.get("full_name_display") or u.get("full_name") or u.get("username")
-        for u in users
-    }
-    user_lookup[None] = "Unassigned"
-
-    # --- Helper to get assignee name ---
-    def get_assignee(obj):
-        assignee_id = obj.get("assigned_to")
-        return user_lookup.get(assignee_id, "Unassigned")
-
-    # --- Helper to get status or priority ---
-    def get_status(obj):
-        info = obj.get("status_extra_info")
-        if info and isinstance(info, dict):
-            return info.get("name", "Unknown")
-        return str(obj.get("status", "Unknown"))
-
-    def get_priority(obj):
-        info = obj.get("priority_extra_info")
-        if info and isinstance(info, dict):
-            return info.get("name", "Normal")
-        return str(obj.get("priority", "Normal"))
-
-    # --- Mapping to New, In Progress, Done ---
-    def map_to_bucket(status, done, in_progress, not_started):
-        s = str(status).strip().lower()
-        if s in [d.lower() for d in done]:
-            return "Done"
-        elif s in [p.lower() for p in in_progress]:
-            return "In Progress"
-        elif s in [n.lower() for n in not_started]:
-            return "New"
-        else:
-            return "New"
+def get_cumulative_flow_html(history, item_type="userstory"):
+    """
+    Returns HTML for a cumulative flow diagram (stacked areas of Done, In Progress and New per day)
+    built from the daily snapshot history of app.taiga_snapshots.load_history.
+    Render cost depends on the number of days recorded, not on the number of items.
+    """
+    days = history["days"] if history else []
+    series = history["project"].get(item_type) if history else None
+    if not days or not series:
+        return get_empty_widget_html("No daily snapshots recorded yet.")
 
-    # --- Flatten all items to assignee/metric ---
-    items = []
-    for us in userstories:
-        assignee = get_assignee(us)
-        status_val = get_status(us) if column_metric == "status" else get_priority(us)
-        bucket = (
-            map_to_bucket(
-                status_val,
-                USER_STORY_DONE_STATUSES,
-                USER_STORY_IN_PROGRESS_STATUSES,
-                USER_STORY_NEW_STATUSES,
-            )
-            if column_metric == "status"
-            else status_val
-        )
-        items.append((assignee, bucket))
-    for t in tasks:
-        assignee = get_assignee(t)
-        status_val = get_status(t) if column_metric == "status" else get_priority(t)
-        bucket = (
-            map_to_bucket(
-                status_val,
-                TASK_DONE_STATUSES,
-                TASK_IN_PROGRESS_STATUSES,
-                TASK_NEW_STATUSES,
-            )
-            if column_metric == "status"
-            else status_val
-        )
-        items.append((assignee, bucket))
-    for iss in issues:
-        assignee = get_assignee(iss)
-        status_val = get_status(iss) if column_metric == "status" else get_priority(iss)
-        bucket = (
-            map_to_bucket(
-                status_val,
-                ISSUE_DONE_STATUSES,
-                ISSUE_IN_PROGRESS_STATUSES,
-                ISSUE_NEW_STATUSES,
+    colors = {"Done": "green", "In Progress": "orange", "New": "lightgray"}
+    fig = go.Figure(
+        data=[
+            go.Scatter(
+                x=days,
+                y=series[bucket],
+                name=bucket,
+                mode="lines",
+                stackgroup="flow",
+                line=dict(width=0.5, color=colors[bucket]),
             )
-            if column_metric == "status"
-            else status_val
-        )
-        items.append((assignee, bucket))
+            for bucket in ("Done", "In Progress", "New")
+        ]
+    )
+    fig.update_layout(
+        title="User Story Cumulative Flow",
+        xaxis_title="Day",
+        yaxis_title="Number of Items",
+        height=450,
+        margin=dict(l=40, r=40, t=40, b=40),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+    )
+    return fig.to_html(include_plotlyjs="cdn", full_html=False)
 
-    # --- Build sorted lists of users and metrics (columns) ---
-    assignees = sorted(set([a for a, _ in items if a != "Unassigned"]))
-    if "Unassigned" not in assignees:
-        assignees.append("Unassigned")
-    else:
-        assignees = [a for a in assignees if a != "Unassigned"] + ["Unassigned"]
 
-    if column_metric == "status":
-        COLUMNS = ["New", "In Progress", "Done"]
-    else:
-        COLUMNS = sorted(set([m for _, m in items]))
-
-    df = pd.DataFrame(items, columns=["assignee", "metric"])
-    heatmap_df = (
-        df.groupby(["assignee", "metric"])
-        .size()
-        .unstack(fill_value=0)
-        .reindex(index=assignees, columns=COLUMNS, fill_value=0)
-    )
+def get_sprint_burndown_html(history, sprints):
+    """
+    Returns HTML for a burndown chart of the active sprint (or the most recently completed one):
+    remaining (not Done) user stories, tasks and issues per recorded day, against an ideal line
+    from the first recorded count down to zero at the sprint's estimated finish.
+    """
+    active, _, completed = classify_sprints(sprints)
+    sprint = active[0] if active else (completed[0] if completed else None)
+    series = history["sprint"].get(sprint["id"]) if history and sprint else None
+    if not series:
+        return get_empty_widget_html("No sprint snapshots recorded yet.")
+
+    days = np.array(history["days"])
+    in_sprint = (days >= sprint["estimated_start"]) & (days <= sprint["estimated_finish"])
+    remaining = (series["New"] + series["In Progress"])[in_sprint]
+    days = days[in_sprint]
+    if not len(days):
+        return get_empty_widget_html("No snapshots recorded during this sprint yet.")
 
     fig = go.Figure(
-        data=go.Heatmap(
-            z=heatmap_df.values,
-            x=heatmap_df.columns,
-            y=heatmap_df.index,
-            colorscale="Blues",
-            hoverongaps=False,
-            text=heatmap_df.values,
-            texttemplate="%{text}",
-            colorbar=dict(title="Task Count"),
-        )
+        data=[
+            go.Scatter(
+                x=[days[0], sprint["estimated_finish"]],
+                y=[int(remaining[0]), 0],
+                name="Ideal",
+                mode="lines",
+                line=dict(color="lightgray", dash="dash"),
+            ),
+            go.Scatter(
+                x=days,
+                y=remaining,
+                name="Remaining",
+                mode="lines+markers",
+                line=dict(color="orange"),
+            ),
+        ]
     )
     fig.update_layout(
-        title="User Story/Task/Issue Assignment Heatmap",
-        xaxis_title=(
-            column_metric.capitalize() if column_metric != "status" else "Status"
-        ),
-        yaxis_title="Assignee",
-        autosize=True,
-        margin=dict(l=60, r=40, t=60, b=60),
-        template="simple_white",
-        height=max(350, 30 * len(assignees) + 120),
+        title=f"Sprint Burndown: {sprint['name']} ({format_date_range(sprint['estimated_start'], sprint['estimated_finish'])})",
+        xaxis=dict(title="Day", range=[sprint["estimated_start"], sprint["estimated_finish"]]),
+        yaxis=dict(title="Remaining Items", rangemode="tozero"),
+        height=450,
+        margin=dict(l=40, r=40, t=40, b=40),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
     )
     return fig.to_html(include_plotlyjs="cdn", full_html=False)
 
-def get_task_createdby_heatmap_html(
-    users, userstories, tasks, issues, column_metric="status"
-):
+
+def get_cycle_time_histogram_html(cycle_times, max_bins=40):
     """
-    Returns an HTML div containing a Plotly heatmap based on creator (not assignee),
-    using users, userstories, tasks, and issues.
-    Assumes *_STATUSES variables are defined in the outer scope.
+    Returns HTML for side-by-side histograms of lead time (created -> finished) and
+    cycle time (first In Progress -> finished) in days, from app.taiga_history.get_cycle_times.
+    Bins are computed server-side with NumPy so the payload stays at max_bins bars per series.
     """
+    lead_time = cycle_times["lead_time"] if cycle_times else np.array([])
+    cycle_time = cycle_times["cycle_time"] if cycle_times else np.array([])
+    crawling = bool(cycle_times and cycle_times.get("crawling"))
+    if not len(lead_time) and not len(cycle_time):
+        if crawling:
+            return get_empty_widget_html("Loading item history; the histogram appears once it is crawled.")
+        return get_empty_widget_html("No finished items with history yet.")
+
+    longest = max(np.max(lead_time, initial=0), np.max(cycle_time, initial=0))
+    bin_days = max(1, int(np.ceil(longest / max_bins)))
+    edges = np.arange(0, longest + bin_days + 1, bin_days)
+    labels = [f"{int(start)}-{int(start + bin_days)}" for start in edges[:-1]]
+
+    traces = []
+    for name, values, color in (
+        ("Cycle Time", cycle_time, "orange"),
+        ("Lead Time", lead_time, "#636efa"),
+    ):
+        counts, _ = np.histogram(values, bins=edges)
+        median = f"{np.median(values):.1f}" if len(values) else "-"
+        traces.append(
+            go.Bar(x=labels, y=counts, name=f"{name} (median {median} days)", marker=dict(color=color))
+        )
 
-    # Filter relevant items
-    userstories = filter_relevant_userstories(userstories)
-    tasks = filter_relevant_tasks(tasks)
-    issues = filter_relevant_issues(issues)
+    fig = go.Figure(data=traces)
+    fig.update_layout(
+        title="Cycle Time and Lead Time of Finished User Stories/Tasks" + (" (crawling history...)" if crawling else ""),
+        xaxis_title="Days",
+        yaxis_title="Number of Items",
+        barmode="group",
+        height=450,
+        margin=dict(l=40, r=40, t=40, b=40),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+    )
+    return fig.to_html(include_plotlyjs="cdn", full_html=False)
 
-    # --- Build user lookup ---
-    user_lookup = {
-        u["id"]: u.get("full_name_display") or u.get("full_name") or u.get("username")
-        for u in users
-    }
-    user_lookup[None] = "Unknown"
-
-    # --- Helper to get creator name ---
-    def get_creator(obj):
-        # Taiga: "owner" is ID, "owner_extra_info" is dict with display name
-        owner_id = obj.get("owner")
-        return user_lookup.get(owner_id, "Unknown")
-
-    # --- Helper to get status or priority ---
-    def get_status(obj):
-        info = obj.get("status_extra_info")
-        if info and isinstance(info, dict):
-            return info.get("name", "Unknown")
-        return str(obj.get("status", "Unknown"))
-
-    def get_priority(obj):
-        info = obj.get("priority_extra_info")
-        if info and isinstance(info, dict):
-            return info.get("name", "Normal")
-        return str(obj.get("priority", "Normal"))
-
-    # --- Mapping to New, In Progress, Done ---
-    def map_to_bucket(status, done, in_progress, not_started):
-        s = str(status).strip().lower()
-        if s in [d.lower() for d in done]:
-            return "Done"
-        elif s in [p.lower() for p in in_progress]:
-            return "In Progress"
-        elif s in [n.lower() for n in not_started]:
-            return "New"
-        else:
-            return "New"
 
-    # --- Flatten all items to creator/metric ---
-    items = []
-    for us in userstories:
-        creator = get_creator(us)
-        status_val = get_status(us) if column_metric == "status" else get_priority(us)
-        bucket = (
-            map_to_bucket(
-                status_val,
-                USER_STORY_DONE_STATUSES,
-                USER_STORY_IN_PROGRESS_STATUSES,
-                USER_STORY_NEW_STATUSES,
-            )
-            if column_metric == "status"
-            else status_val
-        )
-        items.append((creator, bucket))
-    for t in tasks:
-        creator = get_creator(t)
-        status_val = get_status(t) if column_metric == "status" else get_priority(t)
-        bucket = (
-            map_to_bucket(
-                status_val,
-                TASK_DONE_STATUSES,
-                TASK_IN_PROGRESS_STATUSES,
-                TASK_NEW_STATUSES,
-            )
-            if column_metric == "status"
-            else status_val
-        )
-        items.append((creator, bucket))
-    for iss in issues:
-        creator = get_creator(iss)
-        status_val = get_status(iss) if column_metric == "status" else get_priority(iss)
-        bucket = (
-            map_to_bucket(
-                status_val,
-                ISSUE_DONE_STATUSES,
-                ISSUE_IN_PROGRESS_STATUSES,
-                ISSUE_NEW_STATUSES,
-            )
-            if column_metric == "status"
-            else status_val
+def get_priority_name(obj):
+    """Return the priority name of an item, or its priority id as a string."""
+    info = obj.get("priority_extra_info")
+    if info and isinstance(info, dict):
+        return info.get("name", "Normal")
+    return str(obj.get("priority", "Normal"))
+
+
+def count_heatmap_matrix(row_codes, column_codes, num_rows, num_columns):
+    """Count (row, column) pairs of integer codes into a num_rows x num_columns matrix with one bincount."""
+    flat = np.asarray(row_codes, dtype=np.int64) * num_columns + np.asarray(column_codes, dtype=np.int64)
+    return np.bincount(flat, minlength=num_rows * num_columns).reshape(num_rows, num_columns)
+
+
+def get_heatmap_pager_html(first_row, last_row, total_rows, page, sort):
+    """Row paging and sorting controls; they reload the page with heatmap_page/heatmap_sort set."""
+
+    def link(label, **params):
+        assignments = "".join(f"u.searchParams.set('heatmap_{k}','{v}');" for k, v in params.items())
+        return (
+            f'<a href="#" onclick="var u=new URL(window.location);{assignments}'
+            f'window.location=u;return false;">{label}</a>'
         )
-        items.append((creator, bucket))
 
-    # --- Build sorted lists of creators and metrics (columns) ---
-    creators = sorted(set([a for a, _ in items if a != "Unknown"]))
-    if "Unknown" not in creators:
-        creators.append("Unknown")
-    else:
-        creators = [a for a in creators if a != "Unknown"] + ["Unknown"]
+    controls = [f"Rows {first_row}-{last_row} of {total_rows}"]
+    if page > 1:
+        controls.append(link("&lsaquo; Previous", page=page - 1))
+    if last_row < total_rows:
+        controls.append(link("Next &rsaquo;", page=page + 1))
+    other_sort = "name" if sort == "load" else "load"
+    controls.append(link(f"Sort by {other_sort}", sort=other_sort, page=1))
+    return f'<div class="heatmap-pager" style="text-align:center;">{" &middot; ".join(controls)}</div>'
+
+
+def get_people_heatmap_html(
+    user_lookup,
+    person_field,
+    fallback_name,
+    userstories,
+    tasks,
+    issues,
+    column_metric,
+    status_buckets,
+    title,
+    yaxis_title,
+    max_rows,
+    page,
+    sort,
+):
+    """
+    Shared body of the assignment and creator heatmaps.
+    Items are reduced to integer (person, column) codes and counted with a NumPy bincount.
+    People are ordered by load (item count) or name and shown max_rows at a time; everyone not on
+    the current page is summed into an "Others" row, so the figure stays the same size however
+    large the team is. The fallback_name row (unassigned/unknown) is always shown last.
+    """
+    userstories = filter_relevant_userstories(userstories)
+    tasks = filter_relevant_tasks(tasks)
+    issues = filter_relevant_issues(issues)
 
     if column_metric == "status":
-        COLUMNS = ["New", "In Progress", "Done"]
+        columns = ["New", "In Progress", "Done"]
     else:
-        COLUMNS = sorted(set([m for _, m in items]))
-
-    df = pd.DataFrame(items, columns=["creator", "metric"])
-    heatmap_df = (
-        df.groupby(["creator", "metric"])
-        .size()
-        .unstack(fill_value=0)
-        .reindex(index=creators, columns=COLUMNS, fill_value=0)
-    )
+        columns = []
+    column_codes_by_name = {name: code for code, name in enumerate(columns)}
+    person_codes = {}
+    people = []
+    row_codes = []
+    column_codes = []
+    for item_type, objs in (("userstory", userstories), ("task", tasks), ("issue", issues)):
+        for obj in objs:
+            name = user_lookup.get(obj.get(person_field), fallback_name)
+            code = person_codes.get(name)
+            if code is None:
+                code = person_codes[name] = len(people)
+                people.append(name)
+            metric = (
+                get_status_bucket(obj, item_type, status_buckets)
+                if column_metric == "status"
+                else get_priority_name(obj)
+            )
+            column = column_codes_by_name.get(metric)
+            if column is None:
+                column = column_codes_by_name[metric] = len(columns)
+                columns.append(metric)
+            row_codes.append(code)
+            column_codes.append(column)
+
+    matrix = count_heatmap_matrix(row_codes, column_codes, len(people), len(columns))
+    if column_metric != "status":
+        # Keep the HEATMAP_COLUMNS most used values, by name, and sum the rest into "Others"
+        counts = matrix.sum(axis=0)
+        kept = sorted(range(len(columns)), key=lambda c: -counts[c])[:HEATMAP_COLUMNS]
+        rest = [c for c in range(len(columns)) if c not in kept]
+        kept.sort(key=lambda c: columns[c])
+        kept_matrix = matrix[:, kept]
+        names = [columns[c] for c in kept]
+        if rest:
+            kept_matrix = np.hstack([kept_matrix, matrix[:, rest].sum(axis=1, keepdims=True)])
+            names.append("Others")
+        matrix, columns = kept_matrix, names
+
+    # --- Order named people and cut the requested page; the rest becomes "Others" ---
+    fallback = person_codes.get(fallback_name)
+    named = [code for code in range(len(people)) if code != fallback]
+    if sort == "load":
+        loads = matrix.sum(axis=1)
+        named.sort(key=lambda code: (-loads[code], people[code]))
+    else:
+        named.sort(key=lambda code: people[code])
+    last_page = max(1, -(-len(named) // max_rows))
+    page = min(max(page, 1), last_page)
+    shown = named[(page - 1) * max_rows:page * max_rows]
+
+    rows = [people[code] for code in shown]
+    z = [matrix[code] for code in shown]
+    if len(shown) < len(named):
+        hidden = np.setdiff1d(np.array(named, dtype=np.int64), np.array(shown, dtype=np.int64))
+        rows.append(f"Others ({len(hidden)})")
+        z.append(matrix[hidden].sum(axis=0))
+    rows.append(fallback_name)
+    z.append(matrix[fallback] if fallback is not None else np.zeros(len(columns), dtype=np.int64))
+    z = np.vstack(z) if columns else np.zeros((len(rows), 0), dtype=np.int64)
 
     fig = go.Figure(
         data=go.Heatmap(
-            z=heatmap_df.values,
-            x=heatmap_df.columns,
-            y=heatmap_df.index,
+            z=z,
+            x=columns,
+            y=rows,
             colorscale="Blues",
             hoverongaps=False,
-            text=heatmap_df.values,
+            text=z,
             texttemplate="%{text}",
             colorbar=dict(title="Task Count"),
         )
     )
     fig.update_layout(
-        title="User Story/Task/Issue Creator Heatmap",
+        title=title,
         xaxis_title=(
             column_metric.capitalize() if column_metric != "status" else "Status"
         ),
-        yaxis_title="Created By",
+        yaxis_title=yaxis_title,
+        yaxis=dict(autorange="reversed") if sort == "load" else None,
         autosize=True,
         margin=dict(l=60, r=40, t=60, b=60),
         template="simple_white",
-        height=max(350, 30 * len(creators) + 120),
+        height=max(350, 30 * len(rows) + 120),
+    )
+    html = fig.to_html(include_plotlyjs="cdn", full_html=False)
+    if len(named) > max_rows:
+        first_row = (page - 1) * max_rows + 1
+        html += get_heatmap_pager_html(first_row, first_row + len(shown) - 1, len(named), page, sort)
+    return html
+
+
+def get_task_assignment_heatmap_html(
+    users,
+    userstories,
+    tasks,
+    issues,
+    column_metric="status",
+    status_buckets=None,
+    max_rows=HEATMAP_ROWS,
+    page=1,
+    sort="load",
+):
+    """
+    Returns an HTML div containing a Plotly assignment heatmap based on users, userstories, tasks, and issues.
+    Closed items are limited to the configured retention (see app.taiga_config).
+    Shows max_rows assignees per page; see get_people_heatmap_html.
+    """
+    user_lookup = {
+        u["id"]: u.get("full_name_display") or u.get("full_name") or u.get("username")
+        for u in users
+    }
+    return get_people_heatmap_html(
+        user_lookup, "assigned_to", "Unassigned", userstories, tasks, issues, column_metric, status_buckets,
+        "User Story/Task/Issue Assignment Heatmap", "Assignee", max_rows, page, sort,
+    )
+
+
+def get_task_createdby_heatmap_html(
+    users,
+    userstories,
+    tasks,
+    issues,
+    column_metric="status",
+    status_buckets=None,
+    max_rows=HEATMAP_ROWS,
+    page=1,
+    sort="load",
+):
+    """
+    Returns an HTML div containing a Plotly heatmap based on creator (not assignee),
+    using users, userstories, tasks, and issues.
+    Closed items are limited to the configured retention (see app.taiga_config).
+    Shows max_rows creators per page; see get_people_heatmap_html.
+    """
+    # Taiga: "owner" is the creator's ID
+    user_lookup = {
+        u["id"]: u.get("full_name_display") or u.get("full_name") or u.get("username")
+        for u in users
+    }
+    return get_people_heatmap_html(
+        user_lookup, "owner", "Unknown", userstories, tasks, issues, column_metric, status_buckets,
+        "User Story/Task/Issue Creator Heatmap", "Created By", max_rows, page, sort,
     )
-    return fig.to_html(include_plotlyjs="cdn", full_html=False)
 
 
 def get_tag_cloud_html(
-    userstories, tasks, issues, min_font_size=14, max_font_size=48, max_tags=50
+    userstories, tasks, issues, min_font_size=14, max_font_size=48, max_tags=TAG_CLOUD_MAX_TAGS
 ):
     """
     Returns an HTML div containing a Plotly tag cloud showing the most commonly used tags across
@@ -845,8 +876,8 @@ def get_tag_cloud_html(
             tag_counter[name] += 1
             tag_color_lookup[name] = color
 
-    # --- Limit to most common tags for clarity ---
-    most_common = tag_counter.most_common(max_tags)
+    # --- Limit to most common tags for clarity; ties by name so the order is stable ---
+    most_common = sorted(tag_counter.items(), key=lambda item: (-item[1], item[0]))[:max_tags]
     tags, counts = zip(*most_common) if most_common else ([], [])
 
     # --- Normalize font size by count ---
@@ -863,19 +894,21 @@ def get_tag_cloud_html(
     else:
         font_size = lambda c: (min_font_size + max_font_size) / 2
 
-    # --- Layout tags in a grid or random-ish positions ---
-    n = len(tags)
-    grid_size = int(n**0.5) + 1
-    positions = [(i % grid_size, i // grid_size) for i in range(n)]
-    random.shuffle(positions)
+    # --- Place tags on a seeded spiral; the layout is cached while the counts are unchanged ---
+    sized_tags = tuple((tag, round(font_size(tag_counter[tag]), 1)) for tag in tags)
+    positions = layout_tag_cloud(sized_tags, seed=TAG_CLOUD_SEED)
+    x0, y0, x1, y1 = get_layout_bounds(sized_tags, positions)
+    # Font sizes are in pixels, so shrink the whole cloud when it is wider than the plot
+    scale = min(1.0, TAG_CLOUD_WIDTH / max(x1 - x0, 1))
 
     x, y, font_sizes, colors, texts = [], [], [], [], []
-    for idx, tag in enumerate(tags):
-        pos_x, pos_y = positions[idx]
-        x.append(pos_x + random.uniform(-0.3, 0.3))
-        y.append(-pos_y + random.uniform(-0.3, 0.3))
-        font_sizes.append(font_size(tag_counter[tag]))
-        colors.append(tag_color_lookup.get(tag, "#888"))
+    for (tag, size), position in zip(sized_tags, positions):
+        if position is None:
+            continue
+        x.append(position[0])
+        y.append(position[1])
+        font_sizes.append(size * scale)
+        colors.append(tag_color_lookup.get(tag) or "#888")
         texts.append(tag)
 
     # --- Build Plotly figure ---
@@ -890,20 +923,25 @@ def get_tag_cloud_html(
                 size=font_sizes,
                 color=colors,
             ),
-            hovertext=[f"{tag}: {tag_counter[tag]} uses" for tag in tags],
+            hovertext=[f"{tag}: {tag_counter[tag]} uses" for tag in texts],
             hoverinfo="text",
         )
     )
 
     fig.update_layout(
-        xaxis=dict(showgrid=False, zeroline=False, visible=False),
-        yaxis=dict(showgrid=False, zeroline=False, visible=False),
+        xaxis=dict(showgrid=False, zeroline=False, visible=False, range=[x0, x1]),
+        yaxis=dict(
+            showgrid=False, zeroline=False, visible=False, range=[y0, y1],
+            scaleanchor="x", scaleratio=1,
+        ),
         plot_bgcolor="white",
         title="Tag Cloud (by frequency)",
         margin=dict(l=20, r=20, t=60, b=20),
-        height=max(350, 40 * grid_size),
+        height=max(350, int((y1 - y0) * scale) + 80),
     )
-    return fig.to_html(include_plotlyjs="cdn", full_html=False)
+    # A fixed div id keeps the output identical between renders of the same tags
+    div_id = f"tag-cloud-{zlib.crc32(repr((sized_tags, colors)).encode('utf-8')):08x}"
+    return fig.to_html(include_plotlyjs="cdn", full_html=False, div_id=div_id)
 
 
 def get_tag_bar_chart_html(userstories, tasks, issues, max_tags=50):
@@ -935,7 +973,7 @@ def get_tag_bar_chart_html(userstories, tasks, issues, max_tags=50):
     tags, counts = zip(*most_common) if most_common else ([], [])
 
     # --- Get bar colors in the same order as tags ---
-    bar_colors = [tag_color_lookup.get(tag, "#888") for tag in tags]
+    bar_colors = [tag_color_lookup.get(tag) or "#888" for tag in tags]
 
     # --- Build Plotly figure ---
     fig = go.Figure(
@@ -964,31 +1002,29 @@ def get_tag_bar_chart_html(userstories, tasks, issues, max_tags=50):
 
 
 def get_issue_type_severity_priority_donut_charts_html(
-    issues, types, severities, priorities
+    issues, types, severities, priorities, status_buckets=None
 ):
     """
     Returns a single HTML string with three Plotly donut charts (open issues by type, severity, and priority) side by side.
-    Only issues whose status is NOT in ISSUE_DONE_STATUSES are counted.
+    Only issues whose status is not in the Done bucket (see get_status_bucket) are counted.
     Maps 'type', 'priority', and 'severity' integer ids to names using provided lists.
     """
+    return get_open_issue_donut_charts_html(
+        *count_open_issues(issues, types, severities, priorities, status_buckets)
+    )
+
+
+def count_open_issues(issues, types, severities, priorities, status_buckets=None):
+    """Return dicts of type, severity and priority name -> number of issues not in the Done bucket."""
 
     # Build id->name dicts for lookup
     type_lookup = {t["id"]: t["name"] for t in types}
     priority_lookup = {p["id"]: p["name"] for p in priorities}
     severity_lookup = {s["id"]: s["name"] for s in severities}
 
-    def get_status(issue):
-        extra = issue.get("status_extra_info")
-        if isinstance(extra, dict) and "name" in extra:
-            return extra["name"]
-        status = issue.get("status")
-        if isinstance(status, dict):
-            return status.get("name", "")
-        return status or ""
-
     # Only not-completed issues
     active_issues = [
-        issue for issue in issues if get_status(issue) not in ISSUE_DONE_STATUSES
+        issue for issue in issues if get_status_bucket(issue, "issue", status_buckets) != "Done"
     ]
 
     def get_type(issue, fallback="Unknown"):
@@ -1014,7 +1050,11 @@ def get_issue_type_severity_priority_donut_charts_html(
         type_counts[t] = type_counts.get(t, 0) + 1
         severity_counts[s] = severity_counts.get(s, 0) + 1
         priority_counts[p] = priority_counts.get(p, 0) + 1
+    return type_counts, severity_counts, priority_counts
 
+
+def get_open_issue_donut_charts_html(type_counts, severity_counts, priority_counts):
+    """Returns the three donut charts of get_issue_type_severity_priority_donut_charts_html from name -> count dicts."""
     palette = [
         "#636efa",
         "#ef553b",
@@ -1066,57 +1106,22 @@ def get_issue_type_severity_priority_donut_charts_html(
 
     return combined_html
 
-def get_blocked_items_table_html(epics, user_stories, issues, tasks):
+def script_json(value):
+    """JSON for embedding in an inline <script>: <, > and & are escaped so strings cannot close the tag."""
+    return json.dumps(value).replace("<", "\\u003c").replace(">", "\\u003e").replace("&", "\\u0026")
+
+
+def get_blocked_items_table_html(blocked_index, sort="age", query="", page=1, page_size=None, url="blocked"):
     """
-    Returns HTML for a Plotly table listing all blocked items (user stories, tasks, issues, epics),
-    showing type, reference/subject, assignee, blockers note, and age (in days).
+    Returns HTML for a table of blocked items (user stories, tasks, issues, epics), showing type,
+    reference, subject, assignee, blockers note, and age (in days), oldest first by default.
+    Only one page is rendered here; sorting, searching and further pages are fetched from url
+    (the /blocked endpoint), which serves the same BlockedIndex pages as JSON. The default is
+    relative to the page, so on /project/<id>/ it is that project's endpoint. Without a url,
+    e.g. in a static export, every row is rendered and there are no search or pager controls.
+    An index of several projects (see BlockedIndex.merge) gets a Project column.
     """
-    def age_in_days(created_date):
-        try:
-            dt = datetime.fromisoformat(created_date.replace("Z", "+00:00"))
-            now = datetime.now(timezone.utc)
-            return (now - dt).days
-        except Exception:
-            return "?"
-
-    def get_assignee(item):
-        info = item.get("assigned_to_extra_info")
-        if info and isinstance(info, dict):
-            return info.get("full_name_display") or info.get("username") or "Unassigned"
-        return "Unassigned"
-
-    blocked_items = []
-    for src, items, label in [
-        ("Epic", epics, "Epic"),
-        ("User Story", user_stories, "User Story"),
-        ("Task", tasks, "Task"),
-        ("Issue", issues, "Issue"),
-    ]:
-        for item in items:
-            if item.get("is_blocked", False):
-                blocked_items.append({
-                    "type": label,
-                    "ref": item.get("ref", ""),
-                    "subject": item.get("subject", ""),
-                    "assignee": get_assignee(item),
-                    "blocked_note": item.get("blocked_note", ""),
-                    "created_date": item.get("created_date", ""),
-                    "age_days": age_in_days(item.get("created_date", "")),
-                })
-
-    blocked_items.sort(key=lambda x: (isinstance(x["age_days"], int), x["age_days"]), reverse=True)
-
-    headers = ["Type", "Ref", "Subject", "Assignee", "Blocked Note", "Age (days)"]
-    cells = [
-        [item["type"] for item in blocked_items],
-        [item["ref"] for item in blocked_items],
-        [f"<span style='white-space:pre-wrap'>{item['subject']}</span>" for item in blocked_items],
-        [item["assignee"] for item in blocked_items],
-        [f"<span style='white-space:pre-wrap'>{item['blocked_note']}</span>" for item in blocked_items],
-        [item["age_days"] for item in blocked_items],
-    ]
-
-    if not blocked_items:
+    if not blocked_index.rows:
         return (
             "<div style='padding:24px;text-align:center;border-radius:8px;background:#f9f9f9;"
             "border:1.5px solid #e1e1e1;font-size:1.2em;color:#999;'>"
@@ -1124,27 +1129,120 @@ def get_blocked_items_table_html(epics, user_stories, issues, tasks):
             "</div>"
         )
 
-    fig = go.Figure(
-        data=[go.Table(
-            header=dict(
-                values=headers,
-                fill_color="#ef553b",
-                align="left",
-                font=dict(color="white", size=15)
-            ),
-            cells=dict(
-                values=cells,
-                fill_color=[["#fff7f6", "#ffe5e1"] * (len(blocked_items) // 2 + 1)],
-                align="left",
-                font=dict(color="#222", size=15),
-                height=52,  # Increased row height
-            ),
-            columnwidth=[60, 40, 240, 120, 320, 60],  # Subject/Blocked Note wider
-        )]
+    if url is None:
+        result = blocked_index.query(sort, query, 1, len(blocked_index.rows))
+    else:
+        result = blocked_index.query(sort, query, page, page_size or BLOCKED_PAGE_SIZE)
+    columns = [
+        ("type", "Type", "60px"),
+        ("ref", "Ref", "40px"),
+        ("subject", "Subject", None),
+        ("assignee", "Assignee", "120px"),
+        ("blocked_note", "Blocked Note", None),
+        ("age_days", "Age (days)", "60px"),
+    ]
+    if blocked_index.has_projects:
+        columns.insert(0, ("project", "Project", "140px"))
+    sortable = {"project": "project", "type": "type", "ref": "ref", "assignee": "assignee", "age_days": "age"}
+    if url is None:
+        sortable = {}
+    cell_style = "padding:8px;border-bottom:1px solid #f3c9c2;white-space:pre-wrap;vertical-align:top;"
+    header_html = "".join(
+        f'<th data-sort="{sortable.get(key, "")}" style="padding:8px;text-align:left;'
+        f'{f"width:{width};" if width else ""}{"cursor:pointer;" if key in sortable else ""}">{label}</th>'
+        for key, label, width in columns
     )
-    fig.update_layout(
-        title="Blocked Items",
-        margin=dict(l=10, r=10, t=48, b=10),
-        height=70 + len(blocked_items) * 64,  # More room per row
+    rows_html = "".join(
+        f'<tr style="background:{"#fff7f6" if i % 2 == 0 else "#ffe5e1"};">'
+        + "".join(f'<td style="{cell_style}">{html.escape(str(row[key] if row[key] is not None else ""))}</td>'
+                  for key, _, _ in columns)
+        + "</tr>"
+        for i, row in enumerate(result["rows"])
     )
-    return fig.to_html(full_html=False, include_plotlyjs=False, config={"displayModeBar": False})
\ No newline at end of file
+    if url is None:
+        return f"""
+    <div class="blocked-items" style="margin:0 10px;">
+      <h3 style="font-family:sans-serif;font-weight:normal;">Blocked Items ({result["total"]})</h3>
+      <table style="border-collapse:collapse;width:100%;font-family:sans-serif;font-size:15px;color:#222;">
+        <thead style="background:#ef553b;color:white;"><tr>{header_html}</tr></thead>
+        <tbody>{rows_html}</tbody>
+      </table>
+    </div>
+    """
+    state = script_json({"sort": sort, "query": query or "", "page": result["page"], "url": url})
+    return f"""
+    <div class="blocked-items" style="margin:0 10px;">
+      <h3 style="font-family:sans-serif;font-weight:normal;">Blocked Items</h3>
+      <input class="blocked-items-search" type="search" placeholder="Search subject, note or assignee"
+             value="{html.escape(query or "")}" style="margin-bottom:8px;padding:4px;width:280px;">
+      <table style="border-collapse:collapse;width:100%;font-family:sans-serif;font-size:15px;color:#222;">
+        <thead style="background:#ef553b;color:white;"><tr>{header_html}</tr></thead>
+        <tbody>{rows_html}</tbody>
+      </table>
+      <div class="blocked-items-pager" style="text-align:center;margin-top:8px;font-family:sans-serif;">
+        <button data-step="-1">&lsaquo; Previous</button>
+        <span class="blocked-items-status">Page {result["page"]} of {result["pages"]} ({result["total"]} items)</span>
+        <button data-step="1">Next &rsaquo;</button>
+      </div>
+      <script>
+        (function () {{
+            const root = document.currentScript.parentElement;
+            const state = {state};
+            const keys = {script_json([key for key, _, _ in columns])};
+            const tbody = root.querySelector("tbody");
+            const status = root.querySelector(".blocked-items-status");
+            let pages = {result["pages"]};
+
+            async function load() {{
+                const params = new URLSearchParams(window.location.search);
+                params.set("blocked_sort", state.sort);
+                params.set("blocked_q", state.query);
+                params.set("blocked_page", state.page);
+                const response = await fetch(state.url + "?" + params.toString());
+                if (!response.ok) return;
+                const result = await response.json();
+                state.page = result.page;
+                pages = result.pages;
+                tbody.replaceChildren(...result.rows.map(function (row, i) {{
+                    const tr = document.createElement("tr");
+                    tr.style.background = i % 2 === 0 ? "#fff7f6" : "#ffe5e1";
+                    keys.forEach(function (key) {{
+                        const td = document.createElement("td");
+                        td.style.cssText = "{cell_style}";
+                        td.textContent = row[key] === null ? "" : row[key];
+                        tr.appendChild(td);
+                    }});
+                    return tr;
+                }}));
+                status.textContent = "Page " + result.page + " of " + result.pages + " (" + result.total + " items)";
+            }}
+
+            root.querySelectorAll("th[data-sort]").forEach(function (th) {{
+                if (!th.dataset.sort) return;
+                th.addEventListener("click", function () {{
+                    state.sort = th.dataset.sort;
+                    state.page = 1;
+                    load();
+                }});
+            }});
+            root.querySelectorAll(".blocked-items-pager button").forEach(function (button) {{
+                button.addEventListener("click", function () {{
+                    const page = state.page + Number(button.dataset.step);
+                    if (page < 1 || page > pages) return;
+                    state.page = page;
+                    load();
+                }});
+            }});
+            let searchTimer = null;
+            root.querySelector(".blocked-items-search").addEventListener("input", function (event) {{
+                clearTimeout(searchTimer);
+                searchTimer = setTimeout(function () {{
+                    state.query = event.target.value;
+                    state.page = 1;
+                    load();
+                }}, 250);
+            }});
+        }})();
+      </script>
+    </div>
+    """
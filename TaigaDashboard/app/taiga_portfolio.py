@@ -0,0 +1,137 @@
+import html
+from collections import Counter
+from app.taiga_index import BlockedIndex
+from app.taiga_plotly import (
+    count_epic_progress,
+    count_open_issues,
+    get_blocked_items_table_html,
+    get_epic_progress_chart_html,
+    get_open_issue_donut_charts_html,
+)
+from app.taiga_lazy import LazyModule
+
+np = LazyModule("numpy")
+
+# Row labels of the blocked items table, in the order of the portfolio's blocked counts
+BLOCKED_TYPES = ("Epic", "User Story", "Task", "Issue")
+
+
+def project_summary(project, epics, userstories, issues, issue_types, severities, priorities, status_buckets,
+                    blocked_index, retention_config):
+    """
+    What the portfolio shows of one project, small enough to merge across many: story counts over
+    its relevant epics, open issue counts and its blocked items. Built with every refresh and
+    webhook update as a DERIVED value (retention_config is only listed so it is rebuilt when the
+    retention settings change).
+    """
+    _, epic_counts = count_epic_progress(epics, userstories, status_buckets)
+    blocked = Counter(row["type"] for row in blocked_index.rows)
+    return {
+        "name": f"{project['name']} ({project['id']})",
+        "epics": len(epic_counts),
+        "story_counts": epic_counts.sum(axis=0),  # (Done, In Progress, New) over the epics
+        "open_issues": count_open_issues(issues, issue_types, severities, priorities, status_buckets),
+        "blocked_counts": np.array([blocked[label] for label in BLOCKED_TYPES], dtype=np.int64),
+        "blocked_index": blocked_index,
+    }
+
+
+def count_matrix(counts):
+    """Return the sorted names of a list of name -> count dicts and a matrix with a row of their counts per dict."""
+    names = sorted(set().union(*counts))
+    matrix = np.zeros((len(counts), len(names)), dtype=np.int64)
+    columns = {name: column for column, name in enumerate(names)}
+    for row, c in enumerate(counts):
+        matrix[row, [columns[name] for name in c]] = list(c.values())
+    return names, matrix
+
+
+class Portfolio:
+    """Project summaries merged into per-project rows and portfolio totals."""
+
+    def __init__(self, summaries):
+        self.names = [s["name"] for s in summaries]
+        self.epics = np.array([s["epics"] for s in summaries], dtype=np.int64)
+        self.story_counts = np.vstack([s["story_counts"] for s in summaries] or [np.zeros((0, 3), dtype=np.int64)])
+        self.blocked_counts = np.vstack([s["blocked_counts"] for s in summaries] or [np.zeros((0, 4), dtype=np.int64)])
+        # Type, severity and priority names differ between projects, so their counts are merged by name
+        self.open_issue_names, self.open_issue_counts = [], []
+        for group in range(3):
+            names, matrix = count_matrix([s["open_issues"][group] for s in summaries])
+            self.open_issue_names.append(names)
+            self.open_issue_counts.append(matrix)
+        self.blocked_index = BlockedIndex.merge([(s["name"], s["blocked_index"]) for s in summaries])
+
+    def open_issue_totals(self):
+        """Name -> portfolio-wide count of open issues, for each of type, severity and priority."""
+        return [
+            dict(zip(names, matrix.sum(axis=0).tolist()))
+            for names, matrix in zip(self.open_issue_names, self.open_issue_counts)
+        ]
+
+    def summary_table_html(self, unavailable=()):
+        """One row per project: epics, story progress, open issues and blocked items, then the portfolio totals."""
+        stories = self.story_counts.sum(axis=1)
+        done = np.zeros(len(stories))
+        np.divide(100 * self.story_counts[:, 0], stories, out=done, where=stories > 0)
+        open_issues = self.open_issue_counts[0].sum(axis=1)  # every open issue has exactly one type
+        total_stories = int(stories.sum())
+        total_done = 100 * int(self.story_counts[:, 0].sum()) / total_stories if total_stories else 0
+
+        cell = "padding:6px 10px;border-bottom:1px solid #ddd;"
+
+        def row(values, style=""):
+            cells = "".join(
+                f"<td style='{cell}{'' if i == 0 else 'text-align:right;'}'>{html.escape(str(value))}</td>"
+                for i, value in enumerate(values)
+            )
+            return f"<tr style='{style}'>{cells}</tr>"
+
+        def blocked(counts):
+            return " / ".join(str(n) for n in counts.tolist())
+
+        rows = [
+            row((name, self.epics[i], f"{done[i]:.0f}% of {stories[i]}", open_issues[i], blocked(self.blocked_counts[i])))
+            for i, name in enumerate(self.names)
+        ]
+        rows += [row((name, "Taiga data unavailable", "", "", ""), "color:#b45309;") for name in unavailable]
+        rows.append(row(
+            ("All projects", self.epics.sum(), f"{total_done:.0f}% of {total_stories}", open_issues.sum(),
+             blocked(self.blocked_counts.sum(axis=0))),
+            "font-weight:bold;",
+        ))
+        headers = ("Project", "Epics", "Epic stories done", "Open issues", "Blocked (" + " / ".join(BLOCKED_TYPES) + ")")
+        header_html = "".join(f"<th style='padding:6px 10px;text-align:left;'>{h}</th>" for h in headers)
+        return (
+            "<table style='border-collapse:collapse;margin:0 auto;font-family:sans-serif;font-size:15px;'>"
+            f"<thead style='background:#636efa;color:white;'><tr>{header_html}</tr></thead>"
+            f"<tbody>{''.join(rows)}</tbody></table>"
+        )
+
+    def widgets_html(self, options, unavailable=()):
+        """Widget name -> html of the portfolio page."""
+        options = dict(options)
+        return {
+            "portfolio_summary": self.summary_table_html(unavailable),
+            "epic_progress_bar": get_epic_progress_chart_html(
+                self.names, self.story_counts, "Epic Progress by Project", "Project"
+            ),
+            "issue_type_severity_priority_donut_charts": get_open_issue_donut_charts_html(*self.open_issue_totals()),
+            "blocked_items_table": get_blocked_items_table_html(
+                self.blocked_index, options["blocked_sort"], options["blocked_q"], options["blocked_page"]
+            ),
+        }
+
+
+_last = (None, None)  # (summaries, Portfolio) of the last merge
+
+
+def merge_summaries(summaries):
+    """Return the Portfolio of a list of project summaries, reusing the last one while none of them changed."""
+    global _last
+    held, portfolio = _last
+    if held is not None and len(held) == len(summaries) and all(a is b for a, b in zip(held, summaries)):
+        return portfolio
+    portfolio = Portfolio(summaries)
+    _last = (list(summaries), portfolio)
+    return portfolio
@@ -0,0 +1,83 @@
+import heapq
+import itertools
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future
+from app.taiga_config import get_int_from_env
+
+# Taiga requests in flight at once, across every endpoint and page of every refresh
+FETCH_CONCURRENCY = get_int_from_env("FETCH_CONCURRENCY", 8)
+
+
+class PageScheduler:
+    """
+    Runs page requests of every paginated endpoint under one concurrency budget: a fixed set
+    of worker threads takes requests from a priority queue, largest endpoint first, so the
+    budget stays saturated until the last page instead of each endpoint walking its pages
+    serially on its own thread.
+    Requests are queued per group (a project): workers take from the groups with queued
+    requests in turn, so a project with thousands of pages cannot starve the others.
+    """
+
+    def __init__(self, max_workers):
+        self.max_workers = max(1, max_workers)
+        self.sizes = {}  # (endpoint, project id) -> item count on its last fetch, to order first pages
+        self._queues = {}  # group -> priority queue of its requests
+        self._turns = deque()  # groups with queued requests, in the order they are served
+        self._counter = itertools.count()  # keeps equal priorities in submission order
+        self._cond = threading.Condition()
+        self._pid = None
+
+    def submit(self, priority, func, *args, group=None):
+        """Queue func(*args) and return a future of its result; higher priorities in a group run first."""
+        future = Future()
+        with self._cond:
+            if self._pid != os.getpid():
+                # Worker threads do not survive a fork (e.g. export-static's process pool)
+                self._pid = os.getpid()
+                self._queues = {}
+                self._turns = deque()
+                for _ in range(self.max_workers):
+                    threading.Thread(target=self._work, daemon=True).start()
+            queue = self._queues.get(group)
+            if queue is None:
+                queue = self._queues[group] = []
+                self._turns.append(group)
+            heapq.heappush(queue, (-priority, next(self._counter), future, func, args))
+            self._cond.notify()
+        return future
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._turns:
+                    self._cond.wait()
+                group = self._turns.popleft()
+                queue = self._queues[group]
+                _, _, future, func, args = heapq.heappop(queue)
+                if queue:
+                    self._turns.append(group)
+                else:
+                    del self._queues[group]
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(func(*args))
+            except BaseException as exc:
+                future.set_exception(exc)
+
+
+def page_count(headers, first_page_items):
+    """Return (total items, pages) from Taiga's pagination headers, or None if they are missing."""
+    try:
+        total = int(headers["x-pagination-count"])
+        per_page = int(headers["x-paginated-by"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if per_page <= 0:
+        return None
+    return max(total, len(first_page_items)), max(1, -(-total // per_page))
+
+
+scheduler = PageScheduler(FETCH_CONCURRENCY)
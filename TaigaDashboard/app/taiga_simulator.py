@@ -0,0 +1,232 @@
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+PAGE_SIZE = 30  # Taiga's default page size
+
+STATUSES = {
+    "userstory-statuses": [("New", False), ("In progress", False), ("Ready for test", False), ("Done", True), ("Archived", True)],
+    "task-statuses": [("New", False), ("In progress", False), ("Closed", True)],
+    "issue-statuses": [("New", False), ("In progress", False), ("Closed", True), ("Rejected", True)],
+}
+# History item type -> (list endpoint, status endpoint)
+HISTORY_KEYS = {
+    "userstory": ("userstories", "userstory-statuses"),
+    "task": ("tasks", "task-statuses"),
+    "issue": ("issues", "issue-statuses"),
+}
+TAGS = [["backend", "#e44a4a"], ["frontend", "#4ae45d"], ["infra", "#888888"], ["ux", "#4a6ee4"], ["urgent", "#e4a44a"]]
+
+
+def iso(moment):
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def generate_project(projectid, stories=500, tasks=1500, issues=300, users=20, seed=0):
+    """
+    Return endpoint name -> Taiga-shaped JSON for a synthetic project. The same arguments
+    always produce the same data, so runs against the simulator are comparable.
+    """
+    rng = random.Random(f"{seed}-{projectid}")
+    now = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+    base = projectid * 1_000_000
+    data = {
+        "project": {"id": projectid, "name": f"Simulated project {projectid}", "logo_small_url": None},
+        "users": [
+            {"id": base + i, "username": f"user{i}", "full_name_display": f"User {i}"} for i in range(users)
+        ],
+        "severities": [{"id": base + i, "name": name} for i, name in enumerate(("Minor", "Normal", "Critical"))],
+        "priorities": [{"id": base + i, "name": name} for i, name in enumerate(("Low", "Normal", "High"))],
+        "issue-types": [{"id": base + i, "name": name} for i, name in enumerate(("Bug", "Question", "Enhancement"))],
+    }
+    status_ids = {}
+    for key, statuses in STATUSES.items():
+        data[key] = [
+            {"id": base + 100 * (list(STATUSES).index(key) + 1) + order, "name": name, "is_closed": closed, "order": order}
+            for order, (name, closed) in enumerate(statuses)
+        ]
+        status_ids[key] = data[key]
+
+    data["milestones"] = []
+    for k in range(-6, 3):
+        start = (now + timedelta(days=14 * k)).date()
+        data["milestones"].append({
+            "id": base + 1000 + k + 6,
+            "name": f"Sprint {k + 6}",
+            "slug": f"sprint-{k + 6}",
+            "estimated_start": start.isoformat(),
+            "estimated_finish": (start + timedelta(days=13)).isoformat(),
+            "closed": k < 0,
+        })
+    data["epics"] = [
+        {
+            "id": base + 2000 + i, "ref": i + 1, "subject": f"Epic {i + 1}", "is_closed": False,
+            "is_blocked": rng.random() < 0.1, "blocked_note": "",
+            "created_date": iso(now - timedelta(days=rng.randint(30, 200))),
+            "modified_date": iso(now - timedelta(days=rng.randint(0, 30))),
+            "status_extra_info": {"name": "In progress", "color": "#ff9900", "is_closed": False},
+            "assigned_to_extra_info": None,
+        }
+        for i in range(max(1, stories // 50))
+    ]
+
+    def items(count, offset, statuses_key, finish_field):
+        result = []
+        for i in range(count):
+            status = rng.choice(status_ids[statuses_key])
+            user = rng.choice(data["users"] + [None])
+            created = now - timedelta(days=rng.randint(1, 180), hours=rng.randint(0, 23))
+            item = {
+                "id": base + offset + i,
+                "ref": offset + i,
+                "subject": f"Simulated {statuses_key.split('-')[0]} {i}",
+                "project": projectid,
+                "status": status["id"],
+                "status_extra_info": {"name": status["name"], "color": "#70728f", "is_closed": status["is_closed"]},
+                "is_closed": status["is_closed"],
+                "is_blocked": rng.random() < 0.03,
+                "blocked_note": "Waiting on another team" if rng.random() < 0.5 else "",
+                "assigned_to": user["id"] if user else None,
+                "assigned_to_extra_info": dict(user) if user else None,
+                "owner": rng.choice(data["users"])["id"],
+                "milestone": rng.choice(data["milestones"])["id"] if rng.random() < 0.8 else None,
+                "priority": rng.choice(data["priorities"])["id"],
+                "priority_extra_info": None,
+                "severity": rng.choice(data["severities"])["id"],
+                "type": rng.choice(data["issue-types"])["id"],
+                "tags": rng.sample(TAGS, rng.randint(0, 2)),
+                "created_date": iso(created),
+                "modified_date": iso(created + timedelta(days=rng.randint(0, 10))),
+                finish_field: iso(created + timedelta(days=rng.randint(1, 20))) if status["is_closed"] else None,
+            }
+            result.append(item)
+        return result
+
+    data["userstories"] = items(stories, 10_000, "userstory-statuses", "finish_date")
+    for story in data["userstories"]:
+        story["epics"] = [{"id": rng.choice(data["epics"])["id"]}] if rng.random() < 0.6 else None
+    data["tasks"] = items(tasks, 100_000, "task-statuses", "finished_date")
+    for task in data["tasks"]:
+        task["user_story"] = rng.choice(data["userstories"])["id"] if data["userstories"] else None
+    data["issues"] = items(issues, 500_000, "issue-statuses", "finished_date")
+    return data
+
+
+def generate_history(item_id, created_date, statuses):
+    """History of one item: a single status change from the first status to the second a day after creation."""
+    created = datetime.strptime(created_date, "%Y-%m-%dT%H:%M:%S.%fZ")
+    return [
+        {
+            "id": f"{item_id}-1", "created_at": iso(created + timedelta(days=1)),
+            "diff": {"status": [statuses[0]["id"], statuses[1]["id"]]},
+            "values_diff": {"status": [statuses[0]["name"], statuses[1]["name"]]},
+        },
+    ]
+
+
+class TaigaSimulator:
+    """
+    Local HTTP server speaking enough of the Taiga REST API for the dashboard: authentication,
+    paginated list endpoints filtered by ?project=, project records and item histories.
+    Projects are generated on first use with generate_project; latency is added to every response.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.02, page_size=PAGE_SIZE, **project_options):
+        self.latency = latency
+        self.page_size = page_size
+        self.project_options = project_options
+        self.projects = {}
+        self.items = {}  # item id -> (item, status list key), for history requests
+        self.requests = 0
+        self._lock = threading.Lock()
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real API behind a proxy
+
+            def do_POST(self):
+                simulator.handle(self)
+
+            def do_GET(self):
+                simulator.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def project(self, projectid):
+        with self._lock:
+            if projectid not in self.projects:
+                data = self.projects[projectid] = generate_project(projectid, **self.project_options)
+                for key, statuses_key in HISTORY_KEYS.values():
+                    self.items.update((item["id"], (item, statuses_key)) for item in data[key])
+            return self.projects[projectid]
+
+    def handle(self, request):
+        with self._lock:
+            self.requests += 1
+        time.sleep(self.latency)
+        url = urlsplit(request.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = url.path.strip("/").split("/")[2:]  # drop "api/v1"
+        if request.command == "POST":
+            request.rfile.read(int(request.headers.get("Content-Length") or 0))  # free the connection for the next request
+            if parts == ["auth"]:
+                return self.respond(request, {"auth_token": "simulated-token"})
+            return self.respond(request, {"detail": "Not found"}, status=404)
+
+        if len(parts) == 2 and parts[0] == "projects":
+            return self.respond(request, self.project(int(parts[1]))["project"])
+        if len(parts) == 3 and parts[0] == "history" and parts[2].isdigit():
+            item_id = int(parts[2])
+            data = self.project(item_id // 1_000_000)  # generate_project numbers ids from projectid * 1,000,000
+            if item_id not in self.items:
+                return self.respond(request, [])
+            item, statuses_key = self.items[item_id]
+            return self.respond(request, generate_history(item_id, item["created_date"], data[statuses_key]))
+        if len(parts) == 1 and "project" in query:
+            values = self.project(int(query["project"])).get(parts[0])
+            if values is not None:
+                return self.respond_page(request, url.path, query, values)
+        return self.respond(request, {"detail": "Not found"}, status=404)
+
+    def respond_page(self, request, path, query, values):
+        page = int(query.get("page", 1))
+        start = (page - 1) * self.page_size
+        headers = {
+            "x-pagination-count": str(len(values)),
+            "x-paginated-by": str(self.page_size),
+            "x-pagination-current": str(page),
+        }
+        if start + self.page_size < len(values):
+            headers["x-pagination-next"] = f"{self.url}{path}?project={query['project']}&page={page + 1}"
+        self.respond(request, values[start:start + self.page_size], headers=headers)
+
+    def respond(self, request, payload, status=200, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            request.send_header(name, value)
+        request.end_headers()
+        request.wfile.write(body)
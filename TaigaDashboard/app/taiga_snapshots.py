@@ -0,0 +1,98 @@
+import os
+import sqlite3
+from collections import Counter
+from contextlib import closing
+from datetime import datetime
+from app.taiga_plotly import get_status_bucket
+from app.taiga_lazy import LazyModule
+
+np = LazyModule("numpy")
+
+DATA_DIR = os.getenv("DATA_DIR", "data")
+SNAPSHOT_DB_PATH = os.getenv("SNAPSHOT_DB_PATH", os.path.join(DATA_DIR, "snapshots.db"))
+
+BUCKETS = ("New", "In Progress", "Done")
+
+
+def connect(path=None):
+    """Open the snapshot database, creating it on first use."""
+    path = path or SNAPSHOT_DB_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS snapshots (
+            project_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            item_type TEXT NOT NULL,
+            scope TEXT NOT NULL,
+            scope_id INTEGER NOT NULL,
+            bucket TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (project_id, day, item_type, scope, scope_id, bucket)
+        )
+        """
+    )
+    return conn
+
+
+def aggregate_snapshot(userstories, tasks, issues, status_buckets=None):
+    """
+    Count items per (item_type, scope, scope_id, bucket).
+    Scopes are the whole project (scope_id 0), each sprint, and each epic (user stories only).
+    """
+    counts = Counter()
+    for item_type, items in (("userstory", userstories), ("task", tasks), ("issue", issues)):
+        for item in items or []:
+            bucket = get_status_bucket(item, item_type, status_buckets)
+            counts[(item_type, "project", 0, bucket)] += 1
+            milestone = item.get("milestone")
+            if milestone is not None:
+                counts[(item_type, "sprint", milestone, bucket)] += 1
+            if item_type == "userstory":
+                for epic_ref in item.get("epics") or []:
+                    counts[(item_type, "epic", epic_ref.get("id"), bucket)] += 1
+    return counts
+
+
+def record_snapshot(project, userstories, tasks, issues, status_buckets=None, day=None, path=None):
+    """
+    Store the current counts as the snapshot for today, replacing any earlier snapshot of the
+    same day, and return the project's full history (see load_history).
+    """
+    day = day or datetime.utcnow().strftime("%Y-%m-%d")
+    counts = aggregate_snapshot(userstories, tasks, issues, status_buckets)
+    rows = [
+        (project["id"], day, item_type, scope, scope_id, bucket, count)
+        for (item_type, scope, scope_id, bucket), count in counts.items()
+    ]
+    with closing(connect(path)) as conn, conn:
+        conn.execute("DELETE FROM snapshots WHERE project_id = ? AND day = ?", (project["id"], day))
+        conn.executemany("INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    return load_history(project["id"], path)
+
+
+def load_history(project_id, path=None):
+    """
+    Return the daily snapshot history of a project as
+    {"days": [...], "project": {item_type: series}, "sprint": {sprint_id: series}, "epic": {epic_id: series}}
+    where each series maps a bucket to a NumPy array with one count per day.
+    Sprint series sum all item types.
+    """
+    with closing(connect(path)) as conn:
+        rows = conn.execute(
+            "SELECT day, item_type, scope, scope_id, bucket, count FROM snapshots "
+            "WHERE project_id = ? ORDER BY day",
+            (project_id,),
+        ).fetchall()
+
+    days = sorted({row[0] for row in rows})
+    day_index = {day: i for i, day in enumerate(days)}
+    history = {"days": days, "project": {}, "sprint": {}, "epic": {}}
+    for day, item_type, scope, scope_id, bucket, count in rows:
+        key = item_type if scope == "project" else scope_id
+        series = history[scope].setdefault(
+            key, {b: np.zeros(len(days), dtype=np.int64) for b in BUCKETS}
+        )
+        series[bucket][day_index[day]] += count
+    return history
@@ -0,0 +1,93 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in a fresh interpreter: import the app, answer a health check and, with --render, the dashboard
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import TaigaDashboard
+imported = time.perf_counter()
+client = TaigaDashboard.app.test_client()
+result = {"health_status": client.get("/health").status_code}
+result.update(import_s=imported - started, health_s=time.perf_counter() - started, modules=len(sys.modules))
+if "--render" in sys.argv:
+    result["render_status"] = client.get("/").status_code
+    result["first_page_s"] = time.perf_counter() - started
+print("STARTUP " + json.dumps(result))
+"""
+
+
+def run_probe(render=False, env=None):
+    """Start the app in a new interpreter and return its startup timings."""
+    command = [sys.executable, "-c", PROBE] + (["--render"] if render else [])
+    output = subprocess.run(command, cwd=APP_DIR, env=env, capture_output=True, text=True, check=True).stdout
+    for line in output.splitlines():
+        if line.startswith("STARTUP "):
+            return json.loads(line[len("STARTUP "):])
+    raise RuntimeError("The startup probe printed no result")
+
+
+def measure_startup(runs=5, render=False, env=None):
+    """Return the median of each timing over runs cold starts, plus the status codes seen."""
+    results = [run_probe(render, env) for _ in range(runs)]
+    summary = {
+        key: statistics.median(result[key] for result in results)
+        for key in ("import_s", "health_s", "first_page_s", "modules")
+        if key in results[0]
+    }
+    summary["statuses"] = sorted({
+        result[key] for result in results for key in ("health_status", "render_status") if key in result
+    })
+    return summary
+
+
+def import_profile(env=None, top=10):
+    """Return [(module, seconds)] of the app's slowest direct imports, from python -X importtime."""
+    command = [sys.executable, "-X", "importtime", "-c", "import TaigaDashboard"]
+    stderr = subprocess.run(command, cwd=APP_DIR, env=env, capture_output=True, text=True, check=True).stderr
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        # Two spaces per nesting level, and a module is listed after everything it imported
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            imports.append((name.strip(), int(cumulative) / 1e6))
+        elif depth == 0:
+            if name.strip() == "TaigaDashboard":
+                return sorted(imports, key=lambda item: -item[1])[:top]
+            imports = []
+    return []
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def track(path, summary):
+    """Append summary to the JSON lines file at path and return the previous entry, if any."""
+    previous = None
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            lines = [line for line in f if line.strip()]
+        if lines:
+            previous = json.loads(lines[-1])
+    entry = {"recorded_at": datetime.utcnow().isoformat(timespec="seconds"), "revision": git_revision(), **summary}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+    return previous
@@ -0,0 +1,186 @@
+import math
+from collections import defaultdict
+from functools import lru_cache
+from app.taiga_lazy import LazyModule
+
+np = LazyModule("numpy")
+
+# Approximate text box of a tag in pixels, relative to its font size
+CHAR_WIDTH = 0.6
+LINE_HEIGHT = 1.2
+PADDING = 2
+
+
+def text_box(tag, font_size):
+    """Return the (width, height) in pixels of a tag rendered at font_size."""
+    return len(tag) * font_size * CHAR_WIDTH + PADDING, font_size * LINE_HEIGHT + PADDING
+
+
+class GridIndex:
+    """
+    Uniform grid over placed rectangles: each cell lists the rectangles overlapping it, so a
+    collision check only looks at the few rectangles near the candidate position.
+    """
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+        self.rects = []
+
+    def cells_of(self, x0, y0, x1, y1):
+        size = self.cell_size
+        return [
+            (cx, cy)
+            for cx in range(math.floor(x0 / size), math.floor(x1 / size) + 1)
+            for cy in range(math.floor(y0 / size), math.floor(y1 / size) + 1)
+        ]
+
+    def collides(self, x0, y0, x1, y1):
+        """Return a placed rectangle overlapping the given one, or None."""
+        size, cells, rects = self.cell_size, self.cells, self.rects
+        cys = range(math.floor(y0 / size), math.floor(y1 / size) + 1)
+        for cx in range(math.floor(x0 / size), math.floor(x1 / size) + 1):
+            for cy in cys:
+                for i in cells.get((cx, cy), ()):
+                    rx0, ry0, rx1, ry1 = rects[i]
+                    if x0 < rx1 and rx0 < x1 and y0 < ry1 and ry0 < y1:
+                        return rects[i]
+        return None
+
+    def add(self, x0, y0, x1, y1):
+        self.rects.append((x0, y0, x1, y1))
+        for cell in self.cells_of(x0, y0, x1, y1):
+            self.cells[cell].append(len(self.rects) - 1)
+
+
+def spiral_points(count, spacing, aspect, seed):
+    """
+    Return x, y arrays of count points spaced about spacing apart along an elliptical
+    Archimedean spiral (radius = spacing * theta / 2pi) starting at the origin.
+    """
+    b = spacing / (2 * math.pi)
+    # Arc length of r = b * theta is about b * theta^2 / 2, so equal spacing means theta ~ sqrt(k)
+    theta = np.sqrt(2 * spacing * np.arange(count) / b)
+    angle = theta + (seed % 360) * math.pi / 180
+    radius = b * theta
+    return radius * np.cos(angle) * aspect, radius * np.sin(angle)
+
+
+# Spiral points tested per numpy step when looking for a tag's position
+WINDOW = 512
+
+
+def bucket_points(xs, ys, cell_size):
+    """Return grid cell -> array of the indices of the points in it."""
+    cells_x = np.floor(xs / cell_size).astype(np.int64)
+    cells_y = np.floor(ys / cell_size).astype(np.int64)
+    order = np.lexsort((cells_y, cells_x))
+    keys = np.stack((cells_x[order], cells_y[order]), axis=1)
+    starts = np.flatnonzero(np.any(keys[1:] != keys[:-1], axis=1)) + 1
+    groups = np.split(order, starts)
+    return {(int(cells_x[group[0]]), int(cells_y[group[0]])): group for group in groups}
+
+
+@lru_cache(maxsize=64)
+def layout_tag_cloud(tags, seed=0, aspect=2.0):
+    """
+    Place tags, a tuple of (name, font size) pairs ordered from most to least important, on an
+    elliptical spiral around the origin without overlaps. Returns a tuple of (x, y) text centers
+    in pixels, or None for a tag that did not fit.
+
+    Each tag takes the first spiral point where its box collides with nothing already placed,
+    checked through a GridIndex. Each collision records the box sizes that can never fit at
+    that point, and points where none of the remaining tags fit are dropped for good, so the
+    walk skips the filled middle of the cloud a window of points at a time. The
+    layout depends only on the arguments and is cached, so unchanged tag counts reuse it and
+    always render identically.
+    """
+    if not tags:
+        return ()
+    boxes = [text_box(name, size) for name, size in tags]
+    # Smallest width and height among each tag and the ones placed after it
+    min_widths = np.minimum.accumulate([width for width, _ in boxes][::-1])[::-1].tolist()
+    min_heights = np.minimum.accumulate([height for _, height in boxes][::-1])[::-1].tolist()
+    spacing = max(min_heights[-1] / 2, 2.0)
+    # Each spiral point stands for about aspect * spacing^2 of area; cover three times the tags
+    area = sum(width * height for width, height in boxes) * 3
+    count = int(area / (aspect * spacing * spacing)) + WINDOW
+    xs, ys = spiral_points(count, spacing, aspect, seed)
+
+    index = GridIndex(max(height for _, height in boxes) * 2)
+    points_by_cell = bucket_points(xs, ys, index.cell_size)
+    point_xs, point_ys = xs.tolist(), ys.tolist()
+    live = np.ones(count, dtype=bool)
+    # A box wider than blocked_width[i] and taller than blocked_height[i] cannot sit at point i
+    blocked_width = np.full(count, np.inf)
+    blocked_height = np.full(count, np.inf)
+    # The same bound over the live points of each window of WINDOW points, to skip whole windows
+    window_count = -(-count // WINDOW)
+    window_width = [math.inf] * window_count
+    window_height = [math.inf] * window_count
+    first_window = 0
+
+    positions = []
+    for (width, height), min_width, min_height in zip(boxes, min_widths, min_heights):
+        placed = None
+        while first_window < window_count and window_width[first_window] == -math.inf:
+            first_window += 1
+        for w in range(first_window, window_count):
+            if width > window_width[w] and height > window_height[w]:
+                continue
+            start = w * WINDOW
+            window = slice(start, start + WINDOW)
+            fits = live[window] & ~((width > blocked_width[window]) & (height > blocked_height[window]))
+            for i in (fits.nonzero()[0] + start).tolist():
+                x, y = point_xs[i], point_ys[i]
+                x0, y0 = x - width / 2, y - height / 2
+                x1, y1 = x0 + width, y0 + height
+                rect = index.collides(x0, y0, x1, y1)
+                if rect:
+                    rx0, ry0, rx1, ry1 = rect
+                    max_width = 2 * abs(x - (rx0 + rx1) / 2) - (rx1 - rx0)
+                    max_height = 2 * abs(y - (ry0 + ry1) / 2) - (ry1 - ry0)
+                    if min_width > max_width and min_height > max_height:
+                        live[i] = False
+                    else:
+                        blocked_width[i], blocked_height[i] = max_width, max_height
+                    continue
+                placed = (x, y)
+                index.add(x0, y0, x1, y1)
+                # No later tag is smaller than min_width x min_height, so none can be centered this close
+                x0, y0 = x0 - min_width / 2, y0 - min_height / 2
+                x1, y1 = x1 + min_width / 2, y1 + min_height / 2
+                for cell in index.cells_of(x0, y0, x1, y1):
+                    points = points_by_cell.get(cell)
+                    if points is not None:
+                        px, py = xs[points], ys[points]
+                        live[points[(x0 < px) & (px < x1) & (y0 < py) & (py < y1)]] = False
+                break
+            alive = live[window]
+            if alive.any():
+                window_width[w] = float(blocked_width[window][alive].max())
+                window_height[w] = float(blocked_height[window][alive].max())
+            else:
+                window_width[w] = window_height[w] = -math.inf
+            if placed is not None:
+                break
+        positions.append(placed)
+    return tuple(positions)
+
+
+def get_layout_bounds(tags, positions):
+    """Return (x0, y0, x1, y1) enclosing the text boxes of the placed tags of a layout."""
+    boxes = [
+        (x, y) + text_box(name, size)
+        for (name, size), position in zip(tags, positions)
+        if position is not None
+        for x, y in (position,)
+    ]
+    if not boxes:
+        return 0, 0, 0, 0
+    return (
+        min(x - w / 2 for x, _, w, _ in boxes),
+        min(y - h / 2 for _, y, _, h in boxes),
+        max(x + w / 2 for x, _, w, _ in boxes),
+        max(y + h / 2 for _, y, _, h in boxes),
+    )
@@ -0,0 +1,121 @@
+import hashlib
+import hmac
+import os
+from app.taiga_items import compact_item
+
+# Secret key configured on the Taiga webhook; the /webhook endpoint is disabled without it
+TAIGA_WEBHOOK_KEY = os.getenv("TAIGA_WEBHOOK_KEY")
+
+# Taiga webhook "type" -> dataset key of the list holding objects of that type
+WEBHOOK_KEYS = {
+    "epic": "epics",
+    "userstory": "userstories",
+    "task": "tasks",
+    "issue": "issues",
+    "milestone": "sprints",
+}
+
+WEBHOOK_ACTIONS = ("create", "change", "delete")
+
+# Dataset keys whose items are held as compact WorkItems (see taiga_dataset.fetch_tasks)
+COMPACT_KEYS = ("userstories", "tasks", "issues")
+
+# Fields that webhooks send as nested objects but the REST list endpoints return as plain ids
+REFERENCE_FIELDS = ("project", "owner", "assigned_to", "milestone", "user_story", "status", "priority", "severity", "type")
+
+
+def sign_payload(key, body):
+    """Taiga signs the raw request body with HMAC-SHA1 using the webhook's secret key."""
+    return hmac.new(key.encode("utf-8"), body, hashlib.sha1).hexdigest()
+
+
+def verify_signature(key, body, signature):
+    if not key or not signature:
+        return False
+    return hmac.compare_digest(sign_payload(key, body), signature.strip().lower())
+
+
+def event_key(payload):
+    """
+    Return the dataset key a webhook event updates, or None for events the dashboard does not hold (e.g. "test").
+    Raises ValueError for a payload that is not an object, or an event on a held list whose object has no id.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("webhook payload is not a JSON object")
+    if payload.get("action") not in WEBHOOK_ACTIONS or not isinstance(payload.get("data"), dict):
+        return None
+    key = WEBHOOK_KEYS.get(payload.get("type"))
+    if key is not None and payload["data"].get("id") is None:
+        raise ValueError(f"{payload['type']} webhook object has no id")
+    return key
+
+
+def get_tag_colors(data):
+    """Known tag name -> color across the held items, since webhooks send tags as bare names."""
+    colors = {}
+    for key in ("epics", "userstories", "tasks", "issues"):
+        for item in data.get(key) or []:
+            for tag in item.get("tags") or []:
+                if isinstance(tag, (list, tuple)) and len(tag) == 2 and tag[1]:
+                    colors[tag[0]] = tag[1]
+    return colors
+
+
+def normalize_item(obj, existing=None, tag_colors=None):
+    """
+    Convert a webhook object into the shape returned by the REST list endpoints, on top of the
+    held copy of the item so fields the webhook does not send (e.g. a story's epics) are kept.
+    """
+    item = dict(existing or {})
+    item.update(obj)
+    for field in REFERENCE_FIELDS:
+        if isinstance(obj.get(field), dict):
+            item[field] = obj[field].get("id")
+
+    status = obj.get("status")
+    if isinstance(status, dict):
+        item["status_extra_info"] = {
+            "name": status.get("name"),
+            "color": status.get("color"),
+            "is_closed": status.get("is_closed"),
+        }
+    if "assigned_to" in obj:
+        user = obj["assigned_to"]
+        item["assigned_to_extra_info"] = {
+            "id": user.get("id"),
+            "username": user.get("username"),
+            "full_name_display": user.get("full_name") or user.get("username"),
+        } if isinstance(user, dict) else None
+    priority = obj.get("priority")
+    if isinstance(priority, dict):
+        item["priority_extra_info"] = {"name": priority.get("name")}
+
+    if "tags" in obj:
+        tag_colors = tag_colors or {}
+        item["tags"] = [
+            list(tag) if isinstance(tag, (list, tuple)) else [tag, tag_colors.get(tag)]
+            for tag in obj["tags"] or []
+        ]
+    return item
+
+
+def apply_event(data, payload):
+    """Return the list at event_key(payload) with the event's object created, replaced or removed."""
+    key = event_key(payload)
+    obj = payload["data"]
+    items = data.get(key) or []
+    position = next((i for i, item in enumerate(items) if item.get("id") == obj.get("id")), None)
+
+    if payload["action"] == "delete":
+        return [item for item in items if item.get("id") != obj.get("id")]
+
+    existing = items[position] if position is not None else None
+    item = normalize_item(obj, existing, get_tag_colors(data) if "tags" in obj else None)
+    if key in COMPACT_KEYS:
+        item = compact_item(item)
+    updated = list(items)
+    if position is None:
+        updated.append(item)
+    else:
+        updated[position] = item
+    return updated
@@ -0,0 +1,218 @@
+from collections import namedtuple
+from app.taiga_plotly import (
+    get_dashboard_config_html,
+    get_epic_progress_html,
+    get_task_status_breakdown_html,
+    get_cumulative_flow_html,
+    get_sprint_burndown_html,
+    get_cycle_time_histogram_html,
+    get_task_assignment_heatmap_html,
+    get_task_createdby_heatmap_html,
+    get_tag_cloud_html,
+    get_tag_bar_chart_html,
+    get_issue_type_severity_priority_donut_charts_html,
+    get_blocked_items_table_html,
+    get_int_from_env,
+    HEATMAP_ROWS
+)
+from app.taiga_index import BLOCKED_SORTS, BlockedIndex, parse_filters
+
+MAX_SPRINT_WINDOW = get_int_from_env("MAX_SPRINT_WINDOW", 10)
+MAX_HEATMAP_ROWS = get_int_from_env("MAX_HEATMAP_ROWS", 100)
+
+# Per-request view options and their defaults; see parse_view_options
+DEFAULT_OPTIONS = {
+    "column_metric": "status",
+    "future_sprints": 1,
+    "completed_sprints": 1,
+    "heatmap_rows": min(HEATMAP_ROWS, MAX_HEATMAP_ROWS),
+    "heatmap_page": 1,
+    "heatmap_sort": "load",
+    "blocked_sort": "age",
+    "blocked_q": "",
+    "blocked_page": 1,
+    # Not a view parameter: the blocked items endpoint, which static exports set to None as they have none
+    "blocked_url": "blocked",
+}
+
+# name: key in the template's widgets mapping and the /widget/<name> endpoint
+# requires: dataset keys the widget reads, so it can render as soon as those arrive; widgets
+#   filtering by the retention settings or showing the settings list the *_config keys too
+# render: callable taking the dataset dict and the view options dict, returning an HTML fragment
+# options: view options the widget reads, so cached renders are keyed on only those
+# filterable: False for widgets built from per-project aggregates (snapshots, cycle times) that the
+#   facet filters cannot restrict; they always show the whole project and ignore the filters
+Widget = namedtuple("Widget", ["name", "requires", "render", "options", "filterable"], defaults=((), True))
+
+WIDGETS = [
+    Widget(
+        "dashboard_config",
+        ("status_config", "retention_config"),
+        lambda d, o: get_dashboard_config_html(),
+    ),
+    Widget(
+        "epic_progress_bar",
+        ("epics", "userstories", "status_buckets", "retention_config"),
+        lambda d, o: get_epic_progress_html(d["epics"], d["userstories"], d["status_buckets"]),
+    ),
+    Widget(
+        "user_story_status_breakdown",
+        ("userstories", "sprints", "status_buckets"),
+        lambda d, o: get_task_status_breakdown_html(
+            d["userstories"],
+            [],
+            [],
+            d["sprints"],
+            "User Story Status Breakdown by Sprint (Requirement Items)",
+            d["status_buckets"],
+            o["future_sprints"],
+            o["completed_sprints"],
+        ),
+        ("future_sprints", "completed_sprints"),
+    ),
+    Widget(
+        "task_status_breakdown",
+        ("tasks", "issues", "sprints", "status_buckets"),
+        lambda d, o: get_task_status_breakdown_html(
+            [], d["tasks"], d["issues"], d["sprints"], "Task/Issue Status Breakdown by Sprint (Work Items)",
+            d["status_buckets"], o["future_sprints"], o["completed_sprints"],
+        ),
+        ("future_sprints", "completed_sprints"),
+    ),
+    Widget(
+        "cumulative_flow",
+        ("snapshots",),
+        lambda d, o: get_cumulative_flow_html(d["snapshots"]),
+        filterable=False,
+    ),
+    Widget(
+        "sprint_burndown",
+        ("snapshots", "sprints"),
+        lambda d, o: get_sprint_burndown_html(d["snapshots"], d["sprints"]),
+        filterable=False,
+    ),
+    Widget(
+        "cycle_time_histogram",
+        ("cycle_times",),
+        lambda d, o: get_cycle_time_histogram_html(d["cycle_times"]),
+        filterable=False,
+    ),
+    Widget(
+        "task_assignment_heatmap",
+        ("users", "userstories", "tasks", "issues", "status_buckets", "retention_config"),
+        lambda d, o: get_task_assignment_heatmap_html(
+            d["users"], d["userstories"], d["tasks"], d["issues"], o["column_metric"], d["status_buckets"],
+            o["heatmap_rows"], o["heatmap_page"], o["heatmap_sort"],
+        ),
+        ("column_metric", "heatmap_rows", "heatmap_page", "heatmap_sort"),
+    ),
+    Widget(
+        "task_createdby_heatmap",
+        ("users", "userstories", "tasks", "issues", "status_buckets", "retention_config"),
+        lambda d, o: get_task_createdby_heatmap_html(
+            d["users"], d["userstories"], d["tasks"], d["issues"], o["column_metric"], d["status_buckets"],
+            o["heatmap_rows"], o["heatmap_page"], o["heatmap_sort"],
+        ),
+        ("column_metric", "heatmap_rows", "heatmap_page", "heatmap_sort"),
+    ),
+    Widget(
+        "tag_cloud",
+        ("userstories", "tasks", "issues"),
+        lambda d, o: get_tag_cloud_html(d["userstories"], d["tasks"], d["issues"]),
+    ),
+    Widget(
+        "tag_bar_chart",
+        ("userstories", "tasks", "issues"),
+        lambda d, o: get_tag_bar_chart_html(d["userstories"], d["tasks"], d["issues"]),
+    ),
+    Widget(
+        "issue_type_severity_priority_donut_charts",
+        ("issues", "issue_types", "severities", "priorities", "status_buckets"),
+        lambda d, o: get_issue_type_severity_priority_donut_charts_html(
+            d["issues"], d["issue_types"], d["severities"], d["priorities"], d["status_buckets"]
+        ),
+    ),
+    Widget(
+        "blocked_items_table",
+        ("epics", "userstories", "tasks", "issues", "blocked_index"),
+        lambda d, o: get_blocked_items_table_html(
+            BlockedIndex.for_data(d), o["blocked_sort"], o["blocked_q"], o["blocked_page"], url=o["blocked_url"]
+        ),
+        ("blocked_sort", "blocked_q", "blocked_page"),
+    ),
+]
+
+WIDGETS_BY_NAME = {widget.name: widget for widget in WIDGETS}
+UNFILTERED_WIDGETS = frozenset(widget.name for widget in WIDGETS if not widget.filterable)
+
+
+def parse_view_options(args):
+    """
+    Normalize the view options from request args into a hashable tuple of (name, value) pairs:
+    column_metric=status|priority, heatmap_rows/heatmap_page and heatmap_sort=load|name for the
+    heatmaps, future_sprints/completed_sprints, the number of upcoming and finished sprints
+    shown by the status breakdown charts, and blocked_sort/blocked_q/blocked_page for the
+    blocked items table.
+    """
+    options = {}
+    for name, choices in (
+        ("column_metric", ("status", "priority")),
+        ("heatmap_sort", ("load", "name")),
+        ("blocked_sort", BLOCKED_SORTS),
+    ):
+        value = (args.get(name) or DEFAULT_OPTIONS[name]).strip().lower()
+        options[name] = value if value in choices else DEFAULT_OPTIONS[name]
+    for name, low, high in (
+        ("future_sprints", 0, MAX_SPRINT_WINDOW),
+        ("completed_sprints", 0, MAX_SPRINT_WINDOW),
+        ("heatmap_rows", 1, MAX_HEATMAP_ROWS),
+        ("heatmap_page", 1, 10000),
+        ("blocked_page", 1, 10000),
+    ):
+        try:
+            value = int(args.get(name, DEFAULT_OPTIONS[name]))
+        except ValueError:
+            value = DEFAULT_OPTIONS[name]
+        options[name] = min(max(value, low), high)
+    options["blocked_q"] = (args.get("blocked_q") or "").strip().lower()[:100]
+    return tuple(sorted(options.items()))
+
+
+def parse_view_params(args):
+    """Return the normalized (filters, options) of a request; see parse_filters and parse_view_options."""
+    return parse_filters(args), parse_view_options(args)
+
+
+def widget_filters(widget, filters):
+    """The filters a widget applies: none for widgets that are not filterable."""
+    return filters if widget.filterable else ()
+
+
+def widget_cache_key(widget, filters, options):
+    """Key of a widget render: the filters it applies plus only the options it reads."""
+    options = dict(options)
+    return (widget.name, widget_filters(widget, filters), tuple((name, options[name]) for name in widget.options))
+
+
+def widget_inputs(widget, filters=None):
+    """Dataset keys a widget render reads: its requires, plus the facet index when filtered."""
+    return widget.requires + (("facet_index",) if widget_filters(widget, filters) else ())
+
+
+def widget_data_key(widget, versions, filters=None):
+    """Versions of only the dataset keys a widget reads, so updates to other keys keep its cached render."""
+    return tuple(versions.get(key) for key in widget_inputs(widget, filters))
+
+
+def render_widget(widget, data, filters=None, options=None):
+    """Render a widget, restricted to the items matching the facet filters (see app.taiga_index)."""
+    filters = widget_filters(widget, filters)
+    if filters:
+        data = data["facet_index"].filter_data(data, filters)
+    return widget.render(data, {**DEFAULT_OPTIONS, **dict(options or ())})
+
+
+def render_widget_from_futures(widget, futures, filters=None, options=None):
+    """Wait for just the data this widget needs, then render it."""
+    data = {key: futures[key].result() for key in widget_inputs(widget, filters)}
+    return render_widget(widget, data, filters, options)
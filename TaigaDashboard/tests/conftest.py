@@ -0,0 +1,22 @@
+import os
+import sys
+import tempfile
+import pytest
+
+# TaigaDashboard reads its settings when it is imported, so they are set before any test imports it
+os.environ.update(
+    TAIGA_WEBHOOK_KEY="test-webhook-key",
+    TAIGA_PROJECT_ID="1",
+    TAIGA_PROJECT_IDS="2",
+    API_KEY="",
+    WARM_START="false",
+    DATA_DIR=tempfile.mkdtemp(prefix="taiga-dashboard-tests-"),
+)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def client():
+    import TaigaDashboard
+
+    return TaigaDashboard.app.test_client()
@@ -0,0 +1,45 @@
+from collections import Counter
+
+ENDPOINTS = {
+    "get_epics": [],
+    "get_stories": [],
+    "get_tasks": [],
+    "get_issues": [],
+    "get_sprints": [],
+    "get_users": [],
+    "get_severities": [],
+    "get_priorities": [],
+    "get_issue_types": [],
+    "get_userstory_statuses": [],
+    "get_task_statuses": [],
+    "get_issue_statuses": [],
+}
+
+
+class FakeTaigaClient:
+    """
+    Stand-in for TaigaClient serving an empty project. Every getter call is counted in calls,
+    and the getters named in failing raise until they are removed from it.
+    """
+
+    def __init__(self, projectid=1):
+        self.projectid = projectid
+        self.calls = Counter()
+        self.failing = set()
+
+    def __getattr__(self, name):
+        if name not in ENDPOINTS and name != "get_project":
+            raise AttributeError(name)
+
+        def get():
+            self.calls[name] += 1
+            if name in self.failing:
+                raise RuntimeError(f"{name} failed")
+            if name == "get_project":
+                return {"id": self.projectid, "name": f"Project {self.projectid}", "logo_small_url": None}
+            return list(ENDPOINTS[name])
+
+        return get
+
+    def get_history(self, item_type, item_id):
+        return []
@@ -0,0 +1,52 @@
+from app.taiga_index import BlockedIndex
+from app.taiga_plotly import get_blocked_items_table_html
+from app.taiga_widgets import parse_view_options
+
+XSS = "</script><script>alert(1)</script>"
+
+
+def blocked_stories(count):
+    return [
+        {
+            "id": i,
+            "ref": i,
+            "subject": f"Story {i}",
+            "is_blocked": True,
+            "blocked_note": "Waiting",
+            "created_date": f"2025-01-{i % 28 + 1:02d}T00:00:00Z",
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def test_search_term_cannot_close_the_script_tag():
+    options = dict(parse_view_options({"blocked_q": XSS}))
+    html = get_blocked_items_table_html(
+        BlockedIndex([], blocked_stories(3), [], []), options["blocked_sort"], options["blocked_q"], options["blocked_page"]
+    )
+    script = html[html.index("<script>") + len("<script>"):]
+    assert script.count("</script>") == 1
+    assert "<script>alert(1)" not in html
+    assert "\\u003c/script\\u003e\\u003cscript\\u003ealert(1)" in script
+
+
+def test_subjects_are_escaped():
+    stories = blocked_stories(1)
+    stories[0]["subject"] = XSS
+    html = get_blocked_items_table_html(BlockedIndex([], stories, [], []))
+    assert "&lt;/script&gt;&lt;script&gt;alert(1)" in html
+    assert html.count("<script>") == 1
+
+
+def test_paged_table_loads_further_pages_from_the_endpoint():
+    html = get_blocked_items_table_html(BlockedIndex([], blocked_stories(30), [], []), page_size=25)
+    assert html.count("<tr style=") == 25
+    assert "blocked-items-pager" in html
+    assert '"url": "blocked"' in html
+
+
+def test_table_without_endpoint_shows_every_row_and_no_pager():
+    html = get_blocked_items_table_html(BlockedIndex([], blocked_stories(30), [], []), page_size=25, url=None)
+    assert html.count("<tr style=") == 30
+    assert "blocked-items-pager" not in html
+    assert "<script>" not in html
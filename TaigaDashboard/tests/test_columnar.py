@@ -0,0 +1,56 @@
+import json
+import os
+import pytest
+from app import taiga_columnar
+
+pyarrow = pytest.importorskip("pyarrow")
+import pyarrow.ipc  # noqa: E402
+
+
+@pytest.fixture
+def columnar(tmp_path, monkeypatch):
+    """taiga_columnar storing datasets under tmp_path, with pyarrow loaded as DATASET_FORMAT=arrow would."""
+    monkeypatch.setattr(taiga_columnar, "pa", pyarrow)
+    monkeypatch.setattr(taiga_columnar, "DATASET_DIR", str(tmp_path))
+    return taiga_columnar
+
+
+def refresh(subject):
+    task = {"id": 7, "ref": 3, "subject": subject, "status_extra_info": {"name": "New"}, "tags": [["ui", None]]}
+    return {"project": {"id": 1}, "userstories": [], "tasks": [task], "issues": []}
+
+
+def load(columnar, meta, key):
+    return columnar.load_tasks(1, meta)[key]()
+
+
+def test_stored_refresh_loads_back(columnar):
+    fetched_at = columnar.write_dataset(1, refresh("first"))
+    meta = columnar.read_meta(1)
+    assert meta["fetched_at"] == fetched_at
+    assert load(columnar, meta, "project") == {"id": 1}
+    [task] = load(columnar, meta, "tasks")
+    assert task["subject"] == "first"
+    assert [list(tag) for tag in task["tags"]] == [["ui", None]]
+
+
+def test_reader_keeps_the_tables_of_the_metadata_it_read(columnar):
+    columnar.write_dataset(1, refresh("first"))
+    meta = columnar.read_meta(1)
+    columnar.write_dataset(1, refresh("second"))
+
+    # The refresh this reader's metadata names is still there, and the next reader gets the new one
+    assert load(columnar, meta, "tasks")[0]["subject"] == "first"
+    assert load(columnar, columnar.read_meta(1), "tasks")[0]["subject"] == "second"
+
+    columnar.write_dataset(1, refresh("third"))
+    versions = [name for name in os.listdir(columnar.dataset_path(1)) if name.startswith("v")]
+    assert len(versions) == 2
+    assert meta["version"] not in versions
+
+
+def test_metadata_without_versioned_tables_is_ignored(columnar):
+    os.makedirs(columnar.dataset_path(1))
+    with open(columnar.dataset_path(1, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"fetched_at": 0, "project": {"id": 1}}, f)
+    assert columnar.read_meta(1) is None
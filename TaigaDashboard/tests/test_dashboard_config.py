@@ -0,0 +1,13 @@
+from app import taiga_plotly
+from app.taiga_config import DashboardConfig
+
+
+def test_status_names_are_escaped(monkeypatch):
+    config = DashboardConfig()
+    config.update({"TASK_DONE_STATUSES": ["<script>alert(1)</script>", "done & dusted"]})
+    monkeypatch.setattr(taiga_plotly, "config", config)
+
+    html = taiga_plotly.get_dashboard_config_html()
+    assert "<script>alert" not in html
+    assert "&lt;script&gt;alert(1)&lt;/script&gt;" in html
+    assert "done &amp; dusted" in html
@@ -0,0 +1,66 @@
+from app.taiga_dataset import DashboardDataset
+from fake_taiga import FakeTaigaClient
+
+
+def held_dataset(client):
+    return DashboardDataset(lambda: client, ttl=900)
+
+
+def test_failed_endpoint_without_last_good_value_is_retried_on_next_get():
+    client = FakeTaigaClient()
+    client.failing.add("get_project")
+    dataset = held_dataset(client)
+
+    assert dataset.get()["project"] is None
+    assert not dataset.is_fresh()
+
+    client.failing.clear()
+    assert dataset.get()["project"]["id"] == 1
+    assert dataset.is_fresh()
+    assert client.calls["get_project"] == 2
+    # Endpoints fetched by the first refresh are still within their TTL and are not fetched again
+    assert client.calls["get_epics"] == 1
+
+
+def test_failed_endpoint_keeps_last_good_value_and_is_retried():
+    client = FakeTaigaClient()
+    dataset = held_dataset(client)
+    first = dataset.get()
+
+    # Only epics is due; its fetch fails, so the held list is kept and marked stale
+    dataset.fetched_at = None
+    dataset.endpoint_times["epics"] = 0
+    client.failing.add("get_epics")
+    data = dataset.get()
+    assert data["epics"] is first["epics"]
+    assert set(dataset.stale) == {"epics"}
+    assert not dataset.is_fresh()
+    assert client.calls["get_stories"] == 1
+
+    client.failing.clear()
+    dataset.get()
+    assert dataset.stale == {}
+    assert dataset.is_fresh()
+    assert client.calls["get_epics"] == 3
+
+
+def test_endpoints_past_their_ttl_are_refetched():
+    client = FakeTaigaClient()
+    dataset = held_dataset(client)
+    dataset.get()
+    dataset.fetched_at = None
+    dataset.endpoint_times["tasks"] = 0
+    dataset.get()
+    assert client.calls["get_tasks"] == 2
+    assert client.calls["get_stories"] == 1
+
+
+def test_page_renders_without_project_record(client, monkeypatch):
+    import TaigaDashboard
+
+    taiga = FakeTaigaClient()
+    taiga.failing.add("get_project")
+    monkeypatch.setattr(TaigaDashboard, "dataset", held_dataset(taiga))
+    response = client.get("/")
+    assert response.status_code == 200
+    assert "data unavailable" in response.get_data(as_text=True)
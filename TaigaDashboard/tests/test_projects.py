@@ -0,0 +1,62 @@
+import pytest
+from app import taiga_factory
+from app.taiga_dataset import DashboardDataset, metadata_cache
+from app.taiga_view_cache import ViewCache
+from fake_taiga import FakeTaigaClient
+
+
+@pytest.fixture
+def taiga_env(monkeypatch):
+    monkeypatch.setenv("TAIGA_BASE_URL", "https://taiga.example.com")
+    monkeypatch.setenv("TAIGA_USERNAME", "dashboard")
+    monkeypatch.setenv("TAIGA_PASSWORD", "secret")
+    monkeypatch.delenv("TAIGA_CASSETTE", raising=False)
+    monkeypatch.setattr(taiga_factory, "sessions", {})
+
+
+def test_project_clients_share_one_session_and_metadata_cache(taiga_env):
+    first = taiga_factory.create_taiga_client(2)
+    second = taiga_factory.create_taiga_client(3)
+    assert (first.projectid, second.projectid) == (2, 3)
+    assert first.session is second.session
+    assert first.metadata_cache is second.metadata_cache is metadata_cache
+    assert taiga_factory.create_taiga_client(1).session is first.session
+
+    recording = taiga_factory.create_taiga_client(2, shared=False)
+    assert recording.session is not first.session
+    assert recording.metadata_cache is None
+
+
+@pytest.fixture
+def app_module(monkeypatch):
+    """TaigaDashboard serving fake projects: the default project 1 and project 2 (TAIGA_PROJECT_IDS)."""
+    import TaigaDashboard
+
+    monkeypatch.setattr(TaigaDashboard, "dataset", DashboardDataset(FakeTaigaClient, ttl=900))
+    monkeypatch.setattr(TaigaDashboard, "project_datasets", {})
+    monkeypatch.setattr(TaigaDashboard, "create_taiga_client", lambda projectid: FakeTaigaClient(projectid))
+    monkeypatch.setattr(TaigaDashboard, "view_cache", ViewCache(max_bytes=64 * 1024 * 1024, ttl=900))
+    return TaigaDashboard
+
+
+def test_each_served_project_gets_its_own_dataset(app_module):
+    client = app_module.app.test_client()
+
+    response = client.get("/project/2/")
+    assert response.status_code == 200
+    assert "Project 2" in response.get_data(as_text=True)
+    assert client.get("/project/2/widget/tag_cloud").status_code == 200
+    assert list(app_module.project_datasets) == [2]
+    assert app_module.project_datasets[2].projectid == 2
+
+
+def test_default_project_path_shares_the_default_dataset(app_module):
+    client = app_module.app.test_client()
+    assert "Project 1" in client.get("/project/1/").get_data(as_text=True)
+    assert "Project 1" in client.get("/").get_data(as_text=True)
+    assert app_module.project_datasets == {}
+
+
+def test_unserved_project_is_not_found(app_module):
+    assert app_module.app.test_client().get("/project/3/").status_code == 404
+    assert app_module.project_datasets == {}
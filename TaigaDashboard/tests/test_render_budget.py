@@ -0,0 +1,62 @@
+import asyncio
+import time
+import pytest
+from app.taiga_dataset import DashboardDataset
+from app.taiga_view_cache import ViewCache
+from fake_taiga import FakeTaigaClient
+
+SLOW_WIDGET = "tag_cloud"
+
+
+@pytest.fixture
+def app_module(monkeypatch):
+    """TaigaDashboard serving a fake project, with a 1 ms render budget that SLOW_WIDGET always misses."""
+    import TaigaDashboard
+
+    taiga = FakeTaigaClient()
+    monkeypatch.setattr(TaigaDashboard, "dataset", DashboardDataset(lambda: taiga, ttl=900))
+    monkeypatch.setattr(TaigaDashboard, "view_cache", ViewCache(max_bytes=64 * 1024 * 1024, ttl=900))
+    monkeypatch.setattr(TaigaDashboard, "WIDGET_RENDER_BUDGET_MS", 1)
+    render_widget = TaigaDashboard.render_widget
+
+    def slow_render_widget(widget, *args):
+        if widget.name == SLOW_WIDGET:
+            time.sleep(0.2)
+        return render_widget(widget, *args)
+
+    monkeypatch.setattr(TaigaDashboard, "render_widget", slow_render_widget)
+    return TaigaDashboard
+
+
+def asgi_get(app, path, query_string=b""):
+    """Send one GET through an ASGI app and return (status, headers, body)."""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "method": "GET", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": query_string, "headers": [], "scheme": "http", "http_version": "1.1",
+        "server": ("testserver", 80), "client": ("127.0.0.1", 1234),
+    }
+    asyncio.run(app(scope, receive, send))
+    start = next(m for m in sent if m["type"] == "http.response.start")
+    body = b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+    return start["status"], dict(start["headers"]), body.decode("utf-8")
+
+
+def test_asgi_page_links_widgets_over_the_budget(app_module):
+    status, headers, body = asgi_get(app_module.asgi_app, "/", b"column_metric=priority")
+    assert status == 200
+    assert headers[b"x-view-cache"] == b"miss"
+    assert f'data-src="/widget/{SLOW_WIDGET}"' in body
+
+
+def test_wsgi_page_links_widgets_over_the_budget(app_module):
+    response = app_module.app.test_client().get("/")
+    assert response.status_code == 200
+    assert f'data-src="/widget/{SLOW_WIDGET}"' in response.get_data(as_text=True)
@@ -0,0 +1,46 @@
+import threading
+import pytest
+from app.taiga_scheduler import PageScheduler, page_count
+
+
+def run_queued(submissions):
+    """
+    Queue (priority, name, group) requests on a one-worker scheduler while its worker is busy,
+    then let them run; return the names in the order they ran.
+    """
+    scheduler = PageScheduler(max_workers=1)
+    started, release = threading.Event(), threading.Event()
+    scheduler.submit(0, lambda: started.set() or release.wait(5), group="blocker")
+    assert started.wait(5)
+    ran = []
+    futures = [
+        scheduler.submit(priority, ran.append, name, group=group) for priority, name, group in submissions
+    ]
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+    return ran
+
+
+def test_higher_priority_runs_first_and_ties_keep_submission_order():
+    ran = run_queued([(1, "small", None), (5, "large", None), (3, "first medium", None), (3, "second medium", None)])
+    assert ran == ["large", "first medium", "second medium", "small"]
+
+
+def test_groups_take_turns():
+    ran = run_queued([(10, "a1", "a"), (10, "a2", "a"), (10, "a3", "a"), (1, "b1", "b"), (1, "b2", "b")])
+    assert ran == ["a1", "b1", "a2", "b2", "a3"]
+
+
+def test_exception_is_set_on_the_future():
+    def fail():
+        raise RuntimeError("page failed")
+
+    with pytest.raises(RuntimeError, match="page failed"):
+        PageScheduler(max_workers=2).submit(1, fail).result(timeout=5)
+
+
+def test_page_count():
+    assert page_count({"x-pagination-count": "250", "x-paginated-by": "100"}, [{}] * 100) == (250, 3)
+    assert page_count({}, []) is None
+    assert page_count({"x-pagination-count": "5", "x-paginated-by": "0"}, []) is None
@@ -0,0 +1,16 @@
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHART_MODULES = ("numpy", "plotly.graph_objs")
+
+
+def test_import_leaves_chart_modules_unloaded():
+    # A fresh interpreter: this test process may already have rendered a chart
+    script = f"import sys, TaigaDashboard; print(sorted(m for m in {CHART_MODULES!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=APP_DIR, env=os.environ, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,52 @@
+import sys
+from app import taiga_view_cache
+from app.taiga_view_cache import ViewCache
+
+PAGE = "x" * 1000
+PAGE_SIZE = sys.getsizeof(PAGE)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ViewCache(max_bytes=2 * PAGE_SIZE, ttl=60)
+    cache.set("a", PAGE)
+    cache.set("b", PAGE)
+    assert cache.get("a") == PAGE  # "b" is now the least recently used
+    cache.set("c", PAGE)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == PAGE
+    assert cache.get("c") == PAGE
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert stats["size_bytes"] == 2 * PAGE_SIZE
+
+
+def test_value_larger_than_the_cache_is_not_stored():
+    cache = ViewCache(max_bytes=PAGE_SIZE - 1, ttl=60)
+    cache.set("a", PAGE)
+    assert cache.get("a") is None
+    assert cache.stats()["size_bytes"] == 0
+
+
+def test_replacing_an_entry_keeps_the_size_in_step():
+    cache = ViewCache(max_bytes=10 * PAGE_SIZE, ttl=60)
+    cache.set("a", PAGE)
+    cache.set("a", "small")
+    assert cache.get("a") == "small"
+    assert cache.stats()["size_bytes"] == sys.getsizeof("small")
+
+
+def test_expired_entry_is_a_miss_and_frees_its_size(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(taiga_view_cache.time, "monotonic", lambda: now[0])
+    cache = ViewCache(max_bytes=10 * PAGE_SIZE, ttl=60)
+    cache.set("a", PAGE)
+
+    now[0] += 60
+    assert cache.get("a") == PAGE
+    now[0] += 1
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+    assert (stats["entries"], stats["size_bytes"]) == (0, 0)
@@ -0,0 +1,119 @@
+import json
+import os
+import pytest
+from app.taiga_webhooks import apply_event, event_key, sign_payload
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "webhooks")
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def post_signed(client, payload):
+    body = json.dumps(payload).encode("utf-8")
+    return client.post(
+        "/webhook",
+        data=body,
+        headers={
+            "Content-Type": "application/json",
+            "X-TAIGA-WEBHOOK-SIGNATURE": sign_payload(os.environ["TAIGA_WEBHOOK_KEY"], body),
+        },
+    )
+
+
+def test_event_key():
+    assert event_key(load_fixture("task_create.json")) == "tasks"
+    assert event_key(load_fixture("test.json")) is None
+
+
+@pytest.mark.parametrize("payload", [[1, 2], "change", None])
+def test_event_key_rejects_non_object_payloads(payload):
+    with pytest.raises(ValueError):
+        event_key(payload)
+
+
+def test_event_key_requires_object_id():
+    with pytest.raises(ValueError):
+        event_key({"action": "change", "type": "userstory", "data": {}})
+
+
+def test_apply_event_replaces_held_item():
+    payload = load_fixture("task_create.json")
+    data = {"tasks": [{"id": payload["data"]["id"], "subject": "old"}, {"id": 1, "subject": "other"}]}
+    tasks = apply_event(data, payload)
+    assert [task["id"] for task in tasks] == [payload["data"]["id"], 1]
+    assert tasks[0]["subject"] == payload["data"]["subject"]
+
+
+def test_webhook_rejects_non_object_payload(client):
+    assert post_signed(client, [1, 2]).status_code == 400
+
+
+def test_webhook_rejects_object_without_id(client):
+    assert post_signed(client, {"action": "change", "type": "userstory", "data": {}}).status_code == 400
+
+
+def test_webhook_rejects_bad_signature(client):
+    response = client.post("/webhook", data=b"{}", headers={"X-TAIGA-WEBHOOK-SIGNATURE": "0" * 40})
+    assert response.status_code == 403
+
+
+def test_webhook_accepts_test_event(client):
+    response = post_signed(client, load_fixture("test.json"))
+    assert response.status_code == 200
+    assert response.get_json() == {"applied": False, "changed": []}
+
+
+def task_event(projectid):
+    payload = load_fixture("task_create.json")
+    payload["data"]["project"]["id"] = projectid
+    return payload
+
+
+@pytest.fixture
+def updates(monkeypatch):
+    """Records the keys of apply_update calls on the default project's dataset instead of applying them."""
+    import TaigaDashboard
+
+    calls = []
+    monkeypatch.setattr(TaigaDashboard.dataset, "apply_update", lambda key, update: calls.append(key) or {key})
+    return calls
+
+
+def test_webhook_applies_events_of_the_default_project(client, updates):
+    response = post_signed(client, task_event(1))
+    assert response.status_code == 200
+    assert response.get_json() == {"applied": True, "changed": ["tasks"]}
+    assert updates == ["tasks"]
+
+
+def test_webhook_skips_served_project_without_held_dataset(client, updates):
+    response = post_signed(client, task_event(2))
+    assert response.status_code == 200
+    assert response.get_json() == {"applied": False, "changed": []}
+    assert updates == []
+
+
+def test_webhook_ignores_events_of_unserved_projects(client, updates):
+    import TaigaDashboard
+
+    response = post_signed(client, task_event(3))
+    assert response.status_code == 202
+    assert response.get_json() == {"applied": False, "changed": []}
+    assert updates == []
+    assert 3 not in TaigaDashboard.project_datasets
+
+
+@pytest.mark.parametrize("project", [None, {}, {"name": "no id"}])
+def test_webhook_ignores_events_without_project(client, updates, project):
+    payload = task_event(1)
+    if project is None:
+        del payload["data"]["project"]
+    else:
+        payload["data"]["project"] = project
+    response = post_signed(client, payload)
+    assert response.status_code == 202
+    assert response.get_json() == {"applied": False, "changed": []}
+    assert updates == []
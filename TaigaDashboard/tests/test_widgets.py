@@ -0,0 +1,41 @@
+import pytest
+from werkzeug.datastructures import MultiDict
+from app.taiga_dataset import DashboardDataset
+from app.taiga_view_cache import ViewCache
+from app.taiga_widgets import WIDGETS_BY_NAME, parse_view_params, render_widget, widget_cache_key, widget_inputs
+from fake_taiga import FakeTaigaClient
+
+FILTERS, OPTIONS = parse_view_params(MultiDict({"assignee": "alice"}))
+
+
+def test_unfiltered_widgets_skip_the_facet_index():
+    cumulative_flow = WIDGETS_BY_NAME["cumulative_flow"]
+    assert "facet_index" not in widget_inputs(cumulative_flow, FILTERS)
+    assert widget_cache_key(cumulative_flow, FILTERS, OPTIONS) == widget_cache_key(cumulative_flow, (), OPTIONS)
+
+    tag_cloud = WIDGETS_BY_NAME["tag_cloud"]
+    assert "facet_index" in widget_inputs(tag_cloud, FILTERS)
+    assert widget_cache_key(tag_cloud, FILTERS, OPTIONS) != widget_cache_key(tag_cloud, (), OPTIONS)
+
+
+def test_unfiltered_widget_renders_without_the_facet_index():
+    widget = WIDGETS_BY_NAME["cycle_time_histogram"]
+    assert render_widget(widget, {"cycle_times": {}}, FILTERS, OPTIONS) == render_widget(widget, {"cycle_times": {}})
+
+
+@pytest.fixture
+def app_module(monkeypatch):
+    import TaigaDashboard
+
+    monkeypatch.setattr(TaigaDashboard, "dataset", DashboardDataset(FakeTaigaClient, ttl=900))
+    monkeypatch.setattr(TaigaDashboard, "view_cache", ViewCache(max_bytes=64 * 1024 * 1024, ttl=900))
+    return TaigaDashboard
+
+
+def test_filtered_page_marks_unfiltered_widgets(app_module):
+    client = app_module.app.test_client()
+    assert "not filtered" not in client.get("/").get_data(as_text=True)
+
+    body = client.get("/?assignee=alice").get_data(as_text=True)
+    assert "Filtered by" in body
+    assert body.count("Whole project: this chart is not filtered") == 3